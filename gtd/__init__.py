@@ -1 +1,13 @@
-from .command_executor import * 
\ No newline at end of file
+import importlib.util
+
+
+def __getattr__(name):
+    # Names from gtd.command_executor are resolved on first access, so importing
+    # gtd.config or a plugin does not import command executor and its dependencies.
+    if name.startswith("__") or importlib.util.find_spec("gtd." + name) is not None:
+        raise AttributeError("module 'gtd' has no attribute %r" % name)
+    from gtd import command_executor
+    try:
+        return getattr(command_executor, name)
+    except AttributeError:
+        raise AttributeError("module 'gtd' has no attribute %r" % name) from None
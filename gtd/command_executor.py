@@ -1,18 +1,38 @@
 import datetime
-import pandas as pd 
 from gtd import importer
 from gtd.config import * 
-from gtd.extensions import ReportService
+from gtd.extensions import ReportService, using_snapshot
 from gtd.style import * 
 from gtd.config import get_classes_inheriting
-from gtd.importer import Importer, import_task
+from gtd.importer import Importer, import_task, import_tasks, parse_tasks
+from gtd.manifest import get_manifest, load_symbol
 from orgasm.http_rest import http_auth_json_file, http_get, no_http
 from orgasm.http_rest import issue_token, json_save_to_db
 
-import pandas as pd
-
 TOKEN_FILE = get_config_str("token_file", "tokens.json", "Path to the file with tokens")
 
+def get_plugin_classes(base_class):
+    """
+    Returns list of (plugin name, class name) tuples for plugin classes inheriting base_class. 
+    
+    Answer comes from plugin manifest so plugins are not imported. If some plugin cannot be 
+    inspected statically, plugins are loaded and inspected instead.
+    """
+    manifest = get_manifest()
+    if manifest.complete:
+        return manifest.get_classes_inheriting(base_class)
+    return [(c.__module__, c.__name__) for c in get_classes_inheriting(base_class)]
+
+def find_plugin_class(base_class, name: str):
+    """
+    Imports only the plugin defining class with given name (or plugin.ClassName) and returns the class.
+    Returns None if there is no such class.
+    """
+    for plugin, cls in get_plugin_classes(base_class):
+        if name in [cls, "%s.%s" % (plugin, cls)]:
+            return load_symbol(plugin, cls)
+    return None
+
 @pluggable
 def generate_report():
     return None 
@@ -24,10 +44,10 @@ class CommandExecutor:
 
     @no_http
     def importers(self):
-        return get_classes_inheriting(Importer)
+        return ["%s.%s" % (plugin, cls) for plugin, cls in get_plugin_classes(Importer)]
 
     @no_http
-    def report(self, *, name: str = "", importer: str = ""):
+    def report(self, *, name: str = "", importer: str = "", snapshot: str = ""):
         """
         Creates report of tasks and other information from plugins in HTML page. 
 
@@ -35,7 +55,12 @@ class CommandExecutor:
         When called from Python, HTML content is returned as string.
 
         :param name: If specified, use template with this name. If not specified, use default template.
+        :param snapshot: If specified, read data from this snapshot (Trello backup or store) instead of live services.
         """
+        with using_snapshot(snapshot):
+            return self._report(name, importer)
+
+    def _report(self, name, importer):
         if name:
             template_dir = get_config_str("report_template_dir", "templates", "Directory with report templates")
             template_path = os.path.join(template_dir, name + ".html.j2")
@@ -60,13 +85,16 @@ class CommandExecutor:
         return ""
 
     @no_http
-    def retro(self, week: int, *, year: int = 0, start: int = -1):
+    def retro(self, week: int, *, year: int = 0, start: int = -1, snapshot: str = ""):
         """
         Generates a report of tasks and other information from plugins in HTML page for the specified calendar week.
+
+        :param snapshot: If specified, read data from this snapshot (Trello backup or store) instead of live services.
         """
         if year == 0:
             year = datetime.datetime.now().year
-        custom_report = generate_retro_report(year, week, start=start)
+        with using_snapshot(snapshot):
+            custom_report = generate_retro_report(year, week, start=start)
         if custom_report is not None:
             return custom_report
         return ""
@@ -84,17 +112,18 @@ class CommandExecutor:
         """
         Returns the importer class specified by the user. If no importer is specified, it returns the first one found.
         """
-        importers = self.importers()
+        importers = get_plugin_classes(Importer)
         if len(importers) == 0:
             raise Exception("No importers available")
         elif len(importers) > 1 and importer == "":
             raise Exception("Multiple importers available. Please specify one.")
         elif len(importers) == 1 and importer == "":
-            importer = importers[0]
-        elif importer not in [i.__name__ for i in importers]:
-            raise Exception("Importer %s not found" % importer)
+            importer = load_symbol(*importers[0])
         else:
-            importer = [i for i in importers if i.__name__ == importer][0]
+            name = importer
+            importer = find_plugin_class(Importer, name)
+            if importer is None:
+                raise Exception("Importer %s not found" % name)
         return importer()
 
 
@@ -126,6 +155,7 @@ class CommandExecutor:
 
         Example: gtd import_csv tasks.csv
         """
+        import pandas as pd
         df = pd.read_csv(path)
         for i, row in df.iterrows():
             ticket = self.create_ticket(
@@ -170,109 +200,19 @@ class CommandExecutor:
             input_f = sys.stdin
         else:
             input_f = open(input, "r")
-        if not multiline and not checklists:
-            for line in input_f:
-                line = line.strip()
-                if line == "":
-                    continue
-                if import_task(
-                    importer=importer,
-                    title=line,
-                    project=parent,
-                    context=context,
-                    unique=True,
-                ):
-                    print("Created ticket: %s" % line)
-                else:
-                    raise Exception("Error occurred while creating ticket: %s" % line)
-
-        elif multiline and not checklists:
-            summary = ""
-            description = ""
-            for line in input_f:
-                line = line.strip()
-                if line == "":
-                    if summary != "":
-                        if import_task(
-                            importer=importer,
-                            title=summary,
-                            description=description,
-                            project=parent,
-                            unique=True,
-                            context=context,
-                        ):
-                            print("Created ticket: %s" % summary)
-                    summary = ""
-                    description = ""
-                elif summary == "":
-                    summary = line
-                else:
-                    description += line + "\n"
-            if summary != "":
-                if import_task(
-                    importer=importer,
-                    title=summary,
-                    description=description,
-                    project=parent,
-                    unique=True,
-                    context=context,
-                ):
-                    print("Created ticket: %s" % summary)
-                else:
-                    raise Exception("Error occurred while creating ticket: %s" % summary)
-        elif not multiline and checklists:
-            summary = ""
-            description = ""
-            my_checklists = {}
-            current_checklist = "Checklist"
-            my_checklists[current_checklist] = []
-            for line in input_f:
-                line = line.strip()
-                if line == "":
-                    if summary != "":
-                        if import_task(
-                            importer=importer,
-                            title=summary,
-                            description=description,
-                            project=parent,
-                            checklists=my_checklists,
-                            unique=True,
-                            context=context,
-                        ):
-                            print("Created ticket: %s" % summary)
-                    summary = ""
-                    description = ""
-                    my_checklists = {}
-                    current_checklist = "Checklist"
-                    my_checklists[current_checklist] = []
-                elif summary == "":
-                    summary = line
-                elif line.startswith("*"):
-                    checklists_item = line[1:].strip()
-                    my_checklists[current_checklist].append(checklists_item)
-                else:
-                    if line.endswith(":") and multi_checklist:
-                        checklist_name = line[:-1].strip()
-                        if checklist_name not in my_checklists:
-                            my_checklists[checklist_name] = []
-                        current_checklist = checklist_name
-                    else:
-                        description += line + "\n"
-            if summary != "":
-                if import_task(
-                    importer=importer,
-                    title=summary,
-                    description=description,
-                    project=parent,
-                    checklists=my_checklists,
-                    unique=True,
-                    context=context,
-                ):
-                    print("Created ticket: %s" % summary)
-                else:
-                    raise Exception("Error occurred while creating ticket: %s" % summary)
-
-
+        tasks = [
+            {**task, "project": parent, "context": context}
+            for task in parse_tasks(input_f, multiline=multiline, checklists=checklists, multi_checklist=multi_checklist)
+        ]
+        results = import_tasks(importer, True, tasks)
+        failed = []
+        for task, ok in zip(tasks, results):
+            if ok:
+                print("Created ticket: %s" % task["title"])
+            else:
+                failed.append(task["title"])
+        if len(failed) > 0:
+            raise Exception("Error occurred while creating tickets: %s" % ", ".join(failed))
 
     @no_http
     def import_server(self, projectdir: str, *, notify_fifo: str = "", pidfile: str = "", importer: str = "", context: str = ""):
@@ -320,6 +260,8 @@ class CommandExecutor:
                 message = fifo.read()
                 if message.strip() == "WAKEUP":
                     print("Received WAKEUP message. Importing tasks from %s" % projectdir)
+                    # every upload sees current state of the service, not the one from first upload
+                    importer.begin_session()
                     for filename in os.listdir(projectdir):
                         if filename.endswith(".txt"):
                             failed = False
@@ -352,6 +294,26 @@ class CommandExecutor:
         from orgasm.http_rest import serve_rest_api
         return serve_rest_api([ServicesExecutor], port=port, host="0.0.0.0")
 
+    @no_http
+    def startup_profile(self, *, top: int = 20, plugins: bool = False):
+        """
+        Ranks modules by time spent importing them when gtd starts, slowest first.
+
+        :param top: Number of modules to show.
+        :param plugins: If True, configured plugins are loaded as part of the startup.
+        """
+        from gtd.utils import profile_imports
+        statement = "import gtd.__main__"
+        if plugins:
+            statement += "; from gtd.config import load_plugins; load_plugins()"
+        rows = profile_imports(statement)
+        total = sum(r["cumulative_ms"] for r in rows if r["level"] == 0)
+        result = ["Total startup import time: %.1f ms" % total]
+        result.append("%10s %12s  %s" % ("self [ms]", "cumul. [ms]", "module"))
+        for r in rows[:top]:
+            result.append("%10.1f %12.1f  %s" % (r["self_ms"], r["cumulative_ms"], r["module"]))
+        return "\n".join(result)
+
     @no_http
     def usage(self):
         return """
@@ -362,6 +324,7 @@ class CommandExecutor:
         - create_ticket: Creates a new ticket with the specified parameters.
         - import_csv: Imports a csv file with the specified columns.
         - upload: Uploads a batch of tasks in text specified.
+        - startup_profile: Ranks modules by import time during gtd startup.
         
 
         For more information about a command, use gtd COMMAND --help
@@ -416,8 +379,7 @@ class ServicesExecutor:
         """
         Returns a list of available services.
         """
-        services = get_classes_inheriting(ReportService)
-        return [service.__name__ for service in services]
+        return [cls for plugin, cls in get_plugin_classes(ReportService)]
     
     @http_auth_json_file(TOKEN_FILE)
     @http_get
@@ -426,22 +388,37 @@ class ServicesExecutor:
         Returns a service by name.
         If service is not found, raises an exception.
         """
-        services = get_classes_inheriting(ReportService)
-        for service in services:
-            if service.__name__ == name:
-                formats = {
-                    "csv": "to_csv",
-                    "json": "to_json",
-                    "html": "to_html",
-                }
-                if format != "":
-                    data = service().provide()
-                    df = pd.DataFrame(data)
-                    if format in formats:
-                        return getattr(df, formats[format])(index=False)
-                    else:
-                        raise Exception("Format %s not supported. Supported formats: %s" % (format, ", ".join(formats.keys())))
-                return service().provide()
+        return self._provide(name, format)
+
+    @no_http
+    def snapshot_service(self, name: str, snapshot: str, *, format: str = ""):
+        """
+        Same as service, but data is read from snapshot (Trello backup or store) instead of live services.
+        Not available over HTTP, since it reads files of the server.
+
+        :param snapshot: Path of the snapshot
+        """
+        with using_snapshot(snapshot):
+            return self._provide(name, format)
+
+    def _provide(self, name, format):
+        service = find_plugin_class(ReportService, name)
+        if service is None:
+            raise Exception("Service %s not found" % name)
+        formats = {
+            "csv": "to_csv",
+            "json": "to_json",
+            "html": "to_html",
+        }
+        if format != "":
+            import pandas as pd
+            data = service().provide()
+            df = pd.DataFrame(data)
+            if format in formats:
+                return getattr(df, formats[format])(index=False)
+            else:
+                raise Exception("Format %s not supported. Supported formats: %s" % (format, ", ".join(formats.keys())))
+        return service().provide()
     
     @no_http
     def analyze(self, path: str):
@@ -451,6 +428,7 @@ class ServicesExecutor:
         :param path: Path to the csv file which is output of the service command for getting closed tasks.
         """
         import matplotlib.pyplot as plt
+        import pandas as pd
         df = pd.read_csv(path)
         print("Total closed tasks: %d" % df.shape[0])
         print("Closed tasks by project:")
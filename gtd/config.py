@@ -3,6 +3,9 @@ import json
 import importlib 
 import inspect
 import sys 
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
 
 class ConfigurationError(Exception):
     pass
@@ -22,8 +25,48 @@ DEFAULT_PLUGINS = [
 def get_config_location():
     return os.environ.get(PROJECT_ENVVAR_PREFIX + "_CONFIG", os.path.join(os.path.expanduser("~"), ".config", CONFIG_FILE_NAME))
 
+_config_lock = threading.Lock()
+_config_snapshot = None
+_config_snapshot_key = None
+_config_parse_count = 0
+
+def _read_config_snapshot(config_location):
+    """
+    Returns parsed configuration file as read-only mapping. File is parsed 
+    only when its path, mtime or size differs from the previous parse.
+    """
+    global _config_snapshot, _config_snapshot_key, _config_parse_count
+    stat = os.stat(config_location)
+    key = (config_location, stat.st_mtime_ns, stat.st_size)
+    snapshot = _config_snapshot
+    if snapshot is not None and _config_snapshot_key == key:
+        return snapshot
+    with _config_lock:
+        if _config_snapshot is not None and _config_snapshot_key == key:
+            return _config_snapshot
+        with open(config_location) as f:
+            config = json.load(f)
+        _config_parse_count += 1
+        _config_snapshot = MappingProxyType(config)
+        _config_snapshot_key = key
+        return _config_snapshot
+
+def get_config_parse_count() -> int:
+    """
+    Returns how many times configuration file was parsed in this process.
+    """
+    return _config_parse_count
+
+def invalidate_config():
+    """
+    Drops parsed configuration so next read parses configuration file again.
+    """
+    global _config_snapshot, _config_snapshot_key
+    with _config_lock:
+        _config_snapshot = None
+        _config_snapshot_key = None
+
 def get_config(key: str, default, doc, expected_type=str):
-    config = {} 
     envvar = PROJECT_ENVVAR_PREFIX + "_" + key.upper()
     if envvar in os.environ:
         if expected_type == bool:
@@ -37,8 +80,7 @@ def get_config(key: str, default, doc, expected_type=str):
         raise ConfigurationError(f"Configuration file {config_location} does not exist")
     if not os.path.exists(config_location):
         return expected_type(default)
-    with open(config_location) as f:
-        config = json.load(f)
+    config = _read_config_snapshot(config_location)
     return expected_type(config.get(key, default))
 
 def get_config_int(key: str, default, doc) -> int:
@@ -71,6 +113,7 @@ def set_config(key: str, value):
     config[key] = value
     with open(config_location, "w") as f:
         json.dump(config, f)
+    invalidate_config()
 
 def get_search_path():
     return get_config_list("plugin_search_path", [
@@ -81,6 +124,9 @@ def get_search_path():
         os.getcwd()
     ], "List of plugin search paths")
 
+def get_cache_dir():
+    return os.path.expanduser(get_config_str("cache_dir", os.path.join("~", ".cache", PROJECT_NAME), "Directory where cached data is stored"))
+
 get_disabled_plugins = lambda: get_config_list("disabled_plugins", [], "List of plugins to disable")
 
 import importlib
@@ -112,39 +158,132 @@ def _expand_plugin(plugin):
     return [plugin]
 
 def list_plugins():
-    plugins = DEFAULT_PLUGINS
+    plugins = list(DEFAULT_PLUGINS)
     plugins += get_config_list("plugins", [], "List of plugins to load")
     disabled_plugins = get_disabled_plugins()
     plugins = [plugin for p in plugins for plugin in _expand_plugin(p)]
     plugins = [plugin for plugin in plugins if plugin not in disabled_plugins]
     return list(set(plugins))
 
-def load_plugins():
+@contextmanager
+def plugin_search_path():
+    """
+    Prepends plugin search path to sys.path while the block is executed.
+    """
     oldpath = sys.path
     sys.path = get_search_path() + sys.path
-    plugins = list_plugins()
-    result = []
-    for plugin in plugins:
-        try:
-            result.append((plugin, importlib.import_module(plugin)))
-        except ImportError as e:
-            print(f"Error loading plugin {plugin}: {e}")
-    sys.path = oldpath
-    return result
+    try:
+        yield
+    finally:
+        sys.path = oldpath
+
+class PluginRegistry:
+    """
+    Loads configured plugins once per process and indexes their symbols by name 
+    and by base class so plugin lookups do not scan plugin modules again.
+
+    Call reload() to pick up changes in configuration or plugin code in long-running processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._plugins = None
+        self._entries = []
+        self._by_name = {}
+        self._by_base = {}
+
+    def _load(self, reload=False):
+        plugins = []
+        with plugin_search_path():
+            for plugin in list_plugins():
+                try:
+                    if reload and plugin in sys.modules:
+                        module = importlib.reload(sys.modules[plugin])
+                    else:
+                        module = importlib.import_module(plugin)
+                    plugins.append((plugin, module))
+                except ImportError as e:
+                    print(f"Error loading plugin {plugin}: {e}")
+        entries = []
+        by_name = {}
+        for name, module in plugins:
+            for symbol in dir(module):
+                entries.append((name, symbol, getattr(module, symbol)))
+                by_name.setdefault(symbol, []).append((name, module))
+        self._plugins = plugins
+        self._entries = entries
+        self._by_name = by_name
+        self._by_base = {}
+
+    def _ensure_loaded(self):
+        if self._plugins is None:
+            with self._lock:
+                if self._plugins is None:
+                    self._load()
+
+    def reload(self):
+        """
+        Reloads plugin list from configuration, re-imports plugins and rebuilds the index.
+        """
+        with self._lock:
+            self._load(reload=True)
+
+    def plugins(self):
+        """
+        Returns list of (plugin name, module) tuples for loaded plugins.
+        """
+        self._ensure_loaded()
+        return list(self._plugins)
+
+    def get_providers(self, symbol):
+        """
+        Returns list of (plugin name, module) tuples for plugins having given symbol.
+        """
+        self._ensure_loaded()
+        return list(self._by_name.get(symbol, []))
+
+    def get_symbols_named(self, symbol):
+        """
+        Returns objects bound to given name in every plugin having it.
+        """
+        return [getattr(module, symbol) for name, module in self.get_providers(symbol)]
+
+    def get_symbols_satisfying(self, predicate):
+        self._ensure_loaded()
+        return [obj for name, symbol, obj in self._entries if predicate(obj)]
+
+    def get_classes_inheriting(self, base_class):
+        self._ensure_loaded()
+        classes = self._by_base.get(base_class)
+        if classes is None:
+            with self._lock:
+                classes = [
+                    obj for name, symbol, obj in self._entries
+                    if isinstance(obj, type) and issubclass(obj, base_class) and obj != base_class
+                ]
+                self._by_base[base_class] = classes
+        return list(classes)
+
+_plugin_registry = PluginRegistry()
+
+def get_plugin_registry() -> PluginRegistry:
+    return _plugin_registry
+
+def reload_plugins():
+    _plugin_registry.reload()
+
+def load_plugins():
+    return _plugin_registry.plugins()
 
 def notify_plugins(method_name, *args, **kwargs):
-    plugins = load_plugins()
-    for name, plugin in plugins:
-        if hasattr(plugin, method_name):
-            getattr(plugin, method_name)(*args, **kwargs)
+    for name, plugin in _plugin_registry.get_providers(method_name):
+        getattr(plugin, method_name)(*args, **kwargs)
     
 
 def get_plugin_result(method_name, *args, **kwargs):
-    plugins = load_plugins()
     found_results = []
-    for name, plugin in plugins:
-        if hasattr(plugin, method_name):
-            found_results.append((name, getattr(plugin, method_name)(*args, **kwargs)))
+    for name, plugin in _plugin_registry.get_providers(method_name):
+        found_results.append((name, getattr(plugin, method_name)(*args, **kwargs)))
     if len(found_results) == 0:
         return None
     if len(found_results) == 1:
@@ -152,20 +291,10 @@ def get_plugin_result(method_name, *args, **kwargs):
     raise ConflictError(f"Multiple plugins returned results for {method_name}: {found_results}")
 
 def get_symbols_satisfying(predicate):
-    plugins = load_plugins()
-    result = []
-    visited = set()
-    for name, plugin in plugins:
-        for symbol in dir(plugin):
-            if (name, symbol) in visited:
-                continue
-            visited.add((name, symbol))
-            if predicate(getattr(plugin, symbol)):
-                result.append(getattr(plugin, symbol))
-    return result
+    return _plugin_registry.get_symbols_satisfying(predicate)
 
 def get_classes_inheriting(base_class):
-    return get_symbols_satisfying(lambda x: isinstance(x, type) and issubclass(x, base_class) and x != base_class)
+    return _plugin_registry.get_classes_inheriting(base_class)
 
 
 
@@ -1,11 +1,9 @@
 
 from textwrap import TextWrapper
 from typing import Optional
-from gtd.ods import ODSDocument
 import os
 import tempfile
 import subprocess
-import pandas as pd 
 from gtd.config import get_config_str, get_config_list
 import logging 
 
@@ -32,13 +30,15 @@ class Spreadsheet(object):
             raise RuntimeError("Command rclone failed to copy file %s to %s" % (self.path, destination))
         return os.path.join(destination, os.path.basename(self.path))
 
-    def open(self, sheet_name) -> ODSDocument:
+    def open(self, sheet_name) -> "ODSDocument":
+        from gtd.ods import ODSDocument
         logger.debug(f"Opening spreadsheet: {self.path} with sheet name: {sheet_name}")
         destination = tempfile.mkdtemp()
         fullpath = self.copy(destination)
         return ODSDocument(fullpath, sheet_name)
     
-    def open_pandas(self, sheet_name: str) -> pd.DataFrame:
+    def open_pandas(self, sheet_name: str) -> "pd.DataFrame":
+        import pandas as pd
         destination = tempfile.mkdtemp()
         fullpath = self.copy(destination)
         return pd.read_excel(fullpath, engine="odf", sheet_name=sheet_name)
@@ -1,45 +1,247 @@
-
-from  gtd.config import get_symbols_satisfying
-from multiprocessing import Pool
+from  gtd.config import get_plugin_registry, get_config_str, get_config_int, get_config_float, plugin_search_path
+import contextlib
+import contextvars
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+import time
 
 from gtd.style import error, paragraph, red
 import logging
 
 logger = logging.getLogger(__name__)
+# snapshot (like Trello backup) plugins read instead of live services, None for live services
+_snapshot = contextvars.ContextVar("snapshot", default=None)
+
+def get_snapshot():
+    """
+    Returns path of snapshot selected with using_snapshot, None if live services are used.
+    """
+    return _snapshot.get()
+
+@contextlib.contextmanager
+def using_snapshot(path):
+    """
+    Makes plugins read data from snapshot at given path instead of live services inside
+    the block, in this thread and in extensions run from it. Empty path or None selects
+    live services. Previous selection is restored when block exits.
+    """
+    token = _snapshot.set(path or None)
+    try:
+        yield
+    finally:
+        _snapshot.reset(token)
+
 class ReportService:
     def provide(self):
         raise NotImplementedError("This method should be overridden by subclasses")
 
 class Report:
-    def __init__(self) -> None:
-        self.elements = [] 
-    
+    def __init__(self, name: str = "") -> None:
+        self.elements = []
+        # name of extension which produced the report and seconds it took
+        self.name = name
+        self.duration = None
+        self.timed_out = False
+
     def add(self, elem):
         self.elements.append(elem)
-    
+
     def get_elements(self):
         return self.elements
 
 def _extension_result_key(report):
     return report.get_elements()[0] if report.get_elements() else ""
 
+def _extension_name(ext):
+    return f"{ext.__module__}.{ext.__name__}"
+
 def is_extension(obj):
     return hasattr(obj, "__name__") and obj.__name__ == "add_extensions" and callable(obj)
-def get_report(ext):
-    logger.info(f"Running extension: {ext.__module__}.{ext.__name__}")
-    report = Report()
+def get_report(ext, snapshot=None):
+    logger.info(f"Running extension: {_extension_name(ext)}")
+    report = Report(_extension_name(ext))
+    start = time.monotonic()
     try:
-        ext(report)
-        return report
+        with using_snapshot(snapshot):
+            ext(report)
     except Exception as e:
         logger.error(f"Error in extension: {e}")
         report.add(paragraph(error("Error in extension: " + str(e))))
-        return report
+    report.duration = time.monotonic() - start
+    return report
+
+def _timed_out_report(ext, timeout):
+    logger.error(f"Extension {_extension_name(ext)} timed out after {timeout} seconds")
+    report = Report(_extension_name(ext))
+    report.add(paragraph(error("Extension %s timed out after %s seconds" % (_extension_name(ext), timeout))))
+    report.duration = timeout
+    report.timed_out = True
+    return report
+
+def _run_inline(extensions, workers, timeout, snapshot=None):
+    return [get_report(ext, snapshot) for ext in extensions]
+
+def _run_in_threads(extensions, workers, timeout, snapshot=None):
+    """
+    Runs extensions in daemon threads. Extension running longer than timeout is reported
+    as timed out and its worker is replaced, so hung extension does not block the report
+    or the exit of the process.
+    """
+    reports = [None] * len(extensions)
+    started = {}
+    tasks = queue.Queue()
+    for i in range(len(extensions)):
+        tasks.put(i)
+    cond = threading.Condition()
+
+    def worker():
+        while True:
+            try:
+                i = tasks.get_nowait()
+            except queue.Empty:
+                return
+            with cond:
+                started[i] = time.monotonic()
+            report = get_report(extensions[i], snapshot)
+            with cond:
+                if reports[i] is None:
+                    reports[i] = report
+                cond.notify_all()
+
+    def start_worker():
+        threading.Thread(target=worker, daemon=True).start()
+
+    for _ in range(min(workers, len(extensions))):
+        start_worker()
+    with cond:
+        while any(r is None for r in reports):
+            wait = None
+            if timeout > 0:
+                now = time.monotonic()
+                for i, start in started.items():
+                    if reports[i] is None and now - start >= timeout:
+                        reports[i] = _timed_out_report(extensions[i], timeout)
+                        start_worker()
+                deadlines = [start + timeout for i, start in started.items() if reports[i] is None]
+                if deadlines:
+                    wait = max(0, min(deadlines) - now)
+            if any(r is None for r in reports):
+                cond.wait(wait)
+    return reports
+
+# preload of forkserver takes effect only when the server starts, which happens once per
+# process, so it is set on first use only; plugins loaded later are imported by each worker
+_forkserver_preloaded = False
+
+def _get_process_context(extensions):
+    global _forkserver_preloaded
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    ctx = multiprocessing.get_context("forkserver")
+    if not _forkserver_preloaded:
+        # forkserver imports plugins once, workers are forked from it with plugins already loaded
+        ctx.set_forkserver_preload(["gtd.extensions"] + sorted(set(ext.__module__ for ext in extensions)))
+        _forkserver_preloaded = True
+    return ctx
+
+def _send_report(connection, ext, snapshot):
+    connection.send(get_report(ext, snapshot))
+    connection.close()
+
+def _exited_report(ext, exitcode, start):
+    logger.error(f"Extension {_extension_name(ext)} exited with code {exitcode} without report")
+    report = Report(_extension_name(ext))
+    report.add(paragraph(error("Extension %s exited with code %s without report" % (_extension_name(ext), exitcode))))
+    report.duration = time.monotonic() - start
+    return report
+
+def _run_in_processes(extensions, workers, timeout, snapshot=None):
+    """
+    Runs every extension in its own process, at most workers of them at a time. Timeout
+    of an extension counts from start of its process and process of extension which
+    timed out is killed, so hung extension does not delay extensions queued after it.
+    """
+    reports = [None] * len(extensions)
+    pending = list(range(len(extensions)))
+    # index of extension -> (process, connection receiving its report, start time)
+    running = {}
+    with plugin_search_path():
+        ctx = _get_process_context(extensions)
+        try:
+            while pending or running:
+                while pending and len(running) < workers:
+                    i = pending.pop(0)
+                    receiver, sender = ctx.Pipe(duplex=False)
+                    process = ctx.Process(target=_send_report, args=(sender, extensions[i], snapshot), daemon=True)
+                    process.start()
+                    sender.close()
+                    running[i] = (process, receiver, time.monotonic())
+                wait = None
+                if timeout > 0:
+                    wait = max(0, min(start for _, _, start in running.values()) + timeout - time.monotonic())
+                ready = multiprocessing.connection.wait([receiver for _, receiver, _ in running.values()], wait)
+                now = time.monotonic()
+                for i, (process, receiver, start) in list(running.items()):
+                    if receiver in ready:
+                        try:
+                            reports[i] = receiver.recv()
+                        except EOFError:
+                            process.join()
+                            reports[i] = _exited_report(extensions[i], process.exitcode, start)
+                    elif timeout > 0 and now - start >= timeout:
+                        reports[i] = _timed_out_report(extensions[i], timeout)
+                    else:
+                        continue
+                    del running[i]
+                    receiver.close()
+                    process.terminate()
+                    process.join()
+        finally:
+            for process, receiver, _ in running.values():
+                receiver.close()
+                process.terminate()
+    return reports
+
+EXECUTORS = {
+    "inline": _run_inline,
+    "thread": _run_in_threads,
+    "process": _run_in_processes,
+}
+
+def run_extensions() -> list:
+    """
+    Runs all add_extensions functions from plugins and returns list of Report objects, one per extension.
+
+    Executor is selected by extension_executor configuration parameter:
+
+    - inline - extensions run one after another in this process, timeout is not enforced
+    - thread - extensions run in thread pool, suitable for I/O bound extensions
+    - process - every extension runs in its own process forked from a server with plugins preloaded
+    """
+    extensions = [ext for ext in get_plugin_registry().get_symbols_named("add_extensions") if is_extension(ext)]
+    if len(extensions) == 0:
+        return []
+    mode = get_config_str("extension_executor", "process", "How extensions are run: inline, thread or process")
+    if mode not in EXECUTORS:
+        raise ValueError("Unknown extension executor %s, expected one of: %s" % (mode, ", ".join(EXECUTORS.keys())))
+    workers = get_config_int("extension_workers", 0, "Number of workers running extensions, 0 means number of CPUs for processes and number of extensions for threads")
+    if workers <= 0:
+        workers = len(extensions) if mode == "thread" else (os.cpu_count() or 1)
+    timeout = get_config_float("extension_timeout", 300, "Seconds after which extension is reported as timed out, 0 disables timeout")
+    start = time.monotonic()
+    # workers do not inherit context of this thread, snapshot is passed to them
+    reports = EXECUTORS[mode](extensions, workers, timeout, get_snapshot())
+    for report in reports:
+        logger.info(f"Extension {report.name} took {report.duration:.2f} s{' (timed out)' if report.timed_out else ''}")
+    logger.info(f"Extensions took {time.monotonic() - start:.2f} s in {mode} executor")
+    return reports
+
 def load_extensions() -> list:
-    extension_creators = get_symbols_satisfying(is_extension)
-    with Pool() as pool:
-        reports = pool.map(get_report, extension_creators)
+    reports = run_extensions()
     result = []
     for report in sorted(reports, key=_extension_result_key):
         result.extend(report.get_elements())
-    return result
\ No newline at end of file
+    return result
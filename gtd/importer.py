@@ -33,6 +33,32 @@ class Importer(ABC):
         """
         pass
 
+    def begin_session(self):
+        """
+        Starts new import session. Importers which cache state of the service (existing
+        tasks, projects) drop it here; long running callers like the import server call
+        it before every upload.
+        """
+        pass
+
+    def create_many(self, tasks: list[dict]) -> list:
+        """
+        Create tasks, each given as dictionary of create parameters. Importers
+        able to create tasks concurrently override it.
+
+        :return: List with result of create or raised exception for each task, in order of tasks
+        """
+        results = []
+        for task in tasks:
+            try:
+                results.append(self.create(
+                    task["title"], task.get("description"), task.get("due_date"),
+                    task.get("context"), task.get("project"), task.get("checklists"),
+                ))
+            except Exception as e:
+                results.append(e)
+        return results
+
     @abstractmethod
     def create_project(self, name: str, context: str):
         """
@@ -71,4 +97,83 @@ def import_task(
         return False
     else:
         print(f"Task '{title}' created.")
-        return True
\ No newline at end of file
+        return True
+
+def import_tasks(importer: Importer, unique: bool, tasks: list[dict]) -> list[bool]:
+    """
+    Import many tasks, each given as dictionary of create parameters. Tasks are created
+    with Importer.create_many, failure of one task does not stop others. Outcome of each
+    task is printed in order of tasks.
+
+    :return: List of booleans, True if task was created or already exists
+    """
+    results = [None] * len(tasks)
+    to_create = []
+    seen = set()
+    for i, task in enumerate(tasks):
+        key = (task.get("context"), task.get("project"), task["title"])
+        if unique and (key in seen or importer.exists(
+                task["title"], task.get("description"), task.get("due_date"), task.get("context"), task.get("project"))):
+            results[i] = "exists"
+        else:
+            to_create.append(i)
+        seen.add(key)
+    for i, result in zip(to_create, importer.create_many([tasks[i] for i in to_create])):
+        results[i] = result
+    outcome = []
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"Error creating task '{task['title']}': {result}")
+            outcome.append(False)
+        elif result == "exists":
+            print(f"Task '{task['title']}' already exists.")
+            outcome.append(True)
+        else:
+            print(f"Task '{task['title']}' created.")
+            outcome.append(True)
+    return outcome
+
+def parse_tasks(lines, multiline: bool = False, checklists: bool = False, multi_checklist: bool = False) -> list[dict]:
+    """
+    Parse tasks from text lines, as accepted by gtd upload.
+
+    :param multiline: First line is title, rest is description. Tasks are separated by empty line.
+    :param checklists: Tasks are separated by empty line, lines after title starting with "*" are checklist items.
+    :param multi_checklist: In checklists mode, line "Checklist name:" starts new checklist.
+    :return: List of dictionaries with keys title, description and checklists (in checklists mode)
+    """
+    if not multiline and not checklists:
+        return [{"title": line.strip()} for line in lines if line.strip() != ""]
+    tasks = []
+    summary = ""
+    description = ""
+    my_checklists = {"Checklist": []}
+    current_checklist = "Checklist"
+
+    def add_task():
+        task = {"title": summary, "description": description}
+        if checklists:
+            task["checklists"] = my_checklists
+        tasks.append(task)
+
+    for line in lines:
+        line = line.strip()
+        if line == "":
+            if summary != "":
+                add_task()
+            summary = ""
+            description = ""
+            my_checklists = {"Checklist": []}
+            current_checklist = "Checklist"
+        elif summary == "":
+            summary = line
+        elif checklists and line.startswith("*"):
+            my_checklists[current_checklist].append(line[1:].strip())
+        elif checklists and multi_checklist and line.endswith(":"):
+            current_checklist = line[:-1].strip()
+            my_checklists.setdefault(current_checklist, [])
+        else:
+            description += line + "\n"
+    if summary != "":
+        add_task()
+    return tasks
@@ -1,11 +1,14 @@
 
 from gtd.extensions import load_extensions
 from gtd.style import *
-from gtd.config import get_config_str, get_config_bool, get_config_list
-import jira 
+from gtd.config import get_config_str, get_config_bool, get_config_list, get_config_int, get_config_float
 import datetime 
-import requests
+import threading
 import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import jira
 
 
 def get_jira_credentials():
@@ -14,17 +17,67 @@ def get_jira_credentials():
         get_config_str("jira_password", "", "Password of jira user")
     )
 
+def get_jira_timeout():
+    return (
+        get_config_float("jira_connect_timeout", 10, "Timeout in seconds for connecting to Jira"),
+        get_config_float("jira_read_timeout", 60, "Timeout in seconds for reading response from Jira")
+    )
+
+_session = None
+_client = None
+_client_created = False
+_lock = threading.Lock()
+_client_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns shared HTTP session with keep-alive connection pool used for all Jira requests.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            pool_size = get_config_int("jira_pool_size", 10, "Number of keep-alive connections kept open to Jira")
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
 def get_jira_client():
     url = get_config_str("jira_url", "", "URL of Jira instance")
     if url == "":
         return None 
-    return jira.JIRA(
+    import jira
+    client = jira.JIRA(
         url, 
         basic_auth=get_jira_credentials(),
+        timeout=get_jira_timeout(),
     )
+    # Jira client shares connection pool with the rest of Jira requests
+    for prefix, adapter in get_session().adapters.items():
+        client._session.mount(prefix, adapter)
+    return client
 
+def get_ctrl():
+    """
+    Returns Jira client, creating it on first use. Returns None if Jira URL is not configured.
+    """
+    global _client, _client_created
+    if not _client_created:
+        with _client_lock:
+            if not _client_created:
+                _client = get_jira_client()
+                _client_created = True
+    return _client
 
-ctrl = get_jira_client()
+def __getattr__(name):
+    # ctrl used to be created at import time, keep it accessible for existing plugins
+    if name == "ctrl":
+        return get_ctrl()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 def tickets(l, extended=False):
     if all([x.fields.duedate is not None for x in l]):
@@ -33,12 +86,13 @@ def tickets(l, extended=False):
 
 MAX_DEADLINES_PER_DAY = 1
 def search(jql: str, expand: bool = False): 
+    ctrl = get_ctrl()
     if ctrl is None:
         raise Exception("Jira client is not initialized")
     return ctrl.search_issues(jql, maxResults=None, expand=expand) 
 
 
-def get_stakeholders_field(epic: jira.Issue):
+def get_stakeholders_field(epic: "jira.Issue"):
     l =  epic.raw["fields"]["customfield_10038"] or []
     return [s.encode("utf-8") for s in l]
     
@@ -119,17 +173,18 @@ def graphql_call(query, **vars):
         "username": username,
         "password": password
     }
-    response = requests.post(
+    response = get_session().post(
         url=config["url"]+"/rest/graphql/1/", 
         auth=(config["username"], config["password"]), 
         json={
             'query': query,
             "variables": vars
-        })
+        },
+        timeout=get_jira_timeout())
     return response
 
 def get_free_slots(flatten: bool = False, only_once: bool = False):
-    tickets: list[jira.Issue] = search("issuetype = Task AND statuscategory != Done AND duedate < 60days AND duedate is not empty")
+    tickets: "list[jira.Issue]" = search("issuetype = Task AND statuscategory != Done AND duedate < 60days AND duedate is not empty")
     duedates = [ticket.fields.duedate for ticket in tickets]
     result = [] 
     for t in [datetime.date.today() + datetime.timedelta(days=i) for i in range(60)]:
@@ -319,6 +374,7 @@ def create_issue(summary: str, description: str = None, parent: str = None, cont
     :param duedate: The due date for the issue (if any).
     :return: The created issue.
     """
+    ctrl = get_ctrl()
     if ctrl is None:
         raise Exception("Jira client is not initialized")
     sample_task = search("filter = 'Tasks this month'")[0]
@@ -0,0 +1,314 @@
+"""
+Persisted manifest of symbols defined by plugins.
+
+Manifest is built by parsing plugin source files (plugins are not imported) and
+is stored in cache directory. Every entry is keyed by plugin file path and its
+mtime and size, so only plugins which changed are parsed again. Commands which
+only need names of importers or services answer from the manifest and import
+only the plugin which is actually used.
+"""
+import ast
+import importlib
+import importlib.machinery
+import json
+import os
+import pkgutil
+import sys
+import threading
+import logging
+
+from gtd.config import (
+    DEFAULT_PLUGINS,
+    get_cache_dir,
+    get_config_list,
+    get_disabled_plugins,
+    get_search_path,
+    plugin_search_path,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+MANIFEST_FILE_NAME = "plugin_manifest.json"
+
+def get_manifest_location():
+    return os.path.join(get_cache_dir(), MANIFEST_FILE_NAME)
+
+def _find_spec(name, search_path):
+    """
+    Finds module spec for dotted module name without importing it or its parents.
+    """
+    path = search_path
+    spec = None
+    parts = name.split(".")
+    for i in range(len(parts)):
+        spec = importlib.machinery.PathFinder.find_spec(".".join(parts[:i+1]), path)
+        if spec is None:
+            return None
+        path = spec.submodule_search_locations
+        if path is None and i < len(parts) - 1:
+            return None
+    return spec
+
+def _source_file(spec):
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin
+
+def _walk_submodules(package_name, locations):
+    for module_info in pkgutil.iter_modules(locations, package_name + "."):
+        yield module_info.name
+        if module_info.ispkg:
+            spec = _find_spec(module_info.name, locations)
+            if spec is not None and spec.submodule_search_locations:
+                yield from _walk_submodules(module_info.name, spec.submodule_search_locations)
+
+def list_plugin_files():
+    """
+    Returns dictionary mapping configured plugin names to their source files.
+    Plugins ending with ".*" are expanded by walking package directory. Plugins
+    without Python source (e.g. compiled extensions) are mapped to None.
+    """
+    search_path = get_search_path() + sys.path
+    plugins = list(DEFAULT_PLUGINS)
+    plugins += get_config_list("plugins", [], "List of plugins to load")
+    disabled_plugins = get_disabled_plugins()
+    result = {}
+    for plugin in plugins:
+        if plugin.endswith(".*"):
+            spec = _find_spec(plugin[:-2], search_path)
+            if spec is None or not spec.submodule_search_locations:
+                result[plugin] = None
+                continue
+            names = list(_walk_submodules(plugin[:-2], spec.submodule_search_locations))
+        else:
+            names = [plugin]
+        for name in names:
+            if name in disabled_plugins:
+                continue
+            result[name] = _source_file(_find_spec(name, search_path))
+    return result
+
+def _nested_bodies(node):
+    if isinstance(node, ast.If):
+        return [node.body, node.orelse]
+    if isinstance(node, ast.Try):
+        return [node.body, node.orelse]
+    return []
+
+def _collect_imports(body, imports):
+    """
+    Fills dictionary mapping names bound by imports to qualified names they refer to.
+    Names from relative imports keep leading dots.
+    """
+    for node in body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname is not None:
+                    imports[alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".")[0]
+                    imports[head] = head
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                separator = "." if node.module else ""
+                imports[alias.asname or alias.name] = module + separator + alias.name
+        for nested in _nested_bodies(node):
+            _collect_imports(nested, imports)
+
+def _resolve_name(name, imports):
+    head, dot, rest = name.partition(".")
+    if head not in imports:
+        return name
+    return imports[head] + dot + rest
+
+def _collect_definitions(body, classes, functions, imports):
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            classes[node.name] = [_resolve_name(ast.unparse(b), imports) for b in node.bases]
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(node.name)
+        for nested in _nested_bodies(node):
+            _collect_definitions(nested, classes, functions, imports)
+
+def inspect_plugin_file(path):
+    """
+    Parses plugin source and returns top level classes (with names of their base
+    classes, qualified through imports of the plugin) and functions defined in it.
+    """
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), filename=path)
+    imports = {}
+    _collect_imports(tree.body, imports)
+    classes = {}
+    functions = []
+    _collect_definitions(tree.body, classes, functions, imports)
+    return {
+        "classes": classes,
+        "functions": functions,
+    }
+
+def _qualify_base(base, plugin, entry):
+    """
+    Returns qualified name of base class as recorded in manifest entry of plugin:
+    relative imports are resolved against package of plugin and classes of the
+    plugin itself are prefixed with plugin name. Other names are returned as they are.
+    """
+    if base.startswith("."):
+        level = len(base) - len(base.lstrip("."))
+        package = plugin if os.path.basename(entry["path"]) == "__init__.py" else plugin.rpartition(".")[0]
+        parts = package.split(".") if package else []
+        if level > 1:
+            parts = parts[:-(level - 1)]
+        return ".".join(parts + [base[level:]])
+    if base in entry["classes"]:
+        return "%s.%s" % (plugin, base)
+    return base
+
+class PluginManifest:
+    """
+    Symbols of configured plugins, read from the persisted manifest and refreshed
+    for plugin files whose path, mtime or size changed.
+    """
+
+    def __init__(self, location=None):
+        self.location = location if location is not None else get_manifest_location()
+        self.entries = {}
+        self.complete = True
+
+    def _read(self):
+        try:
+            with open(self.location) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("plugins", {})
+
+    def _write(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "plugins": self.entries,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.location), exist_ok=True)
+            tmp_location = "%s.%d.tmp" % (self.location, os.getpid())
+            with open(tmp_location, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_location, self.location)
+        except OSError as e:
+            logger.warning("Could not write plugin manifest %s: %s", self.location, e)
+
+    def refresh(self):
+        """
+        Brings manifest in sync with configured plugins, parsing only plugins which changed.
+        """
+        cached = self._read()
+        entries = {}
+        changed = False
+        self.complete = True
+        for plugin, path in list_plugin_files().items():
+            if path is None:
+                logger.info("Plugin %s cannot be inspected statically", plugin)
+                self.complete = False
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.complete = False
+                continue
+            entry = cached.get(plugin)
+            if entry is not None and entry["path"] == path and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                entries[plugin] = entry
+                continue
+            try:
+                symbols = inspect_plugin_file(path)
+            except (SyntaxError, ValueError, OSError) as e:
+                logger.warning("Could not inspect plugin %s: %s", plugin, e)
+                self.complete = False
+                continue
+            entries[plugin] = {
+                "path": path,
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                **symbols,
+            }
+            changed = True
+        self.entries = entries
+        if changed or set(entries.keys()) != set(cached.keys()):
+            self._write()
+        return self
+
+    def get_classes_inheriting(self, base_class):
+        """
+        Returns list of (plugin name, class name) tuples for classes which inherit, directly
+        or through other plugin classes, from base_class.
+
+        Base classes are compared by qualified names. Class whose base only has the same
+        name as one of them (e.g. base is re-exported by another module or comes from
+        star import) is checked by importing its plugin.
+        """
+        names = {"%s.%s" % (base_class.__module__, base_class.__qualname__)}
+        plugin_classes = {"%s.%s" % (plugin, cls) for plugin, entry in self.entries.items() for cls in entry["classes"]}
+        result = []
+        found = set()
+        rejected = set()
+        while True:
+            short_names = {n.rpartition(".")[2] for n in names}
+            new = []
+            for plugin, entry in self.entries.items():
+                for cls, bases in entry["classes"].items():
+                    if (plugin, cls) in found or (plugin, cls) in rejected:
+                        continue
+                    qualified = [_qualify_base(b, plugin, entry) for b in bases]
+                    if any(q in names for q in qualified):
+                        new.append((plugin, cls))
+                    elif any(q not in plugin_classes and q.rpartition(".")[2] in short_names for q in qualified):
+                        logger.info("Importing plugin %s to check base classes of %s", plugin, cls)
+                        try:
+                            symbol = load_symbol(plugin, cls)
+                        except Exception as e:
+                            logger.warning("Could not import plugin %s: %s", plugin, e)
+                            symbol = None
+                        if isinstance(symbol, type) and issubclass(symbol, base_class):
+                            new.append((plugin, cls))
+                        else:
+                            rejected.add((plugin, cls))
+            if len(new) == 0:
+                break
+            for plugin, cls in new:
+                found.add((plugin, cls))
+                names.add("%s.%s" % (plugin, cls))
+                result.append((plugin, cls))
+        return sorted(result)
+
+    def get_functions(self, function_name):
+        """
+        Returns list of plugin names which define function with given name.
+        """
+        return sorted(plugin for plugin, entry in self.entries.items() if function_name in entry["functions"])
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+def get_manifest() -> PluginManifest:
+    """
+    Returns plugin manifest refreshed once per process.
+    """
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = PluginManifest().refresh()
+        return _manifest
+
+def load_symbol(plugin, name):
+    """
+    Imports single plugin and returns its symbol with given name.
+    """
+    with plugin_search_path():
+        module = importlib.import_module(plugin)
+    return getattr(module, name)
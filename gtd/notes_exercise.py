@@ -6,7 +6,6 @@ from gtd.drive import Spreadsheet
 import datetime
 from gtd.style import section, table, paragraph, items
 import os 
-from markdown_it import MarkdownIt
 import hashlib
 from gtd.attachments import attach_file
 import logging
@@ -24,6 +23,7 @@ except ImportError as e:
     pass
 
 def get_sections():
+    from markdown_it import MarkdownIt
     logger.info("Getting sections from notes...")
     notes_path = get_config_str("notes_path", "/data/Development/notes/", "Path to notes directory")
     notes_path = os.path.expanduser(notes_path)
@@ -1,11 +1,13 @@
 
-from jira import Issue
-import pandas as pd 
-from typing import Any
+from collections.abc import Mapping
+from typing import Any, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from jira import Issue
 
-def ticket(ticket: Issue, extended = False) -> str:
-    if not isinstance(ticket, dict):
+
+def ticket(ticket: "Issue", extended = False) -> str:
+    if not isinstance(ticket, Mapping):
         return "[<a href='%s'>%s</a>] %s (%s)%s%s" % (
             ("https://fantastic001.atlassian.net/browse/%s" % ticket.key),
             ticket.key,
@@ -58,6 +60,7 @@ def paragraph(text):
     return "<p>%s</p>" % text 
 
 def table(table_records):
+    import pandas as pd
     return pd.DataFrame(table_records).to_html(index=False, escape=False)
 
 def error(text):
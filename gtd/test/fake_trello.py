@@ -0,0 +1,607 @@
+"""
+Local stand-in for Trello REST API, for tests and benchmarks.
+
+FakeTrello keeps boards in memory and answers the endpoints gtd.trello uses (boards,
+lists, cards, checklists, actions, attachments and batch). FakeTrelloServer serves it
+over HTTP on localhost with configurable latency and rate limiting (429 responses) and
+redirect sends requests of Trello SDK to the server instead of trello.com.
+
+    trello = FakeTrello()
+    generate_board(trello, "Work", lists=10, cards=10000)
+    with FakeTrelloServer(trello, latency=0.05) as server, redirect(server.url):
+        TrelloAPI("key", "token").get_open_cards("Work")
+"""
+import bisect
+import contextlib
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+TRELLO_URL = "https://trello.com/1"
+
+LABEL_NAMES = ["This week", "Primary", "Secondary", "Help", "Waiting", "Abandoned"]
+
+# fields of type:field action filters Trello accepts
+ACTION_FILTER_FIELDS = ("closed", "desc", "idList", "name")
+
+CARD_FIELDS = (
+    "id", "name", "desc", "idBoard", "idList", "closed", "due", "dueComplete", "labels",
+    "idLabels", "idChecklists", "pos", "dateLastActivity", "shortUrl", "url",
+)
+
+class TrelloError(Exception):
+    """
+    Error answered with given HTTP status.
+    """
+
+    def __init__(self, status, message) -> None:
+        super().__init__(message)
+        self.status = status
+
+def format_date(when: datetime.datetime) -> str:
+    return when.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (when.microsecond // 1000)
+
+def _flag(value, default=False):
+    if value is None:
+        return default
+    return value not in ("false", "none", "0")
+
+def _split(value):
+    return [v for v in (value or "").split(",") if v != ""]
+
+class FakeTrello:
+    """
+    In-memory Trello. Ids are 24 hex digits starting with creation time, like Trello
+    ids, so ids of actions are ordered by time. Every change made through the API is
+    recorded as board action, so incremental sync and diff backups see it.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.counter = 0
+        self.boards = {}
+        self.lists = {}
+        self.cards = {}
+        self.checklists = {}
+        # board id -> actions, sorted by id when self.actions_sorted is True
+        self.actions = {}
+        # card id -> actions of the card, sorted like self.actions
+        self.card_actions = {}
+        # board id -> ids of sorted actions of the board, for bisecting
+        self.action_ids = {}
+        self.actions_sorted = True
+
+    def new_id(self, when=None) -> str:
+        when = when or datetime.datetime.utcnow()
+        with self.lock:
+            self.counter += 1
+            return "%08x%016x" % (int(when.replace(tzinfo=datetime.timezone.utc).timestamp()), self.counter)
+
+    def _get(self, collection, entity_id, kind):
+        entity = collection.get(entity_id)
+        if entity is None:
+            raise TrelloError(404, "%s %s not found" % (kind, entity_id))
+        return entity
+
+    def add_action(self, board_id, type, data, when=None, old=None):
+        when = when or datetime.datetime.utcnow()
+        action = {"id": self.new_id(when), "type": type, "date": format_date(when), "data": dict(data)}
+        if old is not None:
+            action["data"]["old"] = old
+        with self.lock:
+            self.actions[board_id].append(action)
+            if "card" in data:
+                self.card_actions.setdefault(data["card"]["id"], []).append(action)
+            self.actions_sorted = False
+        return action
+
+    def _sorted(self, actions, key):
+        with self.lock:
+            if not self.actions_sorted:
+                for collection in (self.actions, self.card_actions):
+                    for a in collection.values():
+                        a.sort(key=lambda a: a["id"])
+                self.action_ids = {board_id: [a["id"] for a in actions] for board_id, actions in self.actions.items()}
+                self.actions_sorted = True
+            return actions.get(key, [])
+
+    def add_board(self, name, labels=LABEL_NAMES, when=None):
+        board_id = self.new_id(when)
+        with self.lock:
+            self.boards[board_id] = {
+                "id": board_id,
+                "name": name,
+                "closed": False,
+                "url": "https://trello.com/b/%s" % board_id,
+                "labels": [{"id": self.new_id(when), "idBoard": board_id, "name": l, "color": "green"} for l in labels],
+            }
+            self.actions[board_id] = []
+        self.add_action(board_id, "createBoard", {"board": {"id": board_id, "name": name}}, when)
+        return self.boards[board_id]
+
+    def add_list(self, board_id, name, closed=False, when=None):
+        self._get(self.boards, board_id, "Board")
+        list_id = self.new_id(when)
+        with self.lock:
+            pos = 1 + sum(1 for l in self.lists.values() if l["idBoard"] == board_id)
+            self.lists[list_id] = {"id": list_id, "name": name, "closed": closed, "idBoard": board_id, "pos": pos * 16384}
+        self.add_action(board_id, "createList", {"list": {"id": list_id, "name": name}}, when)
+        return self.lists[list_id]
+
+    def add_card(self, list_id, name, desc="", due=None, labels=(), when=None, pos=None):
+        board_id = self._get(self.lists, list_id, "List")["idBoard"]
+        when = when or datetime.datetime.utcnow()
+        card_id = self.new_id(when)
+        board_labels = {l["name"]: l for l in self.boards[board_id]["labels"]}
+        card_labels = [board_labels[l] for l in labels]
+        with self.lock:
+            positions = [c["pos"] for c in self.cards.values() if c["idList"] == list_id]
+            if pos == "top":
+                pos = min(positions, default=32768) / 2
+            elif pos in (None, "bottom"):
+                pos = max(positions, default=0) + 16384
+            self.cards[card_id] = {
+                "id": card_id,
+                "name": name,
+                "desc": desc,
+                "idBoard": board_id,
+                "idList": list_id,
+                "closed": False,
+                "due": due,
+                "dueComplete": False,
+                "labels": card_labels,
+                "idLabels": [l["id"] for l in card_labels],
+                "idChecklists": [],
+                "pos": float(pos),
+                "dateLastActivity": format_date(when),
+                "shortUrl": "https://trello.com/c/%s" % card_id[-8:],
+                "url": "https://trello.com/c/%s" % card_id[-8:],
+                "attachments": [],
+            }
+        self.add_action(board_id, "createCard", {"card": {"id": card_id, "name": name}, "list": {"id": list_id}}, when)
+        return self.cards[card_id]
+
+    def update_card(self, card_id, when=None, **changes):
+        """
+        Changes fields of the card and records updateCard action with old values.
+        Moving card to another list is recorded with listBefore and listAfter.
+        """
+        card = self._get(self.cards, card_id, "Card")
+        when = when or datetime.datetime.utcnow()
+        with self.lock:
+            old = {k: card[k] for k in changes}
+            card.update(changes)
+            card["dateLastActivity"] = format_date(when)
+        data = {"card": {"id": card_id, "name": card["name"], **changes}}
+        if "idList" in changes:
+            data["listBefore"] = {"id": old["idList"]}
+            data["listAfter"] = {"id": changes["idList"]}
+        return self.add_action(card["idBoard"], "updateCard", data, when, old=old)
+
+    def add_comment(self, card_id, text, when=None):
+        card = self._get(self.cards, card_id, "Card")
+        return self.add_action(card["idBoard"], "commentCard", {"card": {"id": card_id, "name": card["name"]}, "text": text}, when)
+
+    def add_checklist(self, card_id, name, pos=None, when=None):
+        card = self._get(self.cards, card_id, "Card")
+        checklist_id = self.new_id(when)
+        with self.lock:
+            self.checklists[checklist_id] = {
+                "id": checklist_id,
+                "name": name,
+                "idBoard": card["idBoard"],
+                "idCard": card_id,
+                "pos": pos if pos is not None else (len(card["idChecklists"]) + 1) * 16384,
+                "checkItems": [],
+            }
+            card["idChecklists"].append(checklist_id)
+        self.add_action(card["idBoard"], "addChecklistToCard", {"card": {"id": card_id}, "checklist": {"id": checklist_id, "name": name}}, when)
+        return self.checklists[checklist_id]
+
+    def add_check_item(self, checklist_id, name, checked=False, pos=None, when=None):
+        checklist = self._get(self.checklists, checklist_id, "Checklist")
+        item = {
+            "id": self.new_id(when),
+            "idChecklist": checklist_id,
+            "name": name,
+            "state": "complete" if checked else "incomplete",
+            "pos": pos if pos is not None else (len(checklist["checkItems"]) + 1) * 16384,
+        }
+        with self.lock:
+            checklist["checkItems"].append(item)
+        self.add_action(checklist["idBoard"], "createCheckItem", {"card": {"id": checklist["idCard"]}, "checklist": {"id": checklist_id}, "checkItem": item}, when)
+        return item
+
+    def add_attachment(self, card_id, name, mime_type="text/plain", when=None):
+        card = self._get(self.cards, card_id, "Card")
+        when = when or datetime.datetime.utcnow()
+        attachment = {
+            "id": self.new_id(when),
+            "name": name,
+            "mimeType": mime_type,
+            "date": format_date(when),
+            "url": "https://trello.com/1/cards/%s/attachments/%s" % (card_id, name),
+        }
+        with self.lock:
+            card["attachments"].append(attachment)
+        self.add_action(card["idBoard"], "addAttachmentToCard", {"card": {"id": card_id}, "attachment": attachment}, when)
+        return attachment
+
+    # Trello API
+
+    def _card(self, card, fields=None, attachments=False):
+        names = CARD_FIELDS if fields in (None, "all") else ["id"] + _split(fields)
+        result = {k: card[k] for k in names if k in card}
+        if attachments:
+            result["attachments"] = list(card["attachments"])
+        return result
+
+    def _cards(self, board_id, filter):
+        cards = [c for c in self.cards.values() if c["idBoard"] == board_id]
+        if filter in (None, "open", "visible"):
+            return [c for c in cards if not c["closed"] and not self.lists[c["idList"]]["closed"]]
+        if filter == "closed":
+            return [c for c in cards if c["closed"]]
+        return cards
+
+    def _lists(self, board_id, filter):
+        lists = [l for l in self.lists.values() if l["idBoard"] == board_id]
+        if filter in (None, "open"):
+            return [l for l in lists if not l["closed"]]
+        if filter == "closed":
+            return [l for l in lists if l["closed"]]
+        return lists
+
+    def _check_filters(self, filters):
+        """
+        :raises TrelloError: If action filter has field Trello does not accept
+        """
+        for f in filters:
+            field = f.partition(":")[2]
+            if field != "" and field not in ACTION_FILTER_FIELDS:
+                raise TrelloError(400, "invalid value for filter: %s" % f)
+        return filters
+
+    def _matches(self, action, filters):
+        """
+        Action filter is a list of types, type:field matches update actions changing the field.
+        """
+        for f in filters:
+            type, _, field = f.partition(":")
+            if action["type"] == type and (field == "" or field in action["data"].get("old", {})):
+                return True
+        return False
+
+    def get_member_boards(self, params, member):
+        return [{k: v for k, v in b.items() if k != "labels"} for b in self.boards.values()]
+
+    def get_board(self, params, board_id):
+        board = dict(self._get(self.boards, board_id, "Board"))
+        if params.get("labels") in (None, "none"):
+            board.pop("labels")
+        if params.get("cards") not in (None, "none"):
+            board["cards"] = [self._card(c, params.get("card_fields"), _flag(params.get("card_attachments"))) for c in self._cards(board_id, params["cards"])]
+        if params.get("lists") not in (None, "none"):
+            board["lists"] = self._lists(board_id, params["lists"])
+        if params.get("checklists") not in (None, "none"):
+            board["checklists"] = self.get_board_checklists(params, board_id)
+        return board
+
+    def get_board_cards(self, params, board_id):
+        self._get(self.boards, board_id, "Board")
+        cards = self._cards(board_id, params.get("filter"))
+        if params.get("before") is not None:
+            cards = [c for c in cards if c["id"] < params["before"]]
+        if params.get("limit") is not None:
+            # Trello pages cards from the newest
+            cards = sorted(cards, key=lambda c: c["id"], reverse=True)[:int(params["limit"])]
+        return [self._card(c, params.get("fields"), _flag(params.get("attachments"))) for c in cards]
+
+    def get_board_lists(self, params, board_id):
+        self._get(self.boards, board_id, "Board")
+        return self._lists(board_id, params.get("filter"))
+
+    def get_board_checklists(self, params, board_id):
+        self._get(self.boards, board_id, "Board")
+        return [c for c in self.checklists.values() if c["idBoard"] == board_id]
+
+    def get_board_actions(self, params, board_id):
+        self._get(self.boards, board_id, "Board")
+        filters = self._check_filters(_split(params.get("filter")))
+        result = []
+        limit = int(params.get("limit", 50))
+        with self.lock:
+            actions = list(self._sorted(self.actions, board_id))
+            ids = self.action_ids[board_id]
+        end = len(actions) if params.get("before") is None else bisect.bisect_left(ids, params["before"])
+        start = 0 if params.get("since") is None else bisect.bisect_right(ids, params["since"])
+        # newest first
+        for i in range(end - 1, start - 1, -1):
+            action = actions[i]
+            if len(filters) == 0 or "all" in filters or self._matches(action, filters):
+                result.append(action)
+                if len(result) == limit:
+                    break
+        return result
+
+    def get_card(self, params, card_id):
+        card = self._get(self.cards, card_id, "Card")
+        result = self._card(card, params.get("fields"), _flag(params.get("attachments")))
+        if params.get("actions") not in (None, "none"):
+            filters = self._check_filters(_split(params["actions"]))
+            actions = self._sorted(self.card_actions, card_id)
+            result["actions"] = [a for a in reversed(actions) if "all" in filters or self._matches(a, filters)]
+        return result
+
+    def get_card_attachments(self, params, card_id):
+        return list(self._get(self.cards, card_id, "Card")["attachments"])
+
+    def get_list(self, params, list_id):
+        return self._get(self.lists, list_id, "List")
+
+    def get_checklist(self, params, checklist_id):
+        return self._get(self.checklists, checklist_id, "Checklist")
+
+    def get_batch(self, params):
+        """
+        Answers every URL of the batch, like Trello: {"200": body} or {status: error}.
+        """
+        result = []
+        for url in _split(params.get("urls")):
+            parts = urlsplit(url)
+            try:
+                status, body = 200, self.handle("GET", parts.path, dict(parse_qsl(parts.query)))
+            except TrelloError as e:
+                status, body = e.status, {"message": str(e)}
+            result.append({str(status): body})
+        return result
+
+    def post_list(self, params):
+        return self.add_list(params["idBoard"], params["name"])
+
+    def post_card(self, params):
+        labels = [l["name"] for l in self.boards[self._get(self.lists, params["idList"], "List")["idBoard"]]["labels"] if l["id"] in _split(params.get("idLabels"))]
+        return self._card(self.add_card(params["idList"], params["name"], params.get("desc", ""), params.get("due"), labels, pos=params.get("pos")))
+
+    def post_card_attachment(self, params, card_id):
+        return self.add_attachment(card_id, params.get("name", "file"), params.get("mimeType", "text/plain"))
+
+    def post_checklist(self, params):
+        pos = params.get("pos")
+        return self.add_checklist(params["idCard"], params.get("name", "Checklist"), float(pos) if pos not in (None, "top", "bottom") else None)
+
+    def post_check_item(self, params, checklist_id):
+        pos = params.get("pos")
+        return self.add_check_item(checklist_id, params["name"], _flag(params.get("checked")), float(pos) if pos not in (None, "top", "bottom") else None)
+
+    def delete_card_label(self, params, card_id, label_id):
+        card = self._get(self.cards, card_id, "Card")
+        if label_id not in card["idLabels"]:
+            raise TrelloError(400, "Label %s is not on card %s" % (label_id, card_id))
+        self.update_card(
+            card_id,
+            labels=[l for l in card["labels"] if l["id"] != label_id],
+            idLabels=[l for l in card["idLabels"] if l != label_id],
+        )
+        return {"_value": None}
+
+    ROUTES = [
+        ("GET", r"/members/([^/]+)/boards", "get_member_boards"),
+        ("GET", r"/boards/([^/]+)", "get_board"),
+        ("GET", r"/boards/([^/]+)/cards", "get_board_cards"),
+        ("GET", r"/boards/([^/]+)/lists", "get_board_lists"),
+        ("GET", r"/boards/([^/]+)/checklists", "get_board_checklists"),
+        ("GET", r"/boards/([^/]+)/actions", "get_board_actions"),
+        ("GET", r"/cards/([^/]+)", "get_card"),
+        ("GET", r"/cards/([^/]+)/attachments", "get_card_attachments"),
+        ("GET", r"/lists/([^/]+)", "get_list"),
+        ("GET", r"/checklists/([^/]+)", "get_checklist"),
+        ("GET", r"/batch", "get_batch"),
+        ("POST", r"/lists", "post_list"),
+        ("POST", r"/cards", "post_card"),
+        ("POST", r"/cards/([^/]+)/attachments", "post_card_attachment"),
+        ("POST", r"/checklists", "post_checklist"),
+        ("POST", r"/checklists/([^/]+)/checkItems", "post_check_item"),
+        ("DELETE", r"/cards/([^/]+)/idLabels/([^/]+)", "delete_card_label"),
+    ]
+
+    def route(self, method, path):
+        """
+        Returns name of the handler of the request and arguments parsed from its path.
+
+        :raises TrelloError: If endpoint is not implemented
+        """
+        path = path[len("/1"):] if path.startswith("/1/") else path
+        for route_method, pattern, name in self.ROUTES:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match is not None:
+                return name, match.groups()
+        raise TrelloError(404, "Endpoint %s %s is not implemented" % (method, path))
+
+    def handle(self, method, path, params):
+        """
+        Answers request, returns body of the response.
+
+        :raises TrelloError: If request fails
+        """
+        name, args = self.route(method, path)
+        try:
+            return getattr(self, name)(params, *args)
+        except KeyError as e:
+            raise TrelloError(400, "Missing parameter %s" % e)
+
+def generate_board(trello: FakeTrello, name="Board", lists=10, cards=1000, closed_lists=1, comments=2, days=365, seed=0, now=None):
+    """
+    Generates board with open and closed lists and cards with history spread over last
+    days: cards are created, moved between lists, commented, get due dates, labels,
+    checklists and attachments and some are completed or archived. Every change is
+    recorded as board action, like in Trello.
+
+    :param comments: Average number of comments per card
+    :return: Generated board
+    """
+    rng = random.Random(seed)
+    now = now or datetime.datetime.utcnow()
+    start = now - datetime.timedelta(days=days)
+    board = trello.add_board(name, when=start)
+    open_lists = [trello.add_list(board["id"], "List %d" % i, when=start) for i in range(lists)]
+    for i in range(closed_lists):
+        trello.add_list(board["id"], "Closed list %d" % i, closed=True, when=start)
+    for i in range(cards):
+        created = start + datetime.timedelta(seconds=rng.uniform(0, days * 86400))
+        labels = [l for l in LABEL_NAMES[:-1] if rng.random() < 0.15]
+        if rng.random() < 0.02:
+            labels.append(LABEL_NAMES[-1])
+        due = format_date(created + datetime.timedelta(days=rng.randint(1, 60))) if rng.random() < 0.4 else None
+        card = trello.add_card(rng.choice(open_lists)["id"], "Card %d" % i, "Description of card %d" % i, due, labels, when=created)
+        when = created
+        # events of the card in order of time
+        for _ in range(rng.randint(0, 3)):
+            when = min(now, when + datetime.timedelta(hours=rng.uniform(1, 24 * 14)))
+            trello.update_card(card["id"], when, idList=rng.choice(open_lists)["id"])
+        for _ in range(rng.randint(0, 2 * comments)):
+            when = min(now, when + datetime.timedelta(hours=rng.uniform(1, 24 * 7)))
+            trello.add_comment(card["id"], "Comment on card %d" % i, when)
+        if rng.random() < 0.3:
+            checklist = trello.add_checklist(card["id"], "Checklist", when=when)
+            for j in range(rng.randint(1, 6)):
+                trello.add_check_item(checklist["id"], "Item %d" % j, rng.random() < 0.5, when=when)
+        if rng.random() < 0.1:
+            trello.add_attachment(card["id"], "notes.md", when=when)
+        closing = rng.random()
+        when = min(now, when + datetime.timedelta(hours=rng.uniform(1, 24 * 30)))
+        if closing < 0.3:
+            trello.update_card(card["id"], when, closed=True)
+        elif closing < 0.4:
+            trello.update_card(card["id"], when, dueComplete=True)
+    return board
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def _respond(self):
+        self.server.fake_server.respond(self)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeTrelloServer:
+    """
+    Serves FakeTrello over HTTP on localhost in background threads, request per thread.
+
+    :param trello: FakeTrello answering requests, empty one if not provided
+    :param latency: Seconds every request waits before it is answered
+    :param throttle_every: Every n-th request is answered with 429, 0 never throttles
+    :param retry_after: Value of Retry-After header of 429 responses, None omits it
+    """
+
+    def __init__(self, trello=None, latency=0.0, throttle_every=0, retry_after=0) -> None:
+        self.trello = trello if trello is not None else FakeTrello()
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        # requests per handler name, throttled ones included
+        self.requests = Counter()
+        self.throttled = 0
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:%d/1" % self.httpd.server_address[1]
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.requests.values())
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake_server = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _read_params(self, handler):
+        parts = urlsplit(handler.path)
+        params = dict(parse_qsl(parts.query))
+        length = int(handler.headers.get("Content-Length") or 0)
+        if length > 0:
+            body = handler.rfile.read(length).decode("utf-8")
+            if handler.headers.get("Content-Type", "").startswith("application/json"):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body))
+        return parts.path, params
+
+    def respond(self, handler):
+        path, params = self._read_params(handler)
+        if self.latency > 0:
+            time.sleep(self.latency)
+        headers = {}
+        try:
+            name, _ = self.trello.route(handler.command, path)
+        except TrelloError:
+            name = "unknown"
+        with self.lock:
+            self.requests[name] += 1
+            throttle = self.throttle_every > 0 and self.request_count % self.throttle_every == 0
+            if throttle:
+                self.throttled += 1
+        if throttle:
+            status, body = 429, {"error": "API_TOKEN_LIMIT_EXCEEDED", "message": "Rate limit exceeded"}
+            if self.retry_after is not None:
+                headers["Retry-After"] = str(self.retry_after)
+        else:
+            try:
+                status, body = 200, self.trello.handle(handler.command, path, params)
+            except TrelloError as e:
+                status, body = e.status, {"message": str(e)}
+        data = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+@contextlib.contextmanager
+def redirect(url):
+    """
+    Sends requests made with requests module to Trello API to given URL instead, so
+    unmodified Trello SDK talks to FakeTrelloServer.
+    """
+    original = requests.api.request
+
+    def request(method, request_url, **kwargs):
+        if request_url.startswith(TRELLO_URL):
+            request_url = url + request_url[len(TRELLO_URL):]
+            # local server must not go through proxy from environment
+            kwargs["proxies"] = {"http": None, "https": None}
+        return original(method, request_url, **kwargs)
+
+    with patch("requests.api.request", request):
+        yield
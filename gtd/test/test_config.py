@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gtd.config as config
+
+
+class TestConfigSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "gtd.json")
+        self.write({"trello_board": "Work", "trello_boards": ["A", "B"], "limit": "3"})
+        env_patch = patch.dict(os.environ, {"GTD_CONFIG": self.path})
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        for key in list(os.environ):
+            if key.startswith("GTD_") and key != "GTD_CONFIG":
+                del os.environ[key]
+        config.invalidate_config()
+        self.addCleanup(config.invalidate_config)
+
+    def write(self, data):
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+    def test_file_is_parsed_once(self):
+        before = config.get_config_parse_count()
+        self.assertEqual(config.get_config_str("trello_board", "", ""), "Work")
+        self.assertEqual(config.get_config_list("trello_boards", [], ""), ["A", "B"])
+        self.assertEqual(config.get_config_int("limit", 0, ""), 3)
+        self.assertEqual(config.get_config_str("missing", "default", ""), "default")
+        self.assertEqual(config.get_config_parse_count() - before, 1)
+
+    def test_returned_values_do_not_change_snapshot(self):
+        boards = config.get_config_list("trello_boards", [], "")
+        boards.append("C")
+        self.assertEqual(config.get_config_list("trello_boards", [], ""), ["A", "B"])
+
+    def test_file_change_invalidates_snapshot(self):
+        config.get_config_str("trello_board", "", "")
+        before = config.get_config_parse_count()
+        self.write({"trello_board": "Personal board"})
+        self.assertEqual(config.get_config_str("trello_board", "", ""), "Personal board")
+        self.assertEqual(config.get_config_parse_count() - before, 1)
+
+    def test_set_config_is_visible(self):
+        config.get_config_str("trello_board", "", "")
+        config.set_config("trello_board", "Home")
+        self.assertEqual(config.get_config_str("trello_board", "", ""), "Home")
+
+    def test_environment_overrides_file(self):
+        with patch.dict(os.environ, {"GTD_TRELLO_BOARD": "Env", "GTD_FLAG": "yes"}):
+            self.assertEqual(config.get_config_str("trello_board", "", ""), "Env")
+            self.assertTrue(config.get_config_bool("flag", False, ""))
+
+
+PLUGIN_SOURCE = """
+import builtins
+builtins.gtd_test_plugin_imports = getattr(builtins, "gtd_test_plugin_imports", 0) + 1
+
+from gtd.extensions import ReportService
+
+class SampleService(ReportService):
+    def provide(self):
+        return []
+
+def add_extensions(report):
+    report.add("sample")
+"""
+
+
+class TestPluginRegistry(unittest.TestCase):
+
+    def setUp(self):
+        import builtins
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        with open(os.path.join(self.tmpdir.name, "gtd_test_plugin.py"), "w") as f:
+            f.write(PLUGIN_SOURCE)
+        env_patch = patch.dict(os.environ, {
+            "GTD_PLUGIN_SEARCH_PATH": self.tmpdir.name,
+            "GTD_PLUGINS": "gtd_test_plugin",
+        })
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        self.addCleanup(lambda: sys.modules.pop("gtd_test_plugin", None))
+        builtins.gtd_test_plugin_imports = 0
+        self.registry = config.PluginRegistry()
+
+    def test_plugins_are_loaded_once(self):
+        import builtins
+        from gtd.extensions import ReportService
+        for _ in range(3):
+            self.registry.plugins()
+            self.registry.get_classes_inheriting(ReportService)
+            self.registry.get_symbols_named("add_extensions")
+        self.assertEqual(builtins.gtd_test_plugin_imports, 1)
+        self.assertNotIn(self.tmpdir.name, sys.path)
+
+    def test_symbols_are_indexed(self):
+        from gtd.extensions import ReportService
+        services = self.registry.get_classes_inheriting(ReportService)
+        self.assertEqual([s.__name__ for s in services], ["SampleService"])
+        extensions = self.registry.get_symbols_named("add_extensions")
+        self.assertEqual(len(extensions), 1)
+        self.assertEqual(self.registry.get_symbols_named("generate_report"), [])
+
+    def test_reload_imports_plugins_again(self):
+        import builtins
+        self.registry.plugins()
+        self.registry.reload()
+        self.assertEqual(builtins.gtd_test_plugin_imports, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from gtd import config
+import gtd.extensions as mod
+
+
+FAST_PLUGIN_SOURCE = """
+from gtd.style import paragraph
+
+def add_extensions(report):
+    report.add(paragraph("fast extension"))
+"""
+
+HUNG_PLUGIN_SOURCE = """
+import time
+from gtd.style import paragraph
+
+def add_extensions(report):
+    time.sleep(30)
+    report.add(paragraph("hung extension"))
+"""
+
+CRASHING_PLUGIN_SOURCE = """
+import os
+
+def add_extensions(report):
+    os._exit(3)
+"""
+
+SNAPSHOT_PLUGIN_SOURCE = """
+from gtd.extensions import get_snapshot
+from gtd.style import paragraph
+
+def add_extensions(report):
+    report.add(paragraph("snapshot %s" % get_snapshot()))
+"""
+
+
+class TestRunExtensions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for name, source in [("gtd_test_fast", FAST_PLUGIN_SOURCE), ("gtd_test_hung", HUNG_PLUGIN_SOURCE), ("gtd_test_crashing", CRASHING_PLUGIN_SOURCE), ("gtd_test_snapshot", SNAPSHOT_PLUGIN_SOURCE)]:
+            with open(os.path.join(self.tmpdir.name, name + ".py"), "w") as f:
+                f.write(source)
+            self.addCleanup(lambda name=name: sys.modules.pop(name, None))
+        self.env = {
+            "GTD_PLUGIN_SEARCH_PATH": self.tmpdir.name,
+            "GTD_PLUGINS": "gtd_test_fast",
+        }
+        registry_patch = patch.object(mod, "get_plugin_registry", side_effect=lambda: config.PluginRegistry())
+        registry_patch.start()
+        self.addCleanup(registry_patch.stop)
+
+    def run_extensions(self, **env):
+        with patch.dict(os.environ, {**self.env, **env}):
+            return mod.run_extensions()
+
+    def test_inline_executor(self):
+        reports = self.run_extensions(GTD_EXTENSION_EXECUTOR="inline")
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0].name, "gtd_test_fast.add_extensions")
+        self.assertFalse(reports[0].timed_out)
+        self.assertIsNotNone(reports[0].duration)
+        self.assertIn("fast extension", str(reports[0].get_elements()))
+
+    def test_thread_executor_times_out_hung_extension(self):
+        start = time.monotonic()
+        reports = self.run_extensions(
+            GTD_EXTENSION_EXECUTOR="thread",
+            GTD_EXTENSION_TIMEOUT="0.5",
+            GTD_PLUGINS="gtd_test_fast gtd_test_hung",
+        )
+        self.assertLess(time.monotonic() - start, 10)
+        by_name = {r.name: r for r in reports}
+        self.assertFalse(by_name["gtd_test_fast.add_extensions"].timed_out)
+        self.assertTrue(by_name["gtd_test_hung.add_extensions"].timed_out)
+        self.assertIn("timed out", str(by_name["gtd_test_hung.add_extensions"].get_elements()))
+
+    def test_process_executor_times_out_hung_extension(self):
+        start = time.monotonic()
+        reports = self.run_extensions(
+            GTD_EXTENSION_EXECUTOR="process",
+            GTD_EXTENSION_TIMEOUT="2",
+            GTD_EXTENSION_WORKERS="2",
+            GTD_PLUGINS="gtd_test_fast gtd_test_hung",
+        )
+        self.assertLess(time.monotonic() - start, 20)
+        by_name = {r.name: r for r in reports}
+        self.assertIn("fast extension", str(by_name["gtd_test_fast.add_extensions"].get_elements()))
+        self.assertTrue(by_name["gtd_test_hung.add_extensions"].timed_out)
+
+    def test_process_executor_starts_timeout_when_extension_starts(self):
+        reports = self.run_extensions(
+            GTD_EXTENSION_EXECUTOR="process",
+            GTD_EXTENSION_TIMEOUT="2",
+            GTD_EXTENSION_WORKERS="1",
+            GTD_PLUGINS="gtd_test_hung gtd_test_fast",
+        )
+        by_name = {r.name: r for r in reports}
+        self.assertTrue(by_name["gtd_test_hung.add_extensions"].timed_out)
+        self.assertFalse(by_name["gtd_test_fast.add_extensions"].timed_out)
+        self.assertIn("fast extension", str(by_name["gtd_test_fast.add_extensions"].get_elements()))
+
+    def test_process_executor_reports_crashed_extension(self):
+        reports = self.run_extensions(
+            GTD_EXTENSION_EXECUTOR="process",
+            GTD_PLUGINS="gtd_test_fast gtd_test_crashing",
+        )
+        by_name = {r.name: r for r in reports}
+        self.assertIn("fast extension", str(by_name["gtd_test_fast.add_extensions"].get_elements()))
+        crashed = by_name["gtd_test_crashing.add_extensions"]
+        self.assertIn("exited with code 3", str(crashed.get_elements()))
+        self.assertIsNotNone(crashed.duration)
+
+    def test_snapshot_is_passed_to_workers_for_the_block_only(self):
+        for executor in ("thread", "process"):
+            with mod.using_snapshot("/backups/trello.ndjson.gz"):
+                reports = self.run_extensions(GTD_EXTENSION_EXECUTOR=executor, GTD_PLUGINS="gtd_test_snapshot")
+            self.assertIn("snapshot /backups/trello.ndjson.gz", str(reports[0].get_elements()), executor)
+            self.assertIsNone(mod.get_snapshot())
+            reports = self.run_extensions(GTD_EXTENSION_EXECUTOR=executor, GTD_PLUGINS="gtd_test_snapshot")
+            self.assertIn("snapshot None", str(reports[0].get_elements()), executor)
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            self.run_extensions(GTD_EXTENSION_EXECUTOR="cluster")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gtd.trello as mod
+from gtd.test.fake_trello import FakeTrello, FakeTrelloServer, generate_board, redirect
+from gtd.trello import backup
+from gtd.trello.store import CardStore, closure_dates_from_actions
+from gtd.utils import TokenBucket
+
+
+class TestFakeTrello(unittest.TestCase):
+    """
+    Runs unmodified TrelloAPI and Trello SDK against FakeTrelloServer.
+    """
+
+    def setUp(self):
+        self.trello = FakeTrello()
+        self.board = generate_board(self.trello, "Work", lists=3, cards=60, seed=1)
+        self.server = FakeTrelloServer(self.trello).start()
+        self.addCleanup(self.server.stop)
+        for cm in (
+            redirect(self.server.url),
+            patch.object(mod, "_rate_limiter", TokenBucket(0, 1)),
+            patch.object(mod.backoff, "base_delay", 0),
+            patch.dict(os.environ, {"GTD_TRELLO_BOARD": "Work", "GTD_TRELLO_APIKEY": "key", "GTD_TRELLO_TOKEN": "token", "GTD_TRELLO_STORE": ""}),
+        ):
+            cm.__enter__()
+            self.addCleanup(cm.__exit__, None, None, None)
+        self.api = mod.TrelloAPI()
+
+    def fake_cards(self, closed):
+        cards = {c["id"] for c in self.trello.cards.values() if (c["closed"] or c["dueComplete"]) == closed}
+        if closed:
+            # abandoned cards are not reported as closed
+            cards -= {c["id"] for c in self.trello.cards.values() if "Abandoned" in [l["name"] for l in c["labels"]]}
+        return cards
+
+    def trello_list(self, name):
+        return next(l for l in self.trello.lists.values() if l["name"] == name and l["idBoard"] == self.board["id"])
+
+    def test_reads_generated_board(self):
+        open_cards = self.api.get_open_cards()
+        closed_cards = self.api.get_closed_cards()
+        self.assertEqual({c["id"] for c in open_cards}, self.fake_cards(False))
+        self.assertEqual({c["id"] for c in closed_cards}, self.fake_cards(True))
+        expected = closure_dates_from_actions(self.trello.actions[self.board["id"]])
+        self.assertEqual(self.api.get_closure_dates(closed_cards), {c["id"]: expected[c["id"]] for c in closed_cards})
+
+        self.api.prefetch_card_details(open_cards)
+        requests = self.server.request_count
+        for card in open_cards:
+            comments = self.api.get_comments(card)
+            self.assertEqual([c["date"] for c in comments], sorted((c["date"] for c in comments), reverse=True))
+            self.assertEqual(self.api.get_attachments(card), self.trello.cards[card["id"]]["attachments"])
+        self.assertEqual(self.server.request_count, requests)
+        self.assertEqual(self.server.requests["get_card"], 0)
+
+    def test_throttled_requests_are_retried(self):
+        self.server.throttle_every = 2
+        self.assertEqual(len(self.api.get_lists()), 3)
+        self.assertEqual(len(self.api.get_open_cards()), len(self.fake_cards(False)))
+        self.assertGreater(self.server.throttled, 0)
+
+    def test_upload_and_incremental_sync(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = CardStore(os.path.join(tmpdir, "trello.sqlite"))
+            self.addCleanup(store.close)
+            store.sync(self.api.api, self.board["id"])
+            backup.write_full_backup(self.api.api, [self.board["id"]], os.path.join(tmpdir, "full.ndjson.gz"))
+
+            importer = mod.TrelloImporter()
+            results = importer.create_many([
+                {"title": "New task", "description": "", "project": "List 0", "checklists": {"Steps": ["one", "two", "three"]}},
+                {"title": "Other task", "description": "", "project": "New list"},
+            ])
+            self.assertTrue(all(isinstance(r, str) for r in results))
+            card = next(c for c in self.trello.cards.values() if c["name"] == "New task")
+            checklist = self.trello.checklists[card["idChecklists"][0]]
+            self.assertEqual([i["name"] for i in sorted(checklist["checkItems"], key=lambda i: i["pos"])], ["one", "two", "three"])
+
+            store.sync(self.api.api, self.board["id"])
+            names = {c["name"] for c in store.get_snapshot(self.board["id"]).get_visible_cards()}
+            self.assertTrue({"New task", "Other task"} <= names)
+            backup.write_diff_backup(self.api.api, [self.board["id"]], os.path.join(tmpdir, "diff.ndjson.gz"), os.path.join(tmpdir, "full.ndjson.gz"))
+            records = list(backup.iter_records(os.path.join(tmpdir, "diff.ndjson.gz")))
+            self.assertEqual({r["data"]["name"] for r in records if r["type"] == "card"}, {"New task", "Other task"})
+            self.assertIn("New list", {r["data"]["name"] for r in records if r["type"] == "list"})
+
+    def test_uploaded_cards_keep_order_of_tasks_on_the_list(self):
+        existing = [c["id"] for c in self.trello.cards.values() if c["idList"] == self.trello_list("List 0")["id"]]
+        results = mod.TrelloImporter().create_many([{"title": "T%02d" % i, "description": "", "project": "List 0"} for i in range(16)])
+        self.assertTrue(all(isinstance(r, str) for r in results))
+        cards = sorted((c for c in self.trello.cards.values() if c["idList"] == self.trello_list("List 0")["id"]), key=lambda c: c["pos"])
+        self.assertEqual([c["id"] for c in cards[:len(existing)]], sorted(existing, key=lambda i: self.trello.cards[i]["pos"]))
+        self.assertEqual([c["name"] for c in cards[len(existing):]], ["T%02d" % i for i in range(16)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from gtd.importer import Importer, import_tasks, parse_tasks
+
+
+class MemoryImporter(Importer):
+
+    def __init__(self, existing=(), failing=()):
+        self.existing = set(existing)
+        self.failing = set(failing)
+        self.created = []
+
+    def create(self, title, description, due_date=None, context=None, project=None, checklists=None):
+        if title in self.failing:
+            raise ValueError("Cannot create %s" % title)
+        self.created.append(title)
+        return title
+
+    def exists(self, title, description=None, due_date=None, context=None, project=None):
+        return title in self.existing
+
+    def create_project(self, name, context=None):
+        pass
+
+    def list_projects(self, context=None):
+        return ["Inbox"]
+
+
+class TestParseTasks(unittest.TestCase):
+
+    def test_one_task_per_line(self):
+        self.assertEqual(parse_tasks(io.StringIO("A\n\n B \n")), [{"title": "A"}, {"title": "B"}])
+
+    def test_multiline(self):
+        text = "A\nfirst\nsecond\n\n\nB\n"
+        self.assertEqual(parse_tasks(io.StringIO(text), multiline=True), [
+            {"title": "A", "description": "first\nsecond\n"},
+            {"title": "B", "description": ""},
+        ])
+
+    def test_checklists(self):
+        text = "A\n* one\nnote\nSteps:\n* two\n\nB\n* three\n"
+        self.assertEqual(parse_tasks(io.StringIO(text), checklists=True, multi_checklist=True), [
+            {"title": "A", "description": "note\n", "checklists": {"Checklist": ["one"], "Steps": ["two"]}},
+            {"title": "B", "description": "", "checklists": {"Checklist": ["three"]}},
+        ])
+        tasks = parse_tasks(io.StringIO(text), checklists=True)
+        self.assertEqual(tasks[0]["description"], "note\nSteps:\n")
+        self.assertEqual(tasks[0]["checklists"], {"Checklist": ["one", "two"]})
+
+
+class TestImportTasks(unittest.TestCase):
+
+    def test_failures_do_not_stop_batch(self):
+        importer = MemoryImporter(existing=["Old"], failing=["Bad"])
+        tasks = [{"title": t, "project": "Inbox"} for t in ["A", "Old", "Bad", "A", "B"]]
+        with patch("builtins.print") as print_mock:
+            results = import_tasks(importer, True, tasks)
+        self.assertEqual(results, [True, True, False, True, True])
+        self.assertEqual(importer.created, ["A", "B"])
+        self.assertEqual([c.args[0] for c in print_mock.call_args_list], [
+            "Task 'A' created.",
+            "Task 'Old' already exists.",
+            "Error creating task 'Bad': Cannot create Bad",
+            "Task 'A' already exists.",
+            "Task 'B' created.",
+        ])
+
+    def test_duplicates_are_created_when_not_unique(self):
+        importer = MemoryImporter()
+        with patch("builtins.print"):
+            import_tasks(importer, False, [{"title": "A"}, {"title": "A"}])
+        self.assertEqual(importer.created, ["A", "A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+import gtd.jira as mod
+
+
+class TestJiraClient(unittest.TestCase):
+
+    def setUp(self):
+        env_patch = patch.dict(os.environ, {
+            "GTD_JIRA_URL": "https://jira.example.invalid",
+            "GTD_JIRA_GRAPHQL_URL": "https://jira.example.invalid",
+        })
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        state_patch = patch.multiple(mod, _client=None, _client_created=False, _session=None)
+        state_patch.start()
+        self.addCleanup(state_patch.stop)
+
+    def test_client_is_created_lazily_once(self):
+        with patch("jira.JIRA") as MockJIRA:
+            MockJIRA.return_value._session = MagicMock()
+            MockJIRA.assert_not_called()
+            self.assertIs(mod.ctrl, mod.get_ctrl())
+            self.assertEqual(MockJIRA.call_count, 1)
+
+    def test_client_and_graphql_share_connection_pool(self):
+        session = mod.get_session()
+        with patch("jira.JIRA") as MockJIRA:
+            client_session = MagicMock()
+            MockJIRA.return_value._session = client_session
+            mod.get_ctrl()
+        mounted = {c.args[0]: c.args[1] for c in client_session.mount.call_args_list}
+        self.assertIs(mounted["https://"], session.adapters["https://"])
+        with patch.object(session, "post") as post:
+            mod.graphql_call("query { x }", a=1)
+            self.assertEqual(post.call_args.kwargs["timeout"], mod.get_jira_timeout())
+
+    def test_missing_url_disables_client(self):
+        with patch.dict(os.environ, {"GTD_JIRA_URL": ""}):
+            self.assertIsNone(mod.get_ctrl())
+            with self.assertRaises(Exception):
+                mod.search("project = GTD")
+
+
+if __name__ == "__main__":
+    unittest.main()
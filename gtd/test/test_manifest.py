@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gtd.manifest as manifest
+from gtd.extensions import ReportService
+from gtd.importer import Importer
+
+
+PLUGIN_SOURCE = """
+raise ImportError("plugin must not be imported while building manifest")
+
+from gtd.importer import Importer
+from gtd.extensions import ReportService
+
+class BaseService(ReportService):
+    pass
+
+class DerivedService(BaseService):
+    pass
+
+class FileImporter(Importer):
+    pass
+
+def add_extensions(report):
+    pass
+"""
+
+REEXPORT_PLUGIN_SOURCE = """
+import gtd.importer
+import gtd.command_executor as executor
+
+class Importer:
+    pass
+
+class QualifiedImporter(gtd.importer.Importer):
+    pass
+
+class ReexportedImporter(executor.Importer):
+    pass
+
+class LookalikeImporter(Importer):
+    pass
+"""
+
+
+class TestPluginManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.plugin_path = os.path.join(self.tmpdir.name, "gtd_manifest_plugin.py")
+        with open(self.plugin_path, "w") as f:
+            f.write(PLUGIN_SOURCE)
+        env_patch = patch.dict(os.environ, {
+            "GTD_PLUGIN_SEARCH_PATH": self.tmpdir.name,
+            "GTD_PLUGINS": "gtd_manifest_plugin",
+            "GTD_CACHE_DIR": os.path.join(self.tmpdir.name, "cache"),
+        })
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+
+    def test_symbols_are_read_without_import(self):
+        m = manifest.PluginManifest().refresh()
+        self.assertTrue(m.complete)
+        self.assertNotIn("gtd_manifest_plugin", sys.modules)
+        self.assertEqual(
+            m.get_classes_inheriting(ReportService),
+            [("gtd_manifest_plugin", "BaseService"), ("gtd_manifest_plugin", "DerivedService")]
+        )
+        self.assertEqual(m.get_classes_inheriting(Importer), [("gtd_manifest_plugin", "FileImporter")])
+        self.assertEqual(m.get_functions("add_extensions"), ["gtd_manifest_plugin"])
+
+    def test_manifest_is_persisted_and_reused(self):
+        manifest.PluginManifest().refresh()
+        self.assertTrue(os.path.exists(manifest.get_manifest_location()))
+        with patch.object(manifest, "inspect_plugin_file") as inspect_mock:
+            m = manifest.PluginManifest().refresh()
+        inspect_mock.assert_not_called()
+        self.assertEqual(m.get_classes_inheriting(Importer), [("gtd_manifest_plugin", "FileImporter")])
+
+    def test_changed_plugin_is_inspected_again(self):
+        manifest.PluginManifest().refresh()
+        with open(self.plugin_path, "a") as f:
+            f.write("\nclass OtherImporter(FileImporter):\n    pass\n")
+        m = manifest.PluginManifest().refresh()
+        self.assertEqual(
+            m.get_classes_inheriting(Importer),
+            [("gtd_manifest_plugin", "FileImporter"), ("gtd_manifest_plugin", "OtherImporter")]
+        )
+
+    def test_base_classes_are_resolved_through_imports(self):
+        with open(os.path.join(self.tmpdir.name, "gtd_manifest_reexport.py"), "w") as f:
+            f.write(REEXPORT_PLUGIN_SOURCE)
+        self.addCleanup(lambda: sys.modules.pop("gtd_manifest_reexport", None))
+        with patch.dict(os.environ, {"GTD_PLUGINS": "gtd_manifest_plugin gtd_manifest_reexport"}):
+            m = manifest.PluginManifest().refresh()
+            classes = m.get_classes_inheriting(Importer)
+        self.assertEqual(classes, [
+            ("gtd_manifest_plugin", "FileImporter"),
+            ("gtd_manifest_reexport", "QualifiedImporter"),
+            ("gtd_manifest_reexport", "ReexportedImporter"),
+        ])
+        # only plugin whose base could not be resolved statically is imported
+        self.assertNotIn("gtd_manifest_plugin", sys.modules)
+        self.assertIn("gtd_manifest_reexport", sys.modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
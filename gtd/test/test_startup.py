@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import unittest
+
+from gtd.utils import profile_imports
+
+
+HEAVY_MODULES = ["pandas", "numpy", "jira", "trello", "lxml", "markdown_it"]
+
+
+class TestStartup(unittest.TestCase):
+
+    def imported_heavy_modules(self, module):
+        statement = "import sys, %s; print(' '.join(m for m in %r if m in sys.modules))" % (module, HEAVY_MODULES)
+        proc = subprocess.run([sys.executable, "-c", statement], stdout=subprocess.PIPE, text=True, check=True)
+        return proc.stdout.strip()
+
+    def test_command_executor_does_not_import_heavy_dependencies(self):
+        self.assertEqual(self.imported_heavy_modules("gtd.__main__"), "")
+
+    def test_trello_plugin_does_not_import_numpy(self):
+        self.assertNotIn("numpy", self.imported_heavy_modules("gtd.trello").split())
+
+    def test_profile_imports_ranks_modules(self):
+        rows = profile_imports("import json")
+        modules = [r["module"] for r in rows]
+        self.assertIn("json", modules)
+        self.assertEqual(rows, sorted(rows, key=lambda r: r["self_ms"], reverse=True))
+        json_row = next(r for r in rows if r["module"] == "json")
+        self.assertEqual(json_row["level"], 0)
+        self.assertGreaterEqual(json_row["cumulative_ms"], json_row["self_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
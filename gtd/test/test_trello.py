@@ -43,6 +43,133 @@ class TestUtilityFunctions(unittest.TestCase):
         self.assertFalse(not_due({"due": "foo"}))
 
 
+class TestCard(unittest.TestCase):
+
+    RAW = {
+        'id': '5f0c1a2b3c4d5e6f70819203', 'name': 'Card', 'shortUrl': 'https://trello.com/c/abc',
+        'shortLink': 'abc', 'due': '2025-05-08T01:00:00.000Z',
+        'dateLastActivity': '2025-05-07T10:30:00.000Z', 'labels': [{'name': 'This week'}],
+    }
+
+    def test_card_parses_fields_once(self):
+        card = mod.Card(self.RAW)
+        self.assertEqual(card.last_activity, _dt.datetime(2025, 5, 7, 10, 30))
+        self.assertEqual(card.created, _dt.datetime.utcfromtimestamp(0x5f0c1a2b))
+        self.assertLess(abs((card.due - mod.utc_to_this_tz(self.RAW['due'])).total_seconds()), 1)
+        self.assertEqual(card.label_names, frozenset(['This week']))
+        self.assertFalse(hasattr(card, '__dict__'))
+
+    def test_card_behaves_like_trello_json(self):
+        from gtd.style import ticket
+        card = mod.Card(self.RAW)
+        self.assertEqual(card['name'], 'Card')
+        self.assertIsNone(card.get('desc'))
+        self.assertEqual(dict(card), self.RAW)
+        self.assertIs(mod.Card.of(card), card)
+        self.assertEqual(ticket(card), ticket(self.RAW))
+        self.assertTrue(mod.HasLabel('This week')(card))
+        self.assertTrue(mod.HasLabel('This week')(self.RAW))
+
+    def test_card_without_dates(self):
+        card = mod.Card({'id': 'not-hex', 'labels': []})
+        self.assertIsNone(card.due)
+        self.assertIsNone(card.last_activity)
+        self.assertIsNone(card.created)
+
+
+class TestCardFrame(unittest.TestCase):
+
+    CARDS = [
+        {'id': '5f0c1a2b3c4d5e6f70819203', 'idList': 'L1', 'labels': [{'name': 'This week'}],
+         'due': '2025-05-08T12:00:00.000Z', 'dateLastActivity': '2025-05-07T10:30:00.000Z', 'idChecklists': []},
+        {'id': '6a0c1a2b3c4d5e6f70819203', 'idList': 'L2', 'labels': [{'name': 'Help'}, {'name': 'This week'}],
+         'due': '2025-05-20T12:00:00.000Z', 'dateLastActivity': '2025-05-01T08:00:00.000Z', 'idChecklists': ['C1']},
+        {'id': 'not-hex', 'idList': 'L1', 'labels': []},
+    ]
+
+    def test_columns_match_card_fields(self):
+        cards = mod.Card.wrap_all(self.CARDS)
+        frame = mod.CardFrame(cards)
+        self.assertEqual(frame.count_per_list(['L1', 'L2', 'L3']), [2, 1, 0])
+        self.assertEqual(frame.take(frame.has_label('This week')), cards[:2])
+        self.assertEqual(frame.take(frame.has_label('Help')), cards[1:2])
+        self.assertEqual(frame.take(frame.has_label('Missing')), [])
+        self.assertEqual(frame.take(frame.has_checklists), cards[1:2])
+        self.assertEqual(frame.first_activity_date(), _dt.date(2025, 5, 1))
+
+    def test_due_within_counts_whole_days_like_timedelta(self):
+        cards = mod.Card.wrap_all(self.CARDS)
+        frame = mod.CardFrame(cards)
+        for now in (cards[0].due - _dt.timedelta(days=7, hours=1), cards[0].due + _dt.timedelta(days=3), cards[1].due - _dt.timedelta(days=7)):
+            expected = [c for c in cards if c.due is not None and (c.due - now).days <= 7]
+            self.assertEqual(frame.take(frame.due_within(7, now)), expected)
+
+    def test_week_filters(self):
+        cards = mod.Card.wrap_all(self.CARDS)
+        frame = mod.CardFrame(cards, {cards[0].id: _dt.date(2025, 5, 6), cards[2].id: None})
+        created = cards[1].created.date()
+        self.assertEqual(frame.take(frame.created_since(created)), cards[1:2])
+        self.assertEqual(frame.take(frame.active_between(_dt.date(2025, 5, 1), _dt.date(2025, 5, 6))), cards[1:2])
+        self.assertEqual(frame.take(frame.closed_since(_dt.date(2025, 5, 6))), cards[:1])
+        self.assertEqual(frame.days_since('closed', _dt.date(2025, 5, 10)), [4, None, None])
+        self.assertEqual(frame.days_since('created', created)[1:], [0, None])
+
+    def test_empty_frame(self):
+        frame = mod.CardFrame([])
+        self.assertEqual(frame.count_per_list(['L1']), [0])
+        self.assertEqual(frame.count(frame.due_within(7)), 0)
+        self.assertIsNone(frame.first_activity_date())
+
+
+class TestCardFilter(unittest.TestCase):
+
+    CARDS = TestCardFrame.CARDS
+
+    class Recording(mod.CardFilter):
+        cost = mod.API_COST
+
+        def __init__(self, result=True):
+            self.result = result
+            self.seen = []
+
+        def filter(self, card) -> bool:
+            self.seen.append(card['id'])
+            return self.result
+
+    def test_plan_matches_per_card_evaluation(self):
+        now = _dt.datetime(2025, 5, 5)
+        filters = [
+            mod.DueIn(7) & ~mod.HasLabel('Help'),
+            mod.HasChecklist() | mod.DueIn(3),
+            ~(mod.HasLabel('This week') & mod.HasChecklist()),
+            mod.All(),
+        ]
+        for f in filters:
+            with patch.object(mod.datetime, 'datetime', wraps=_dt.datetime) as dt:
+                dt.now.return_value = now
+                expected = [c for c in self.CARDS if f.filter(c)]
+            self.assertEqual(mod.apply_filter(self.CARDS, f, now=now), expected)
+
+    def test_expensive_filter_sees_only_survivors(self):
+        expensive = self.Recording()
+        passed = mod.apply_filter(self.CARDS, expensive & mod.HasLabel('Help'))
+        self.assertEqual([c['id'] for c in passed], [self.CARDS[1]['id']])
+        self.assertEqual(expensive.seen, [self.CARDS[1]['id']])
+
+        expensive = self.Recording()
+        passed = mod.apply_filter(self.CARDS, expensive | mod.HasLabel('This week'))
+        self.assertEqual(len(passed), 3)
+        self.assertEqual(expensive.seen, ['not-hex'])
+
+    def test_unchecked_items_fetched_only_for_cards_with_checklists(self):
+        api = MagicMock()
+        api.map_cards.side_effect = lambda f, cards: [f(c) for c in cards]
+        api.get_checklists.return_value = [{'checkItems': [{'state': 'incomplete'}]}]
+        passed = mod.apply_filter(self.CARDS, ~(mod.HasUncheckedItems(api) & mod.HasChecklist()), api)
+        self.assertEqual([c['id'] for c in passed], [self.CARDS[0]['id'], 'not-hex'])
+        api.get_checklists.assert_called_once()
+
+
 # ---------------------------------------------------------------------------
 #  Tests that exercise TrelloAPI methods with heavy mocking
 # ---------------------------------------------------------------------------
@@ -63,7 +190,7 @@ class TestTrelloAPI(unittest.TestCase):
         self.addCleanup(cfg_patch.stop)
 
         # Patch the trello.TrelloApi SDK class.
-        trello_patch = patch(f"{mod.__name__}.trello.TrelloApi")
+        trello_patch = patch("trello.TrelloApi")
         self.MockTrelloApiClass = trello_patch.start()
         self.addCleanup(trello_patch.stop)
 
@@ -97,6 +224,30 @@ class TestTrelloAPI(unittest.TestCase):
         with patch.object(self.client, 'get_boards', return_value=boards):
             self.assertEqual(self.client.get_default_boards(), ["Work"])  # from config
 
+    def test_board_directory_is_cached(self):
+        boards = [{'name': 'Work', 'id': 'b123'}]
+        with patch.object(self.client, 'get_boards', return_value=boards) as get_boards:
+            for _ in range(3):
+                self.assertEqual(self.client.get_board('Work')['id'], 'b123')
+            self.assertEqual(self.client.get_board_name({'idBoard': 'b123'}), 'Work')
+        get_boards.assert_called_once()
+        self.mock_api.boards.get.assert_not_called()
+
+    def test_board_directory_refreshes_on_miss(self):
+        boards = [{'name': 'Work', 'id': 'b123'}]
+        with patch.object(self.client, 'get_boards', side_effect=[boards, boards + [{'name': 'New', 'id': 'b456'}]]) as get_boards:
+            self.client.get_board('Work')
+            self.assertEqual(self.client.get_board('New')['id'], 'b456')
+        self.assertEqual(get_boards.call_count, 2)
+
+    def test_board_directory_expires(self):
+        self.client.board_cache_ttl = 0
+        boards = [{'name': 'Work', 'id': 'b123'}]
+        with patch.object(self.client, 'get_boards', return_value=boards) as get_boards:
+            self.client.get_board('Work')
+            self.client.get_board('Work')
+        self.assertEqual(get_boards.call_count, 2)
+
     # -----------------------  has_label  --------------------------
 
     def test_has_label(self):
@@ -135,6 +286,183 @@ class TestTrelloAPI(unittest.TestCase):
         self.mock_api.lists.get.assert_called_once_with('list_abc')
         self.assertEqual(name, 'Backlog')
 
+    # --------------------  batch requests -------------------------
+
+    def test_batch_splits_urls_in_chunks(self):
+        self.mock_api.batches.get.side_effect = lambda urls: [
+            {'200': {'url': u}} if 'missing' not in u else {'statusCode': 404}
+            for u in urls.split(',')
+        ]
+        urls = ['/cards/%d' % i for i in range(23)] + ['/cards/missing']
+        responses = self.client.batch(urls)
+        self.assertEqual(self.mock_api.batches.get.call_count, 3)
+        self.assertEqual([r['url'] for r in responses[:-1]], urls[:-1])
+        self.assertIsNone(responses[-1])
+
+    def test_prefetched_card_details_are_used(self):
+        self.mock_api.batches.get.side_effect = lambda urls: [
+            {'200': {
+                'id': u.split('/')[2].split('?')[0],
+                'attachments': [{'url': 'https://example.com/doc'}],
+                'actions': [{'type': 'commentCard', 'date': '2025-05-08T01:00:00.000Z', 'data': {'text': 'done'}}],
+            }} for u in urls.split(',')
+        ]
+        cards = [{'id': 'c%d' % i, 'idList': 'L1'} for i in range(15)]
+        self.client.prefetch_card_details(cards)
+        for c in cards:
+            self.assertEqual(self.client.get_attachments(c), [{'url': 'https://example.com/doc'}])
+            self.assertEqual(self.client.get_comments(c), [{'text': 'done', 'date': '2025-05-08T01:00:00.000Z'}])
+        self.assertEqual(self.mock_api.batches.get.call_count, 2)
+        self.mock_api.cards.get.assert_not_called()
+
+    # --------------------  concurrent fetching --------------------
+
+    def test_map_cards_keeps_input_order(self):
+        import random, time
+        cards = [{'id': str(i)} for i in range(30)]
+
+        def fetch(card):
+            time.sleep(random.random() / 100)
+            return card['id']
+        self.assertEqual(self.client.map_cards(fetch, cards), [c['id'] for c in cards])
+
+    def test_sdk_requests_take_tokens_from_shared_limiter(self):
+        with patch.object(mod.get_rate_limiter(), 'acquire') as acquire:
+            self.mock_api.lists.get.return_value = {'name': 'Backlog'}
+            self.client.get_list_name({'idList': 'L9'})
+            self.client.get_list_name({'idList': 'L9'})
+        acquire.assert_called_once()
+
+    def test_rate_limiter_stays_within_trello_limit(self):
+        class Clock:
+            now = 0.0
+
+            def monotonic(self):
+                return self.now
+
+            def sleep(self, seconds):
+                # real clock always moves, float sum alone might not
+                self.now += max(seconds, 1e-6)
+        clock = Clock()
+        configs = [{}, {'GTD_TRELLO_REQUESTS_PER_SECOND': '10', 'GTD_TRELLO_REQUEST_BURST': '100'}]
+        for env in configs:
+            with patch.dict('os.environ', env), patch.object(mod, '_rate_limiter', None), patch('gtd.utils.time', clock):
+                limiter = mod.get_rate_limiter()
+                times = []
+                for _ in range(500):
+                    limiter.acquire()
+                    times.append(clock.now)
+            # no window of 10 seconds holds more than 100 requests
+            windows = [sum(1 for t in times[i:] if t < start + 10) for i, start in enumerate(times)]
+            self.assertLessEqual(max(windows), 100, env)
+            self.assertGreaterEqual(max(windows), 90, env)
+
+    # --------------------  checklists -----------------------------
+
+    def test_checklist_filters_consider_all_checklists(self):
+        self.client.use_snapshots = False
+        self.mock_api.boards.get_checklist.return_value = [
+            {'id': 'ch1', 'checkItems': [{'name': 'a', 'state': 'incomplete'}]},
+            {'id': 'ch2', 'checkItems': [{'name': 'b', 'state': 'complete'}]},
+            {'id': 'ch3', 'checkItems': [{'name': 'c', 'state': 'complete'}]},
+        ]
+        cards = [
+            {'id': 'c1', 'idBoard': 'b1', 'idChecklists': ['ch1', 'ch2']},
+            {'id': 'c2', 'idBoard': 'b1', 'idChecklists': ['ch3']},
+            {'id': 'c3', 'idBoard': 'b1', 'idChecklists': []},
+        ]
+        checked = mod.HasCheckedItems(self.client)
+        unchecked = mod.HasUncheckedItems(self.client)
+        self.assertEqual([checked(c) for c in cards], [True, True, False])
+        self.assertEqual([unchecked(c) for c in cards], [True, False, False])
+        self.assertEqual([c['id'] for c in self.client.get_checklists(cards[0])], ['ch1', 'ch2'])
+        self.mock_api.boards.get_checklist.assert_called_once_with('b1')
+        self.mock_api.checklists.get.assert_not_called()
+
+    # --------------------  closure index --------------------------
+
+    def test_closure_dates_come_from_paginated_board_actions(self):
+        def action(action_id, card_id, date, field='closed'):
+            return {'id': action_id, 'type': 'updateCard', 'date': date,
+                    'data': {'card': {'id': card_id, field: True}, 'old': {field: False}}}
+        actions = [
+            action('a3', 'c1', '2025-05-07T10:00:00.000Z'),
+            action('a2', 'c2', '2025-05-06T10:00:00.000Z', field='dueComplete'),
+            {'id': 'a1b', 'type': 'updateCard', 'date': '2025-05-02T10:00:00.000Z',
+             'data': {'card': {'id': 'c3', 'name': 'Renamed'}, 'old': {'name': 'Card'}}},
+            action('a1', 'c1', '2025-05-01T10:00:00.000Z'),
+        ]
+
+        def get_action(board_id, filter=None, limit=None, since=None, before=None):
+            self.assertEqual(filter, 'updateCard')
+            page = [a for a in actions if before is None or a['id'] < before]
+            return page[:limit]
+        self.mock_api.boards.get_action.side_effect = get_action
+        cards = [{'id': 'c%d' % i, 'idBoard': 'b1'} for i in range(1, 4)]
+        with patch('gtd.trello.store.ACTIONS_PAGE_SIZE', 2):
+            dates = mod.get_closed_dates(self.client, cards)
+        self.assertEqual(dates, {
+            'c1': _dt.date(2025, 5, 7),
+            'c2': _dt.date(2025, 5, 6),
+            'c3': None,
+        })
+        self.assertEqual(self.mock_api.boards.get_action.call_count, 3)
+        self.mock_api.cards.get.assert_not_called()
+
+    # --------------------  board snapshot -------------------------
+
+    def _nested_board(self):
+        return {
+            'id': 'b123', 'name': 'Work',
+            'lists': [
+                {'id': 'L1', 'name': 'Backlog', 'closed': False},
+                {'id': 'L2', 'name': 'Old project', 'closed': True},
+            ],
+            'cards': [
+                {'id': 'c1', 'name': 'Open', 'idList': 'L1', 'idBoard': 'b123', 'closed': False,
+                 'dueComplete': False, 'labels': [], 'idChecklists': ['ch1']},
+                {'id': 'c2', 'name': 'Due complete', 'idList': 'L1', 'idBoard': 'b123', 'closed': False,
+                 'dueComplete': True, 'labels': [], 'idChecklists': []},
+                {'id': 'c3', 'name': 'Archived', 'idList': 'L2', 'idBoard': 'b123', 'closed': True,
+                 'dueComplete': False, 'labels': [], 'idChecklists': []},
+                {'id': 'c4', 'name': 'In archived list', 'idList': 'L2', 'idBoard': 'b123', 'closed': False,
+                 'dueComplete': False, 'labels': [], 'idChecklists': []},
+            ],
+            'checklists': [
+                {'id': 'ch1', 'idCard': 'c1', 'checkItems': [{'name': 'step', 'state': 'complete'}]},
+            ],
+            'labels': [],
+        }
+
+    def test_board_snapshot_serves_reads_with_one_request(self):
+        self.mock_api.boards.get.return_value = self._nested_board()
+        boards = [{'name': 'Work', 'id': 'b123'}]
+        with patch.object(self.client, 'get_boards', return_value=boards):
+            open_cards = self.client.get_open_cards('Work')
+            closed_cards = self.client.get_closed_cards('Work')
+            lists = self.client.get_lists('Work')
+            closed_lists = self.client.get_closed_lists('Work')
+        self.assertEqual([c['id'] for c in open_cards], ['c1'])
+        self.assertEqual(sorted(c['id'] for c in closed_cards), ['c2', 'c3'])
+        self.assertEqual([l['id'] for l in lists], ['L1'])
+        self.assertEqual([l['id'] for l in closed_lists], ['L2'])
+        self.assertEqual(self.client.get_checklist(open_cards[0])['id'], 'ch1')
+        self.assertEqual(self.client.get_list_name(closed_cards[0]), 'Old project')
+        self.assertEqual(self.client.get_board_name(open_cards[0]), 'Work')
+        self.mock_api.boards.get.assert_called_once()
+        self.mock_api.boards.get_card.assert_not_called()
+        self.mock_api.lists.get.assert_not_called()
+        self.mock_api.checklists.get.assert_not_called()
+
+    def test_board_snapshot_is_dropped_after_write(self):
+        self.mock_api.boards.get.return_value = self._nested_board()
+        boards = [{'name': 'Work', 'id': 'b123'}]
+        with patch.object(self.client, 'get_boards', return_value=boards):
+            self.client.get_open_cards('Work')
+            self.client.add_card('New', 'L1')
+            self.client.get_open_cards('Work')
+        self.assertEqual(self.mock_api.boards.get.call_count, 2)
+
 
 # ---------------------------------------------------------------------------
 #  generate_report – we only smoke‑test the happy‑path & error handling
@@ -167,6 +495,27 @@ class TestGenerateReport(unittest.TestCase):
         # because we forced zero closed cards
         self.assertIn("No cards closed yet", html)
 
+    @patch(f"{mod.__name__}.TrelloAPI")
+    @patch(f"{mod.__name__}.load_extensions", return_value=[])
+    def test_report_parses_configuration_once(self, _ext, MockAPI):
+        import json, os, tempfile
+        from gtd import config
+
+        mock_api = MockAPI.return_value
+        mock_api.get_lists.return_value = []
+        mock_api.get_open_cards.return_value = []
+        mock_api.get_closed_cards.return_value = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "gtd.json")
+            with open(path, "w") as f:
+                json.dump({"trello_board": "Work"}, f)
+            with patch.dict(os.environ, {"GTD_CONFIG": path}):
+                config.invalidate_config()
+                before = config.get_config_parse_count()
+                mod.generate_report()
+                self.assertEqual(config.get_config_parse_count() - before, 1)
+        config.invalidate_config()
+
     @patch(f"{mod.__name__}.TrelloAPI", side_effect=ValueError("Boom"))
     @patch(f"{mod.__name__}.load_extensions", return_value=[])
     def test_report_gracefully_handles_api_error(self, _ext, _api):
@@ -176,6 +525,181 @@ class TestGenerateReport(unittest.TestCase):
         self.assertIn("ERROR", html)
 
 
+class TestScoring(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.get_closed_lists.return_value = [{'id': 'done-list'}]
+        self.cards = [
+            {'id': 'a', 'name': 'A', 'idList': 'done-list', 'labels': []},
+            {'id': 'b', 'name': 'B', 'idList': 'done-list', 'labels': [{'name': 'Primary'}]},
+            {'id': 'c', 'name': 'C', 'idList': 'open-list', 'labels': [{'name': 'Primary'}]},
+            {'id': 'd', 'name': 'D', 'idList': 'open-list', 'labels': [{'name': 'Secondary'}],
+             'dateLastActivity': '2025-05-14T10:00:00.000Z'},
+        ]
+        self.closed_dates = {'a': _dt.date(2025, 5, 6), 'b': _dt.date(2025, 5, 5), 'c': _dt.date(2025, 5, 13)}
+
+    def test_last_card_of_closed_list_closes_it(self):
+        scores = mod.card_scores(mod.Card.wrap_all(self.cards), self.closed_dates, [{'id': 'done-list'}])
+        self.assertEqual(scores, {'a': 4, 'b': 3, 'c': 3, 'd': 1})
+
+    def test_score_closed_cards_filters_by_date(self):
+        self.assertEqual(mod.score_closed_cards(self.api, self.cards, self.closed_dates), 11)
+        self.assertEqual(mod.score_closed_cards(
+            self.api, self.cards, self.closed_dates,
+            score_from_date=_dt.datetime(2025, 5, 6), score_to_date=_dt.date(2025, 5, 13)
+        ), 7)
+
+    def test_last_activity_is_default_closure_date(self):
+        self.assertEqual(mod.score_closed_cards(self.api, self.cards, score_from_date=_dt.date(2025, 5, 14)), 1)
+        self.api.get_closed_cards.return_value = []
+        self.assertEqual(mod.score_closed_cards(self.api), 0)
+
+    def test_weekly_scores_cover_every_week_in_range(self):
+        weeks = mod.weekly_scores(self.api, _dt.date(2025, 4, 30), _dt.date(2025, 5, 20), self.cards, self.closed_dates)
+        self.assertEqual([w['week'] for w in weeks], ['2025-W18', '2025-W19', '2025-W20', '2025-W21'])
+        self.assertEqual([w['start'] for w in weeks], [_dt.date(2025, 4, 28), _dt.date(2025, 5, 5), _dt.date(2025, 5, 12), _dt.date(2025, 5, 19)])
+        self.assertEqual([w['score'] for w in weeks], [0, 7, 3, 0])
+        self.assertEqual([w['closed'] for w in weeks], [0, 2, 1, 0])
+        self.api.get_closed_cards.assert_not_called()
+
+    @patch(f"{mod.__name__}.TrelloAPI")
+    def test_weekly_scores_service(self, MockAPI):
+        MockAPI.return_value = self.api
+        self.api.get_closed_cards.return_value = self.cards
+        self.api.get_closure_dates.return_value = {}
+        weeks = mod.TrelloWeeklyScores().provide()
+        self.assertEqual(len(weeks), 12)
+        self.assertEqual(weeks[-1]['start'], mod.iso_week_start(_dt.date.today()))
+
+
+class TestTrelloImporter(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch(f"{mod.__name__}.TrelloAPI")
+        self.api = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.api.get_default_boards.return_value = ['Work']
+        self.api.get_lists.return_value = [{'id': 'L1', 'name': 'Inbox '}, {'id': 'L2', 'name': 'Project'}]
+        self.api.get_open_cards.return_value = [
+            {'name': 'Existing', 'idList': 'L1'},
+            {'name': 'Elsewhere', 'idList': 'L2'},
+        ]
+        self.api.add_card.side_effect = lambda title, list_id, **kwargs: {'id': title, 'shortUrl': 'https://trello.com/c/' + title, 'pos': 16384}
+        self.api.map_cards.side_effect = lambda func, items: [func(i) for i in items]
+        self.importer = mod.TrelloImporter()
+
+    def test_exists_fetches_board_once(self):
+        for i in range(20):
+            self.assertFalse(self.importer.exists('Task %d' % i, context='Work', project='Inbox'))
+        self.assertTrue(self.importer.exists('Existing', context='Work', project='Inbox'))
+        self.assertFalse(self.importer.exists('Existing', context='Work', project='Project'))
+        self.assertTrue(self.importer.exists('Existing', project='Inbox'))
+        self.api.get_open_cards.assert_called_once_with('Work')
+
+    def test_begin_session_fetches_board_again(self):
+        self.assertTrue(self.importer.exists('Existing', context='Work', project='Inbox'))
+        self.assertEqual(self.importer.list_projects('Work'), ['Inbox', 'Project'])
+        # card was archived and list renamed by another client
+        self.api.get_open_cards.return_value = [{'name': 'Elsewhere', 'idList': 'L3'}]
+        self.api.get_lists.return_value = [{'id': 'L1', 'name': 'Inbox'}, {'id': 'L3', 'name': 'Next'}]
+        self.assertTrue(self.importer.exists('Existing', context='Work', project='Inbox'))
+
+        self.importer.begin_session()
+        self.api.invalidate_snapshots.assert_called()
+        self.assertFalse(self.importer.exists('Existing', context='Work', project='Inbox'))
+        self.assertTrue(self.importer.exists('Elsewhere', context='Work', project='Next'))
+        self.assertEqual(self.importer.list_projects('Work'), ['Inbox', 'Next'])
+        self.importer.create('New', '', context='Work', project='Next')
+        self.assertEqual(self.api.add_card.call_args.args[:2], ('New', 'L3'))
+
+    def test_created_cards_are_found_in_same_session(self):
+        from gtd.importer import import_task
+        with patch('builtins.print'):
+            for title in ['New [2025-05-08]', 'New [2025-05-08]', 'New', 'Other']:
+                import_task(self.importer, True, title, context='Work', project='Inbox')
+        self.assertEqual([c.args[0] for c in self.api.add_card.call_args_list], ['New', 'Other'])
+        self.api.get_open_cards.assert_called_once()
+
+    def test_list_ids_are_resolved_once_per_board(self):
+        self.api.add_list.side_effect = lambda name, board_name=None: {'id': 'new-' + name, 'name': name}
+        for title in ['A', 'B', 'C']:
+            self.importer.create(title, '', context='Work', project='Project ')
+        self.importer.create('D', '', context='Work', project='Later')
+        self.importer.create('E', '', context='Work', project='Later')
+        self.importer.create_project('Someday', 'Work')
+        self.importer.create('F', '', project='Someday')
+        self.importer.create('G', '')
+        self.assertEqual(
+            [(c.args[0], c.args[1]) for c in self.api.add_card.call_args_list],
+            [('A', 'L2'), ('B', 'L2'), ('C', 'L2'), ('D', 'new-Later'), ('E', 'new-Later'), ('F', 'new-Someday'), ('G', 'L1')]
+        )
+        self.assertEqual(self.api.add_list.call_count, 2)
+        # one fetch on first use and one refresh on miss before creating missing list
+        self.assertEqual(self.api.get_lists.call_count, 2)
+        self.assertEqual(self.importer.list_projects('Work'), ['Inbox', 'Project', 'Later', 'Someday'])
+
+    def test_next_card_is_put_at_bottom_when_first_card_of_list_fails(self):
+        def add_card(title, list_id, pos=None, **kwargs):
+            if title == 'Bad':
+                raise ValueError("Error creating card")
+            return {'id': title, 'shortUrl': 'https://trello.com/c/' + title, 'pos': 500.0 if pos == 'bottom' else pos}
+
+        self.api.add_card.side_effect = add_card
+        results = self.importer.create_many([{'title': t, 'context': 'Work'} for t in ('Bad', 'A', 'B')])
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(
+            [(c.args[0], c.kwargs['pos']) for c in self.api.add_card.call_args_list],
+            [('Bad', 'bottom'), ('A', 'bottom'), ('B', 500.0 + 16384)]
+        )
+
+    def test_create_many_runs_cards_concurrently_and_reports_failures(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        # first cards of both lists are created together, then remaining cards of the lists
+        barrier = threading.Barrier(2, timeout=5)
+
+        def add_card(title, list_id, pos=None, **kwargs):
+            barrier.wait()
+            if title == 'Bad':
+                raise ValueError("Error creating card")
+            return {'id': title, 'shortUrl': 'https://trello.com/c/' + title, 'pos': 100.0 if pos == 'bottom' else pos}
+
+        def map_cards(func, items):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                return list(executor.map(func, items))
+
+        self.api.add_card.side_effect = add_card
+        self.api.map_cards.side_effect = map_cards
+        self.api.add_checklist.side_effect = lambda card_id, name, pos=None: {'id': '%s/%s' % (card_id, name)}
+        results = self.importer.create_many([
+            {'title': 'A', 'context': 'Work', 'checklists': {'Steps': ['one', 'two'], 'Empty': [], 'More': ['three']}},
+            {'title': 'Bad', 'context': 'Work', 'checklists': {'Steps': ['x']}},
+            {'title': 'C', 'context': 'Missing'},
+            {'title': 'D [2025-05-08]', 'context': 'Work'},
+            {'title': 'E', 'context': 'Work', 'project': 'Project'},
+        ])
+        self.assertEqual(results[0], 'https://trello.com/c/A')
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3], 'https://trello.com/c/D')
+        self.assertEqual(results[4], 'https://trello.com/c/E')
+        self.assertEqual(
+            sorted((c.args[0], c.kwargs['pos']) for c in self.api.add_card.call_args_list),
+            [('A', 'bottom'), ('Bad', 100.0 + 16384), ('D', 100.0 + 2 * 16384), ('E', 'bottom')]
+        )
+        self.assertEqual(
+            sorted((c.args[1], c.kwargs['pos']) for c in self.api.add_checklist.call_args_list),
+            [('More', 2), ('Steps', 1)]
+        )
+        self.assertEqual(
+            sorted((c.args[0], c.args[1], c.kwargs['pos']) for c in self.api.add_checklist_item.call_args_list),
+            [('A/More', 'three', 1), ('A/Steps', 'one', 1), ('A/Steps', 'two', 2)]
+        )
+        self.assertTrue(self.importer.exists('D', context='Work', project='Inbox'))
+        self.assertFalse(self.importer.exists('Bad', context='Work', project='Inbox'))
+
+
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from gtd.extensions import using_snapshot
+from gtd.trello import SnapshotTrelloAPI, backup, get_api
+from gtd.trello.store import CardStore
+from gtd.test.test_trello_store import NotFound, board, closure_action
+
+
+class TestBackup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.api = MagicMock()
+        data = board()
+        self.api.boards.get.return_value = {'id': 'b1', 'name': 'Work', 'labels': []}
+        self.api.boards.get_list.return_value = data['lists']
+        self.api.boards.get_checklist.return_value = [{'id': 'ch1', 'idBoard': 'b1', 'idCard': 'c1', 'checkItems': []}]
+        self.cards = data['cards']
+        self.api.boards.get_card.side_effect = self.get_card
+        self.actions = [
+            closure_action('a1', 'c2', '2025-05-05T10:00:00.000Z'),
+            {'id': 'a0', 'type': 'commentCard', 'date': '2025-05-04T10:00:00.000Z', 'data': {'card': {'id': 'c1'}, 'text': 'Done'}},
+        ]
+
+        def get_action(board_id, filter=None, limit=None, since=None, before=None):
+            actions = [a for a in self.actions if (since is None or a['id'] > since) and (filter is None or a['type'] in filter)]
+            return actions[:limit]
+        self.api.boards.get_action.side_effect = get_action
+
+    def get_card(self, board_id, filter=None, attachments=None, limit=None, before=None):
+        cards = sorted((c for c in self.cards if before is None or c['id'] < before), key=lambda c: c['id'], reverse=True)
+        return cards[:limit]
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def records(self, path):
+        return [(r['type'], r.get('id') or r['data']['id'], r.get('deleted', False)) for r in backup.iter_records(path)]
+
+    def test_full_backup_streams_every_entity(self):
+        backup.CARDS_PAGE_SIZE, old = 1, backup.CARDS_PAGE_SIZE
+        self.addCleanup(setattr, backup, 'CARDS_PAGE_SIZE', old)
+        header = backup.write_full_backup(self.api, ['b1'], self.path('full.ndjson.gz'))
+        self.assertEqual(header['cursors'], {'b1': 'a1'})
+        with gzip.open(self.path('full.ndjson.gz'), 'rt') as f:
+            self.assertEqual(json.loads(f.readline())['kind'], 'full')
+        self.assertEqual(self.records(self.path('full.ndjson.gz')), [
+            ('board', 'b1', False), ('list', 'L1', False), ('card', 'c2', False), ('card', 'c1', False),
+            ('checklist', 'ch1', False), ('comment', 'a0', False), ('closure', 'c2', False),
+        ])
+        self.assertEqual(self.api.boards.get_card.call_count, 3)
+
+    def test_diff_backup_has_only_changes_and_compacts(self):
+        backup.write_full_backup(self.api, ['b1'], self.path('full.ndjson.gz'))
+        self.actions.insert(0, closure_action('a2', 'c1', '2025-05-06T10:00:00.000Z'))
+        self.api.cards.get.return_value = {**self.cards[0], 'closed': True}
+        header = backup.write_diff_backup(self.api, ['b1'], self.path('diff1.ndjson.gz'), self.path('full.ndjson.gz'))
+        self.assertEqual(header['cursors'], {'b1': 'a2'})
+        self.assertEqual(self.records(self.path('diff1.ndjson.gz')), [('card', 'c1', False), ('closure', 'c1', False)])
+
+        self.actions.insert(0, {'id': 'a3', 'type': 'deleteCard', 'date': '2025-05-07T10:00:00.000Z', 'data': {'card': {'id': 'c2'}}})
+        self.actions.insert(0, {'id': 'a4', 'type': 'updateCard', 'date': '2025-05-07T11:00:00.000Z', 'data': {'card': {'id': 'c9'}}})
+        self.api.cards.get.side_effect = NotFound()
+        backup.write_diff_backup(self.api, ['b1'], self.path('diff2.ndjson.gz'), self.path('diff1.ndjson.gz'))
+        self.assertEqual(self.records(self.path('diff2.ndjson.gz')), [('card', 'c2', True), ('card', 'c9', True)])
+        self.api.boards.get_card.assert_called_once()
+
+        paths = [self.path(n) for n in ('full.ndjson.gz', 'diff1.ndjson.gz', 'diff2.ndjson.gz')]
+        header = backup.compact(paths, self.path('compact.ndjson.gz'))
+        self.assertEqual(header['cursors'], {'b1': 'a4'})
+        self.assertEqual(backup.read_header(self.path('compact.ndjson.gz'))['kind'], 'full')
+        records = list(backup.iter_records(self.path('compact.ndjson.gz')))
+        self.assertEqual([r['data']['id'] for r in records if r['type'] == 'card'], ['c1'])
+        self.assertTrue(next(r for r in records if r['type'] == 'card')['data']['closed'])
+        self.assertEqual(sorted(r['data']['date'] for r in records if r['type'] == 'closure'), ['2025-05-05', '2025-05-06'])
+
+        boards = backup.load_backup(self.path('compact.ndjson.gz'))
+        self.assertEqual(boards['b1']['name'], 'Work')
+        self.assertEqual([c['id'] for c in boards['b1']['cards']], ['c1'])
+        self.assertEqual([c['data']['text'] for c in boards['b1']['comments']], ['Done'])
+        self.assertEqual(boards['b1']['closures'], {'c1': datetime.date(2025, 5, 6), 'c2': datetime.date(2025, 5, 5)})
+        with self.assertRaises(ValueError):
+            backup.load_backup(self.path('diff1.ndjson.gz'))
+
+    def test_compact_keeps_latest_closure_and_order(self):
+        with backup.BackupWriter(self.path('full.ndjson.gz'), {'kind': 'full', 'created': '1', 'cursors': {'b1': 'a1'}}) as writer:
+            writer.write('card', 'b1', {'id': 'c2', 'name': 'Second'})
+            writer.write('card', 'b1', {'id': 'c1', 'name': 'First'})
+            writer.write_closure('b1', 'c1', datetime.date(2025, 5, 6))
+        with backup.BackupWriter(self.path('diff.ndjson.gz'), {'kind': 'diff', 'created': '2', 'based_on': '1', 'cursors': {'b1': 'a2'}}) as writer:
+            writer.write('card', 'b1', {'id': 'c2', 'name': 'Renamed'})
+            writer.write_closure('b1', 'c1', datetime.date(2025, 5, 5))
+        backup.compact([self.path('full.ndjson.gz'), self.path('diff.ndjson.gz')], self.path('compact.ndjson.gz'))
+        records = list(backup.iter_records(self.path('compact.ndjson.gz')))
+        self.assertEqual([(r['type'], r['data']['id']) for r in records], [('card', 'c2'), ('card', 'c1'), ('closure', 'c1')])
+        self.assertEqual(records[0]['data']['name'], 'Renamed')
+        self.assertEqual(records[2]['data']['date'], '2025-05-06')
+
+    def test_compact_rejects_broken_chain(self):
+        backup.write_full_backup(self.api, ['b1'], self.path('full.ndjson.gz'))
+        backup.write_diff_backup(self.api, ['b1'], self.path('diff.ndjson.gz'), self.path('full.ndjson.gz'))
+        with self.assertRaises(ValueError):
+            backup.compact([self.path('diff.ndjson.gz')], self.path('out.ndjson.gz'))
+        with self.assertRaises(ValueError):
+            backup.compact([self.path('full.ndjson.gz'), self.path('diff.ndjson.gz'), self.path('diff.ndjson.gz')], self.path('out.ndjson.gz'))
+
+    def test_snapshot_api_reads_backup(self):
+        backup.write_full_backup(self.api, ['b1'], self.path('full.ndjson.gz'))
+        with patch.dict(os.environ, {'GTD_SNAPSHOT': self.path('full.ndjson.gz'), 'GTD_TRELLO_BOARD': 'Work'}):
+            api = get_api()
+        self.assertIsInstance(api, SnapshotTrelloAPI)
+        self.assertIsInstance(get_api(self.path('full.ndjson.gz')), SnapshotTrelloAPI)
+        with using_snapshot(self.path('full.ndjson.gz')):
+            self.assertIsInstance(get_api(), SnapshotTrelloAPI)
+        with patch.dict(os.environ, {'GTD_TRELLO_BOARD': 'Work'}):
+            self.assertEqual([c['id'] for c in api.get_open_cards()], ['c1'])
+            self.assertEqual([c['id'] for c in api.get_closed_cards()], ['c2'])
+        card = api.get_open_cards('Work')[0]
+        self.assertEqual(api.get_list_name(card), 'Backlog')
+        self.assertEqual(api.get_board_name(card), 'Work')
+        self.assertEqual(api.get_comments(card), [{'text': 'Done', 'date': '2025-05-04T10:00:00.000Z'}])
+        self.assertEqual(api.get_closure_dates(self.cards), {'c1': None, 'c2': datetime.date(2025, 5, 5)})
+        with self.assertRaises(ValueError):
+            api.add_card('New', 'L1')
+
+    def test_snapshot_api_reads_store(self):
+        self.api.boards.get.return_value = board()
+        store = CardStore(self.path('trello.sqlite'))
+        store.sync(self.api, 'b1')
+        store.close()
+        api = SnapshotTrelloAPI(self.path('trello.sqlite'))
+        self.assertEqual([c['id'] for c in api.get_closed_cards('Work')], ['c2'])
+        self.assertEqual(api.get_closure_dates(self.cards)['c2'], datetime.date(2025, 5, 5))
+        self.assertEqual(api.get_comments(self.cards[0]), [])
+        with self.assertRaises(ValueError):
+            SnapshotTrelloAPI(self.path('missing.ndjson.gz'))
+
+    def test_not_a_backup(self):
+        with gzip.open(self.path('other.gz'), 'wt') as f:
+            f.write('{"open_cards": []}\n')
+        with self.assertRaises(ValueError):
+            backup.read_header(self.path('other.gz'))
+
+
+if __name__ == "__main__":
+    unittest.main()
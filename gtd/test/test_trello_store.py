@@ -0,0 +1,105 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from gtd.trello.store import CardStore, closure_dates_from_actions
+
+
+def board():
+    return {
+        'id': 'b1', 'name': 'Work',
+        'lists': [{'id': 'L1', 'name': 'Backlog', 'closed': False, 'idBoard': 'b1', 'pos': 1}],
+        'cards': [
+            {'id': 'c1', 'name': 'First', 'idList': 'L1', 'idBoard': 'b1', 'closed': False, 'dueComplete': False, 'labels': [], 'idChecklists': [], 'pos': 1},
+            {'id': 'c2', 'name': 'Second', 'idList': 'L1', 'idBoard': 'b1', 'closed': True, 'dueComplete': False, 'labels': [], 'idChecklists': [], 'pos': 2},
+        ],
+        'checklists': [],
+        'labels': [],
+    }
+
+
+def closure_action(action_id, card_id, date):
+    return {
+        'id': action_id, 'type': 'updateCard', 'date': date,
+        'data': {'card': {'id': card_id, 'closed': True}, 'old': {'closed': False}},
+    }
+
+
+class NotFound(Exception):
+    def __init__(self):
+        self.response = MagicMock(status_code=404)
+
+
+class TestCardStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = CardStore(os.path.join(self.tmpdir.name, "trello.sqlite"))
+        self.addCleanup(self.store.close)
+        self.api = MagicMock()
+        self.api.boards.get.return_value = board()
+        self.actions = [closure_action('a1', 'c2', '2025-05-05T10:00:00.000Z')]
+
+        def get_action(board_id, filter=None, limit=None, since=None, before=None):
+            actions = [a for a in self.actions if since is None or a['id'] > since]
+            return actions[:limit]
+        self.api.boards.get_action.side_effect = get_action
+
+    def test_first_sync_downloads_board(self):
+        self.assertIsNone(self.store.sync(self.api, 'b1'))
+        snapshot = self.store.get_snapshot('b1')
+        self.assertEqual(snapshot.name, 'Work')
+        self.assertEqual([c['id'] for c in snapshot.cards], ['c1', 'c2'])
+        self.assertEqual(self.store.get_cursor('b1'), 'a1')
+        self.assertEqual(self.store.get_closure_dates(), {'c2': datetime.date(2025, 5, 5)})
+
+    def test_snapshot_orders_cards_by_list_position(self):
+        data = board()
+        # id of the first list sorts after id of the second one
+        data['lists'].insert(0, {'id': 'L9', 'name': 'Today', 'closed': False, 'idBoard': 'b1', 'pos': 0})
+        data['cards'].append({**data['cards'][0], 'id': 'c3', 'idList': 'L9', 'pos': 5})
+        self.api.boards.get.return_value = data
+        self.store.sync(self.api, 'b1')
+        snapshot = self.store.get_snapshot('b1')
+        self.assertEqual([l['id'] for l in snapshot.lists], ['L9', 'L1'])
+        self.assertEqual([c['id'] for c in snapshot.cards], ['c3', 'c1', 'c2'])
+
+    def test_incremental_sync_fetches_only_changed_cards(self):
+        self.store.sync(self.api, 'b1')
+        self.actions.insert(0, closure_action('a2', 'c1', '2025-05-06T10:00:00.000Z'))
+        self.api.cards.get.return_value = {**board()['cards'][0], 'closed': True}
+
+        self.assertEqual(self.store.sync(self.api, 'b1'), 1)
+
+        self.api.cards.get.assert_called_once_with('c1')
+        self.assertEqual(self.api.boards.get.call_count, 1)
+        self.assertEqual(self.store.get_cursor('b1'), 'a2')
+        self.assertTrue(all(c['closed'] for c in self.store.get_snapshot('b1').cards))
+        self.assertEqual(self.store.get_closure_dates('b1')['c1'], datetime.date(2025, 5, 6))
+
+    def test_incremental_sync_removes_deleted_cards(self):
+        self.store.sync(self.api, 'b1')
+        self.actions.insert(0, {'id': 'a2', 'type': 'updateCard', 'date': '2025-05-06T10:00:00.000Z', 'data': {'card': {'id': 'c1'}}})
+        self.api.cards.get.side_effect = NotFound()
+        self.store.sync(self.api, 'b1')
+        self.assertEqual([c['id'] for c in self.store.get_snapshot('b1').cards], ['c2'])
+
+    def test_resync_downloads_board_again(self):
+        self.store.sync(self.api, 'b1')
+        self.store.sync(self.api, 'b1', resync=True)
+        self.assertEqual(self.api.boards.get.call_count, 2)
+
+    def test_closure_dates_keep_latest_closure(self):
+        actions = [
+            closure_action('a2', 'c1', '2025-05-06T10:00:00.000Z'),
+            closure_action('a1', 'c1', '2025-05-01T10:00:00.000Z'),
+            {'id': 'a0', 'type': 'updateCard', 'date': '2025-05-01T10:00:00.000Z', 'data': {'card': {'id': 'c3'}, 'old': {'name': 'x'}}},
+        ]
+        self.assertEqual(closure_dates_from_actions(actions), {'c1': datetime.date(2025, 5, 6)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import datetime
+import os
+import time
+import unittest
+
+from gtd.trello import timestamps
+from gtd.trello.card import Card
+
+
+class TestTimestamps(unittest.TestCase):
+
+    def set_timezone(self, name):
+        old = os.environ.get("TZ")
+
+        def restore():
+            if old is None:
+                os.environ.pop("TZ", None)
+            else:
+                os.environ["TZ"] = old
+            time.tzset()
+            timestamps.clear_caches()
+        self.addCleanup(restore)
+        os.environ["TZ"] = name
+        time.tzset()
+        timestamps.clear_caches()
+
+    def test_parse_utc(self):
+        self.assertEqual(timestamps.parse_utc("2025-05-08T01:02:03.456Z"), datetime.datetime(2025, 5, 8, 1, 2, 3, 456000))
+        self.assertEqual(timestamps.parse_utc("2025-05-08T01:02:03Z"), datetime.datetime(2025, 5, 8, 1, 2, 3))
+        for invalid in (None, "", "2025-05-08", "2025-05-08T01:02:03.000", "2025-05-08T01:02:03+01:00Z", "2025-13-08T01:02:03.000Z"):
+            self.assertIsNone(timestamps.parse_utc(invalid), invalid)
+        self.assertIs(timestamps.parse_utc("2025-05-08T01:02:03.456Z"), timestamps.parse_utc("2025-05-08T01:02:03.456Z"))
+
+    def test_local_time_follows_daylight_saving_time(self):
+        self.set_timezone("Europe/Berlin")
+        self.assertEqual(timestamps.parse_local("2025-01-15T12:00:00.000Z"), datetime.datetime(2025, 1, 15, 13, 0))
+        self.assertEqual(timestamps.parse_local("2025-07-15T12:00:00.000Z"), datetime.datetime(2025, 7, 15, 14, 0))
+        # clocks go forward at 01:00 UTC
+        self.assertEqual(timestamps.parse_local("2025-03-30T00:59:59.000Z"), datetime.datetime(2025, 3, 30, 1, 59, 59))
+        self.assertEqual(timestamps.parse_local("2025-03-30T01:00:00.000Z"), datetime.datetime(2025, 3, 30, 3, 0))
+        self.assertEqual(Card({"id": "c1", "due": "2025-07-15T12:00:00.000Z"}).due, datetime.datetime(2025, 7, 15, 14, 0))
+        self.assertEqual(Card({"id": "c1", "due": "2025-07-15T12:00:00.000Z"}, datetime.timedelta(hours=1)).due, datetime.datetime(2025, 7, 15, 13, 0))
+
+    def test_half_hour_time_zone(self):
+        self.set_timezone("Asia/Kolkata")
+        self.assertEqual(timestamps.to_local(datetime.datetime(2025, 5, 8, 12, 0)), datetime.datetime(2025, 5, 8, 17, 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from gtd.utils import Retry, TokenBucket, get_retry_stats, is_retryable, rate_limited, reset_retry_stats
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_does_not_wait(self):
+        bucket = TokenBucket(rate=1, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            self.assertEqual(bucket.acquire(), 0)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_rate_is_limited_across_threads(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        calls = []
+
+        @rate_limited(bucket)
+        def call():
+            calls.append(time.monotonic())
+
+        threads = [threading.Thread(target=lambda: [call() for _ in range(5)]) for _ in range(4)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 20)
+        # first call uses the initial token, 19 more need 19 / 50 seconds
+        self.assertGreaterEqual(time.monotonic() - start, 19 / 50 - 0.05)
+
+    def test_zero_rate_means_no_limit(self):
+        bucket = TokenBucket(rate=0, capacity=0)
+        for _ in range(100):
+            self.assertEqual(bucket.acquire(), 0)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__("HTTP %d" % status)
+        self.response = MagicMock(status_code=status, headers=headers or {})
+
+
+class TestRetry(unittest.TestCase):
+
+    def setUp(self):
+        sleep_patch = patch("gtd.utils.time.sleep")
+        self.sleep = sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+        reset_retry_stats()
+
+    def failing(self, *errors, result="ok"):
+        errors = list(errors)
+
+        def func():
+            if errors:
+                raise errors.pop(0)
+            return result
+        return func
+
+    def test_errors_which_are_not_transient_are_raised_immediately(self):
+        func = Retry()(self.failing(ValueError("Board not found")))
+        with self.assertRaises(ValueError):
+            func()
+        self.sleep.assert_not_called()
+
+    def test_transient_errors_are_retried(self):
+        func = Retry()(self.failing(HTTPError(503), ConnectionResetError(), TimeoutError()))
+        self.assertEqual(func(), "ok")
+        self.assertEqual(self.sleep.call_count, 3)
+        self.assertEqual(get_retry_stats()["retries"], 3)
+
+    def test_wrapped_errors_are_classified_by_their_cause(self):
+        def func():
+            try:
+                raise HTTPError(429)
+            except Exception:
+                raise ValueError("Error getting boards")
+        self.assertTrue(is_retryable(self.capture(func)))
+        self.assertFalse(is_retryable(HTTPError(404)))
+
+    def capture(self, func):
+        try:
+            func()
+        except Exception as e:
+            return e
+
+    def test_retry_after_is_honored(self):
+        func = Retry(base_delay=0.01)(self.failing(HTTPError(429, {"Retry-After": "7"})))
+        self.assertEqual(func(), "ok")
+        delay = self.sleep.call_args[0][0]
+        self.assertGreaterEqual(delay, 7)
+        self.assertLess(delay, 7.02)
+
+    def test_max_retries(self):
+        func = Retry(max_retries=2)(self.failing(*[HTTPError(500)] * 5))
+        with self.assertRaises(HTTPError):
+            func()
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_nested_retries_share_budget(self):
+        inner = Retry(max_retries=2)(self.failing(*[HTTPError(500)] * 10))
+        outer = Retry(max_retries=2)(lambda: inner())
+        with self.assertRaises(HTTPError):
+            outer()
+        # outer does not retry operation whose retries were exhausted by inner one
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_deadline_stops_retries(self):
+        func = Retry(deadline=5)(self.failing(*[HTTPError(429, {"Retry-After": "60"})] * 3))
+        with self.assertRaises(HTTPError):
+            func()
+        self.sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,17 +3,24 @@ from abc import abstractclassmethod, abstractmethod
 from pprint import pprint
 import re
 from typing import Any
-import trello 
 import os
 import json  
 import datetime 
-from gtd.config import get_config_bool, get_config_list, get_config_str
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from gtd.config import get_config_bool, get_config_float, get_config_int, get_config_list, get_config_str
 from gtd.style import *
-from gtd.extensions import ReportService, load_extensions
+from gtd.extensions import ReportService, get_snapshot, load_extensions
 from gtd.importer import Importer
-from gtd.utils import ExponentialBackoff
+from gtd.utils import Retry, TokenBucket, get_retry_stats, rate_limited
 from gtd.attachments import get_attachments_dir, attach_file
 from gtd.drive import get_context_for_project
+from gtd.trello.card import Card
+from gtd.trello.timestamps import parse_local, parse_utc
+from gtd.trello.frame import CardFrame
+from gtd.trello.snapshot import BoardSnapshot
+from gtd.trello.store import CLOSURE_ACTIONS_FILTER, CardStore, closure_dates_from_actions, iter_board_actions
 
 import logging
 
@@ -36,14 +43,10 @@ except ImportError:
     ai_enabled = False
 
 def utc_to_this_tz(utc_time: str) -> datetime.datetime:
-    current_utc_time = datetime.datetime.utcnow()
-    current_time = datetime.datetime.now()
-    dt = current_time - current_utc_time
-    try:
-        return datetime.datetime.strptime(utc_time, "%Y-%m-%dT%H:%M:%S.%fZ") + dt
-    except ValueError:
+    local_time = parse_local(utc_time)
+    if local_time is None:
         print("Error parsing date: %s" % utc_time)
-        return None
+    return local_time
 
 def CheckField(field):
     return lambda c: field in c and c[field] is not None and c[field]
@@ -51,7 +54,71 @@ def CheckField(field):
 def NotCheckField(field):
     return lambda c: not CheckField(field)(c)
 
-backoff = ExponentialBackoff(base_delay=1, max_delay=60, max_retries=5)
+backoff = Retry(
+    base_delay=1,
+    max_delay=60,
+    max_retries=5,
+    deadline=get_config_float("trello_retry_deadline", 120, "Maximum seconds spent retrying one Trello operation"),
+)
+
+# maximum number of URLs Trello accepts in one batch request
+BATCH_SIZE = 10
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# Trello allows 100 requests per 10 seconds per token (and 300 per key)
+TRELLO_REQUEST_LIMIT = 100
+TRELLO_LIMIT_WINDOW = 10
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Returns token bucket shared by all TrelloAPI instances in this process. Bucket lets
+    through at most burst + rate * window requests in any window, so configured values
+    are lowered when they would exceed the stricter token limit of Trello.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            rate = get_config_float("trello_requests_per_second", 9, "Maximum average number of requests per second sent to Trello, 0 disables limit")
+            burst = get_config_int("trello_request_burst", 10, "Maximum number of requests sent to Trello in a burst")
+            if rate > 0 and burst + rate * TRELLO_LIMIT_WINDOW > TRELLO_REQUEST_LIMIT:
+                burst = max(1, min(burst, int(TRELLO_REQUEST_LIMIT - rate * TRELLO_LIMIT_WINDOW)))
+                rate = min(rate, (TRELLO_REQUEST_LIMIT - burst) / TRELLO_LIMIT_WINDOW)
+                logger.warning("Trello rate limit lowered to %.1f requests per second with burst of %d to stay within %d requests per %d seconds", rate, burst, TRELLO_REQUEST_LIMIT, TRELLO_LIMIT_WINDOW)
+            _rate_limiter = TokenBucket(rate, burst)
+        return _rate_limiter
+
+class RateLimitedSection:
+    """
+    Wraps section of Trello SDK (boards, cards, lists, ...) so that every request
+    takes token from the shared rate limiter.
+    """
+
+    def __init__(self, section, limiter: TokenBucket) -> None:
+        self._section = section
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._section, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        return rate_limited(self._limiter)(attr)
+
+class RateLimitedTrelloApi:
+    """
+    Trello SDK client whose requests are rate limited.
+    """
+
+    def __init__(self, api, limiter: TokenBucket) -> None:
+        self._api = api
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name.startswith("_") or isinstance(attr, (str, int, float, type(None))):
+            return attr
+        return RateLimitedSection(attr, self._limiter)
 
 class TrelloAPI:
     def __init__(self, apikey=None, token=None) -> None:
@@ -65,6 +132,7 @@ class TrelloAPI:
         :raises ValueError: If the Trello API key is invalid
         """
         
+        import trello
         if apikey is None:
             apikey = get_config_str("trello_apikey", "", "Trello API key")
         if apikey == "":
@@ -88,8 +156,95 @@ class TrelloAPI:
         except Exception as e:
             logger.error("Error setting Trello token: %s", e)
             raise ValueError("Error setting Trello token: %s" % e)
-        self.api = api
+        self.api = RateLimitedTrelloApi(api, get_rate_limiter())
         self.list_name = {} 
+        self.lock = threading.RLock()
+        self.max_workers = get_config_int("trello_max_workers", 8, "Number of concurrent requests when fetching data of many cards")
+        self.use_snapshots = get_config_bool("trello_board_snapshot", True, "Whether to fetch whole board (cards, lists and checklists) in one request instead of separate requests")
+        self.snapshots = {}
+        self.board_cache_ttl = get_config_int("trello_board_cache_ttl", 300, "Seconds for which list of Trello boards is cached, 0 disables caching")
+        self.boards_by_name = None
+        self.boards_by_id = None
+        self.boards_fetched_at = None
+        store_path = get_config_str("trello_store", "", "Path of SQLite database where Trello boards are kept and synced incrementally, empty disables the store")
+        self.store = None
+        if store_path != "":
+            store_path = os.path.expanduser(store_path)
+            os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+            self.store = CardStore(store_path)
+        # board id -> {card id: closure date}
+        self.closure_indexes = {}
+        # board id -> {checklist id: checklist}, used when snapshots are disabled
+        self.board_checklists = {}
+        # responses fetched in advance through batch endpoint, keyed by (kind, card id)
+        self.prefetched = {}
+
+    @backoff
+    def get_snapshot(self, board_name=None):
+        """
+        Returns BoardSnapshot of given board. Snapshot is fetched once and reused until
+        something is written to Trello through this instance.
+
+        :param board_name: Name of the board, default board if not provided
+        :raises ValueError: If board cannot be fetched
+        """
+        board = self.get_board(board_name)
+        # lock prevents fetching same board twice from concurrent map_cards workers
+        with self.lock:
+            if board['id'] not in self.snapshots:
+                try:
+                    if self.store is not None:
+                        self.store.sync(self.api, board['id'])
+                        self.snapshots[board['id']] = self.store.get_snapshot(board['id'])
+                    else:
+                        self.snapshots[board['id']] = BoardSnapshot.fetch(self.api, board['id'])
+                except Exception as e:
+                    logger.error("Error getting board snapshot: %s", e)
+                    raise ValueError("Error getting board snapshot")
+            return self.snapshots[board['id']]
+
+    def map_cards(self, func, cards):
+        """
+        Calls func for every card concurrently, using at most trello_max_workers threads.
+        Requests are still limited by shared rate limiter.
+
+        :param func: Function taking card
+        :param cards: List of cards
+        :return: List of results in order of cards
+        """
+        cards = list(cards)
+        if len(cards) <= 1 or self.max_workers <= 1:
+            return [func(c) for c in cards]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(cards))) as executor:
+            return list(executor.map(func, cards))
+
+    def invalidate_snapshots(self):
+        """
+        Drops fetched board snapshots, next read fetches boards again.
+        """
+        self.snapshots = {}
+        self.board_checklists = {}
+
+    def sync(self, board_name=None, resync=False):
+        """
+        Syncs local store with Trello for given board or all default boards.
+
+        :param board_name: Name of the board, all default boards if not provided
+        :param resync: Download whole boards again instead of changes since last sync
+        :raises ValueError: If store is not configured
+        """
+        if self.store is None:
+            raise ValueError("Trello store not configured, set trello_store in configuration")
+        board_names = self.get_default_boards() if board_name is None else [board_name]
+        for b in board_names:
+            board = self.get_board(b)
+            applied = self.store.sync(self.api, board['id'], resync=resync)
+            if applied is None:
+                logger.info("Board %s downloaded", b)
+            else:
+                logger.info("Board %s synced, %d changes applied", b, applied)
+        self.invalidate_snapshots()
+        self.closure_indexes = {}
 
     @backoff
     def get_boards(self):
@@ -100,20 +255,53 @@ class TrelloAPI:
             logger.error("Error getting boards: %s", e)
             raise ValueError("Error getting boards")
     
+    def _is_board_directory_fresh(self):
+        return self.boards_fetched_at is not None and time.monotonic() - self.boards_fetched_at < self.board_cache_ttl
+
+    def _refresh_board_directory(self):
+        boards = self.get_boards()
+        try:
+            by_name = {}
+            for b in boards:
+                # first board with given name wins, same as linear search
+                by_name.setdefault(b['name'], b)
+            self.boards_by_name = by_name
+            self.boards_by_id = {b['id']: b for b in boards}
+            self.boards_fetched_at = time.monotonic()
+        except KeyError:
+            logger.error("Key 'name' not found in board, API probably changed")
+            raise ValueError("Key 'name' not found in board, API probably changed")
+
+    def _lookup_board(self, index, key):
+        """
+        Looks up board in directory index ("name" or "id"). Directory is fetched when
+        it expires and refreshed once more when board is not found in it, so boards
+        created in the meantime are found.
+        """
+        refreshed = False
+        if not self._is_board_directory_fresh():
+            self._refresh_board_directory()
+            refreshed = True
+        board = getattr(self, "boards_by_" + index).get(key)
+        if board is None and not refreshed:
+            self._refresh_board_directory()
+            board = getattr(self, "boards_by_" + index).get(key)
+        return board
+
+    def invalidate_board_directory(self):
+        self.boards_fetched_at = None
+
     @backoff
     def get_board(self, board_name=None):
         if board_name is None:
             logger.info("Getting default board")
             board_name = self.get_default_boards()[0]
-        try:
-            logger.info("Getting board with name: %s", board_name)
-            return next(b for b in self.get_boards() if b['name'] == board_name)
-        except StopIteration:
+        logger.info("Getting board with name: %s", board_name)
+        board = self._lookup_board("name", board_name)
+        if board is None:
             logger.error("Board not found: %s", board_name)
             raise ValueError("Board not found: %s" % board_name)
-        except KeyError:
-            logger.error("Key 'name' not found in board, API probably changed")
-            raise ValueError("Key 'name' not found in board, API probably changed")
+        return board
 
     @backoff
     def get_default_boards(self):
@@ -143,6 +331,8 @@ class TrelloAPI:
         if board_name is None:
             board_names = self.get_default_boards()
             return sum([self.get_lists(board_name=b) for b in board_names], [])
+        if self.use_snapshots:
+            return self.get_snapshot(board_name).get_open_lists()
         board = self.get_board(board_name)
         try:
             return self.api.boards.get_list(board['id'])
@@ -161,9 +351,13 @@ class TrelloAPI:
             )
             logger.info("Got %d open cards for all boards", len(result))
             return result
+        if self.use_snapshots:
+            result = list(filter(NotCheckField("dueComplete"), self.get_snapshot(board_name).get_visible_cards()))
+            logger.info("Got %d open cards for board %s", len(result), board_name)
+            return result
         board = self.get_board(board_name)
         try:
-            result = list(filter(NotCheckField("dueComplete"), self.api.boards.get_card(board['id'])))
+            result = Card.wrap_all(filter(NotCheckField("dueComplete"), self.api.boards.get_card(board['id'])))
             logger.info("Got %d open cards for board %s", len(result), board_name)
             return result
 
@@ -181,10 +375,16 @@ class TrelloAPI:
             )
             logger.info("Got %d closed cards for all boards", len(result))
             return result
+        if self.use_snapshots:
+            snapshot = self.get_snapshot(board_name)
+            cards = snapshot.get_archived_cards() + list(filter(CheckField("dueComplete"), snapshot.get_visible_cards()))
+            result =  [c for c in cards if abandomed_label not in c.label_names]
+            logger.info("Got %d closed cards for board %s", len(result), board_name)
+            return result
         board = self.get_board(board_name)
         try:
-            cards =  self.api.boards.get_card(board['id'], filter='closed') + list(filter(CheckField("dueComplete"), self.api.boards.get_card(board['id'])))
-            result =  [c for c in cards if abandomed_label not in [l["name"] for l in c["labels"]]]
+            cards =  Card.wrap_all(self.api.boards.get_card(board['id'], filter='closed') + list(filter(CheckField("dueComplete"), self.api.boards.get_card(board['id']))))
+            result =  [c for c in cards if abandomed_label not in c.label_names]
             logger.info("Got %d closed cards for board %s", len(result), board_name)
             return result
         except Exception as e:
@@ -200,6 +400,10 @@ class TrelloAPI:
                 [self.get_closed_lists(board_name=b) for b in board_names],
                 []
             )
+        if self.use_snapshots:
+            result = self.get_snapshot(board_name).get_closed_lists()
+            logger.info("Got %d closed lists for board %s", len(result), board_name)
+            return result
         board = self.get_board(board_name)
         try:
             result = self.api.boards.get_list(board['id'], filter='closed')
@@ -213,7 +417,10 @@ class TrelloAPI:
     def get_list_name(self, card):
         try:
             if card['idList'] not in self.list_name:
-                self.list_name[card['idList']] = self.api.lists.get(card['idList'])['name']
+                name = self._find_in_snapshots(lambda s: s.get_list_name(card['idList']))
+                if name is None:
+                    name = self.api.lists.get(card['idList'])['name']
+                self.list_name[card['idList']] = name
             return self.list_name[card['idList']]
         except KeyError:
             raise ValueError("Key 'name' not found in list, API probably changed, data: %s" % card)
@@ -222,17 +429,138 @@ class TrelloAPI:
             raise ValueError("Error getting list name")
     
     @backoff
-    def get_checklist(self, card):
+    def get_board_checklists(self, board_id):
+        """
+        Returns dictionary mapping checklist id to checklist for all checklists of the board.
+        Checklists are taken from board snapshot if it is loaded, otherwise they are fetched
+        with one request per board and cached.
+        """
+        with self.lock:
+            if board_id in self.snapshots:
+                return self.snapshots[board_id].checklists
+            if board_id not in self.board_checklists:
+                try:
+                    self.board_checklists[board_id] = {c['id']: c for c in self.api.boards.get_checklist(board_id)}
+                except Exception as e:
+                    logger.error("Error getting checklists: %s", e)
+                    raise ValueError("Error getting checklists")
+            return self.board_checklists[board_id]
+
+    @backoff
+    def get_checklists(self, card):
+        """
+        Returns all checklists of the given card in order of its idChecklists.
+        """
         try:
-            if len(card['idChecklists']) == 0:
-                return None
-            return self.api.checklists.get(card['idChecklists'][0])
+            ids = card['idChecklists']
+            if len(ids) == 0:
+                return []
+            board_checklists = self.get_board_checklists(card['idBoard']) if 'idBoard' in card else {}
+            result = []
+            for checklist_id in ids:
+                checklist = board_checklists.get(checklist_id)
+                if checklist is None:
+                    checklist = self._find_in_snapshots(lambda s: s.get_checklist(checklist_id))
+                if checklist is None:
+                    checklist = self.api.checklists.get(checklist_id)
+                result.append(checklist)
+            return result
         except KeyError:
             raise ValueError("Key 'idChecklists' not found in card, API probably changed, data: %s" % card)
+        except ValueError:
+            raise
         except Exception as e:
             logger.error("Error getting checklist: %s", e)
             raise ValueError("Error getting checklist")
+
+    def get_checklist(self, card):
+        """
+        Returns first checklist of the given card or None if card has no checklists.
+        """
+        checklists = self.get_checklists(card)
+        return checklists[0] if len(checklists) > 0 else None
     
+    def _find_in_snapshots(self, lookup):
+        for snapshot in self.snapshots.values():
+            result = lookup(snapshot)
+            if result is not None:
+                return result
+        return None
+
+    @backoff
+    def _batch_chunk(self, urls):
+        try:
+            return self.api.batches.get(",".join(urls))
+        except Exception as e:
+            logger.error("Error in batch request: %s", e)
+            raise ValueError("Error in batch request")
+
+    def batch(self, urls):
+        """
+        Sends GET requests through Trello batch endpoint, BATCH_SIZE URLs per request.
+
+        :param urls: List of API paths, e.g. /cards/ID?attachments=true. Paths must not contain commas.
+        :return: List of responses in order of urls, None for requests which failed
+        :raises ValueError: If batch request fails
+        """
+        results = []
+        for i in range(0, len(urls), BATCH_SIZE):
+            chunk = urls[i:i + BATCH_SIZE]
+            for url, response in zip(chunk, self._batch_chunk(chunk)):
+                if "200" in response:
+                    results.append(response["200"])
+                else:
+                    logger.warning("Batch request %s failed: %s", url, response)
+                    results.append(None)
+        return results
+
+    def _prefetch(self, kind, cards, url):
+        ids = list(dict.fromkeys(c['id'] for c in cards if (kind, c['id']) not in self.prefetched))
+        if len(ids) == 0:
+            return
+        logger.info("Prefetching %s of %d cards", kind, len(ids))
+        try:
+            responses = self.batch([url % card_id for card_id in ids])
+        except ValueError as e:
+            # cards which were not prefetched are fetched one by one when needed
+            logger.warning("Could not prefetch %s: %s", kind, e)
+            return
+        for card_id, response in zip(ids, responses):
+            if response is not None:
+                self.prefetched[(kind, card_id)] = response
+
+    def prefetch_card_details(self, cards):
+        """
+        Fetches attachments and comments of given cards through batch endpoint, so
+        get_attachments and get_comments do not issue request per card.
+        """
+        self._prefetch("details", cards, "/cards/%s?fields=id&attachments=true&actions=commentCard")
+
+    def prefetch_card_updates(self, cards):
+        """
+        Fetches update actions of given cards through batch endpoint for get_closure_date.
+        """
+        self._prefetch("updates", cards, "/cards/%s?fields=id&actions=updateCard")
+
+    def prefetch_list_names(self, cards):
+        """
+        Fetches names of lists of given cards which are not known yet through batch endpoint.
+        """
+        list_ids = list(dict.fromkeys(
+            c['idList'] for c in cards
+            if c['idList'] not in self.list_name and self._find_in_snapshots(lambda s: s.get_list_name(c['idList'])) is None
+        ))
+        if len(list_ids) == 0:
+            return
+        try:
+            responses = self.batch(["/lists/%s?fields=name" % list_id for list_id in list_ids])
+        except ValueError as e:
+            logger.warning("Could not prefetch list names: %s", e)
+            return
+        for list_id, response in zip(list_ids, responses):
+            if response is not None:
+                self.list_name[list_id] = response['name']
+
     @backoff
     def add_list(self, name, board_name=None):
         logger.info("Adding list with name: %s to board: %s", name, board_name if board_name else "default board")
@@ -240,32 +568,36 @@ class TrelloAPI:
             board_names = self.get_default_boards()
             return self.add_list(name, board_name=board_names[0])
         board = self.get_board(board_name)
+        self.invalidate_snapshots()
         try:
             return self.api.lists.new(name, board['id'])
         except Exception as e:
             logger.error("Error creating list: %s", e)
             raise ValueError("Error creating list")
     @backoff
-    def add_card(self, name, list_id, desc=None, due=None):
+    def add_card(self, name, list_id, desc=None, due=None, pos=None):
         logger.info("Adding card with name: %s to list: %s", name, list_id)
+        self.invalidate_snapshots()
         try:
-            return self.api.cards.new(name, list_id, desc=desc, due=due)
+            return self.api.cards.new(name, list_id, desc=desc, due=due, pos=pos)
         except Exception as e:
             logger.error("Error creating card: %s", e)
             raise ValueError("Error creating card")
     @backoff
-    def add_checklist(self, card_id, name):
+    def add_checklist(self, card_id, name, pos=None):
+        self.invalidate_snapshots()
         try:
             logger.info("Adding checklist with name: %s to card: %s", name, card_id)
-            return self.api.checklists.new(card_id, name)
+            return self.api.checklists.new(card_id, name, pos=pos)
         except Exception as e:
             logger.error("Error creating checklist: %s", e)
             raise ValueError("Error creating checklist")
     @backoff
-    def add_checklist_item(self, checklist_id, name):
+    def add_checklist_item(self, checklist_id, name, pos=None):
+        self.invalidate_snapshots()
         try:
             logger.info("Adding checklist item with name: %s to checklist: %s", name, checklist_id)
-            return self.api.checklists.new_checkItem(checklist_id, name)
+            return self.api.checklists.new_checkItem(checklist_id, name, pos=pos)
         except Exception as e:
             logger.error("Error creating checklist item: %s", e)
             raise ValueError("Error creating checklist item")
@@ -273,6 +605,8 @@ class TrelloAPI:
     @backoff
     def has_label(self, card, label_name):
         try:
+            if isinstance(card, Card):
+                return card.has_label(label_name)
             return any(l['name'] == label_name for l in card['labels'])
         except KeyError:
             raise ValueError("Key 'labels' not found in card, API probably changed, data: %s" % card)
@@ -286,6 +620,7 @@ class TrelloAPI:
         """
         try:
             label = next(l for l in card['labels'] if l['name'] == label_name)
+            self.invalidate_snapshots()
             self.api.cards.delete_idLabel_idLabel(label['id'], card['id'])
         except StopIteration:
             raise ValueError("Label not found: %s" % label_name)
@@ -302,7 +637,10 @@ class TrelloAPI:
         """
         try:
             comments = []
-            for c in self.api.cards.get(card['id'], actions='commentCard')['actions']:
+            details = self.prefetched.get(("details", card['id']))
+            if details is None:
+                details = self.api.cards.get(card['id'], actions='commentCard')
+            for c in details['actions']:
                 if c['type'] == 'commentCard':
                     comments.append({
                         'text': c['data']['text'],
@@ -321,7 +659,10 @@ class TrelloAPI:
         Returns attachments from given card.
         """
         try:
-            return self.api.cards.get(card['id'], attachments='true')['attachments']
+            details = self.prefetched.get(("details", card['id']))
+            if details is None:
+                details = self.api.cards.get(card['id'], attachments='true')
+            return details['attachments']
         except KeyError:
             raise ValueError("Key 'attachments' not found in card, API probably changed, data: %s" % card)
         except Exception as e:
@@ -334,6 +675,7 @@ class TrelloAPI:
         Attaches HTML to given card.
         """
         logger.info("Attaching content to card %s with title %s", card["name"], title)
+        self.prefetched.pop(("details", card['id']), None)
         attachments_dir = get_attachments_dir()
         attachment_path = os.path.join(attachments_dir, title + ".html")
         if not os.path.exists(attachments_dir):
@@ -398,6 +740,8 @@ MathJax = {
         """
         Returns the creation date of the given card.
         """
+        if isinstance(card, Card) and card.created is not None:
+            return card.created
         try:
             card_id = card['id']
             # First 8 chars = timestamp (hex)
@@ -413,28 +757,74 @@ MathJax = {
         """
         Returns the closure date of the given card.
         """
+        index = self.closure_indexes.get(card.get('idBoard'))
+        if index is not None:
+            return index.get(card['id'])
         try:
-            activity = self.api.cards.get(card['id'], actions='updateCard')
-            f = lambda date_str: datetime.datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ").date()
-            for act in sorted(activity['actions'], key=lambda x: f(x['date']), reverse=True):
-                
-                if ("data" in act and 
-                    'old' in act['data'] and 
-                    'closed' in act['data']['old'] and
-                    not act['data']['old']['closed']):
-                    d = f(act['date'])
-                    return d
-            return None
+            activity = self.prefetched.get(("updates", card['id']))
+            if activity is None:
+                activity = self.api.cards.get(card['id'], actions='updateCard')
+            return closure_dates_from_actions(activity['actions']).get(card['id'])
         except Exception as e:
             raise ValueError("Error getting closure date: %s" % e)
 
+    @backoff
+    def get_closure_index(self, board_id):
+        """
+        Returns dictionary mapping id of every card of the board which was ever closed
+        (archived or marked complete) to date of its latest closure. Index is read from
+        the store if board was synced, otherwise it is built from closure actions of
+        the board, 1000 actions per request.
+
+        :param board_id: Id of the board
+        :raises ValueError: If actions of the board cannot be fetched
+        """
+        with self.lock:
+            if board_id not in self.closure_indexes:
+                try:
+                    if self.store is not None and self.store.is_synced(board_id):
+                        index = self.store.get_closure_dates(board_id)
+                    else:
+                        index = closure_dates_from_actions(iter_board_actions(self.api, board_id, filter=CLOSURE_ACTIONS_FILTER))
+                except Exception as e:
+                    logger.error("Error getting closure dates: %s", e)
+                    raise ValueError("Error getting closure dates")
+                logger.info("Closure index of board %s has %d cards", board_id, len(index))
+                self.closure_indexes[board_id] = index
+            return self.closure_indexes[board_id]
+
+    def get_closure_dates(self, cards):
+        """
+        Returns dictionary mapping card id to closure date (None if unknown) for given cards.
+        Dates are looked up in closure index of card's board, cards without board are
+        looked up one by one.
+        """
+        result = {}
+        without_board = []
+        for c in cards:
+            if 'idBoard' in c:
+                result[c['id']] = self.get_closure_index(c['idBoard']).get(c['id'])
+            else:
+                without_board.append(c)
+        if len(without_board) > 0:
+            self.prefetch_card_updates(without_board)
+            for c, closure_date in zip(without_board, self.map_cards(self.get_closure_date, without_board)):
+                result[c['id']] = closure_date
+        return result
+
     def get_board_name(self, card):
         """
         Returns the name of the board the given card belongs to.
         """
         try:
             board_id = card['idBoard']
-            board = self.api.boards.get(board_id)
+            if board_id in self.snapshots:
+                return self.snapshots[board_id].name
+            board = self._lookup_board("id", board_id)
+            if board is None:
+                # board card belongs to is not among member's boards, remember it until next refresh
+                board = self.api.boards.get(board_id)
+                self.boards_by_id[board_id] = board
             return board['name']
         except KeyError:
             raise ValueError("Key 'idBoard' not found in card, API probably changed, data: %s" % card)
@@ -454,11 +844,170 @@ MathJax = {
             logger.error("Error checking if card is closed: %s", e)
             raise ValueError("Error checking if card is closed")
 
+class OfflineTrelloApi:
+    """
+    Stands in for Trello client in SnapshotTrelloAPI, every request fails.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+
+    def __getattr__(self, name):
+        raise ValueError("Trello is not available when reading snapshot %s" % self.path)
+
+def is_sqlite_file(path):
+    with open(path, "rb") as f:
+        return f.read(16) == b"SQLite format 3\x00"
+
+class SnapshotTrelloAPI(TrelloAPI):
+    """
+    TrelloAPI answering reads from backup written by python -m gtd.trello backup (full or
+    compacted) or from local store (trello_store), without network. Data is loaded once, so
+    reports see boards as they were when snapshot was taken. Writes fail. Comments are
+    available only in backups, attachments only in backups written with them.
+
+    :param path: Path of backup file or store database
+    """
+
+    def __init__(self, path) -> None:
+        self.path = os.path.expanduser(path)
+        if not os.path.exists(self.path):
+            raise ValueError("Snapshot %s does not exist" % self.path)
+        self.api = OfflineTrelloApi(self.path)
+        self.list_name = {}
+        self.lock = threading.RLock()
+        self.max_workers = 1
+        self.use_snapshots = True
+        self.store = None
+        self.board_cache_ttl = 0
+        self.boards_fetched_at = None
+        self.board_checklists = {}
+        self.prefetched = {}
+        self.snapshots = {}
+        self.closure_indexes = {}
+        # card id -> comments as returned by get_comments
+        self.comments = {}
+        if is_sqlite_file(self.path):
+            self._load_store()
+        else:
+            self._load_backup()
+        boards = [s.board for s in self.snapshots.values()]
+        self.boards_by_name = {}
+        for b in boards:
+            self.boards_by_name.setdefault(b['name'], b)
+        self.boards_by_id = {b['id']: b for b in boards}
+        logger.info("Loaded snapshot %s with %d boards", self.path, len(self.snapshots))
+
+    def _load_store(self):
+        store = CardStore(self.path)
+        try:
+            for board_id in store.get_board_ids():
+                self.snapshots[board_id] = store.get_snapshot(board_id)
+                self.closure_indexes[board_id] = store.get_closure_dates(board_id)
+        finally:
+            store.close()
+
+    def _load_backup(self):
+        from gtd.trello.backup import load_backup
+        for board_id, board in load_backup(self.path).items():
+            self.snapshots[board_id] = BoardSnapshot(board)
+            self.closure_indexes[board_id] = board["closures"]
+            for action in sorted(board["comments"], key=lambda a: a["date"], reverse=True):
+                self.comments.setdefault(action["data"]["card"]["id"], []).append({
+                    'text': action['data']['text'],
+                    'date': action['date'],
+                })
+
+    def _is_board_directory_fresh(self):
+        return True
+
+    def get_boards(self):
+        return list(self.boards_by_id.values())
+
+    def get_default_boards(self):
+        try:
+            return super().get_default_boards()
+        except ValueError:
+            # snapshot knows its boards even when they are not configured
+            return list(self.boards_by_name)
+
+    def get_snapshot(self, board_name=None):
+        return self.snapshots[self.get_board(board_name)['id']]
+
+    def invalidate_snapshots(self):
+        pass
+
+    def sync(self, board_name=None, resync=False):
+        raise ValueError("Snapshot %s cannot be synced" % self.path)
+
+    def prefetch_card_details(self, cards):
+        pass
+
+    def prefetch_card_updates(self, cards):
+        pass
+
+    def prefetch_list_names(self, cards):
+        pass
+
+    def get_comments(self, card):
+        return self.comments.get(card['id'], [])
+
+    def get_attachments(self, card):
+        return Card.of(card).get('attachments') or []
+
+def get_api(snapshot=None) -> TrelloAPI:
+    """
+    Returns SnapshotTrelloAPI reading given snapshot, or snapshot selected for the running
+    report (see gtd.extensions.using_snapshot) or configured one, TrelloAPI if there is none.
+
+    :param snapshot: Path of Trello backup or store
+    """
+    if snapshot is None:
+        snapshot = get_snapshot()
+    if snapshot is None:
+        snapshot = get_config_str("snapshot", "", "Path of Trello backup or store used by reports instead of Trello, empty uses Trello")
+    if snapshot != "":
+        return SnapshotTrelloAPI(snapshot)
+    return TrelloAPI()
+
+# relative costs of evaluating filter for one card, cheaper filters are evaluated first
+FIELD_COST = 1
+PYTHON_COST = 10
+API_COST = 1000
+
 class CardFilter:
+    """
+    Predicate over cards. Filters combined with &, | and ~ are evaluated with apply_filter
+    as a plan: filters reading only card fields are evaluated as masks over CardFrame and
+    children of And and Or are evaluated from the cheapest one, each seeing only cards
+    still undecided, so filters calling Trello run for as few cards as possible.
+    """
+    cost = PYTHON_COST
+
     @abstractmethod
     def filter(self, card) -> bool:
         pass
 
+    def select(self, frame: CardFrame, candidates, now, api=None):
+        """
+        Returns mask of candidate cards of the frame passing this filter.
+
+        :param frame: CardFrame of all cards being filtered
+        :param candidates: Boolean mask of cards to evaluate, other cards are not passing
+        :param now: Current time captured once for whole evaluation
+        :param api: TrelloAPI used to evaluate expensive filters concurrently
+        """
+        import numpy as np
+        indexes = np.flatnonzero(candidates)
+        cards = [frame.cards[i] for i in indexes]
+        if api is not None and self.cost >= API_COST:
+            passed = api.map_cards(self.filter, cards)
+        else:
+            passed = [self.filter(c) for c in cards]
+        result = np.zeros(len(frame), dtype=bool)
+        result[indexes[np.array(passed, dtype=bool)]] = True
+        return result
+
     def __call__(self, card) -> bool:
         return self.filter(card)
 
@@ -471,53 +1020,96 @@ class CardFilter:
     def __or__(self, other):
         return Or(self, other)
 class HasLabel(CardFilter):
+    cost = FIELD_COST
+
     def __init__(self, label_name):
         self.label_name = label_name
 
     def filter(self, card) -> bool:
-        return any(l['name'] == self.label_name for l in card['labels'])
+        return self.label_name in Card.of(card).label_names
+
+    def select(self, frame, candidates, now, api=None):
+        return candidates & frame.has_label(self.label_name)
 
 class HasChecklist(CardFilter):
+    cost = FIELD_COST
+
     def filter(self, card) -> bool:
-        return CheckField("idChecklists")(card)
+        return bool(CheckField("idChecklists")(card))
+
+    def select(self, frame, candidates, now, api=None):
+        return candidates & frame.has_checklists
 class DueIn(CardFilter):
+    cost = FIELD_COST
+
     def __init__(self, days):
         self.days = days
 
-    def filter(self, card) -> bool:
-        if "due" not in card or card["due"] is None:
-            return False
-        due_date = utc_to_this_tz(card["due"])
+    def filter(self, card, now=None) -> bool:
+        due_date = Card.of(card).due
         if due_date is None:
             return False
-        return (due_date - datetime.datetime.now()).days <= self.days
+        return (due_date - (now or datetime.datetime.now())).days <= self.days
+
+    def select(self, frame, candidates, now, api=None):
+        return candidates & frame.due_within(self.days, now)
 
 class Not(CardFilter):
     def __init__(self, filter: CardFilter):
         self._f = filter
+        self.cost = filter.cost
 
     def filter(self, card) -> bool:
         return not self._f.filter(card)
 
+    def select(self, frame, candidates, now, api=None):
+        return candidates & ~self._f.select(frame, candidates, now, api)
+
 class And(CardFilter):
     def __init__(self, *filters):
         self.filters = filters
+        self.cost = sum(f.cost for f in filters)
 
     def filter(self, card) -> bool:
-        return all(f.filter(card) for f in self.filters)
+        return all(f.filter(card) for f in sorted(self.filters, key=lambda f: f.cost))
+
+    def select(self, frame, candidates, now, api=None):
+        for f in sorted(self.filters, key=lambda f: f.cost):
+            if not candidates.any():
+                break
+            candidates = f.select(frame, candidates, now, api)
+        return candidates
 
 class Or(CardFilter):
     def __init__(self, *filters):
         self.filters = filters
+        self.cost = sum(f.cost for f in filters)
 
     def filter(self, card) -> bool:
-        return any(f.filter(card) for f in self.filters)
+        return any(f.filter(card) for f in sorted(self.filters, key=lambda f: f.cost))
+
+    def select(self, frame, candidates, now, api=None):
+        import numpy as np
+        result = np.zeros(len(frame), dtype=bool)
+        for f in sorted(self.filters, key=lambda f: f.cost):
+            if not candidates.any():
+                break
+            passed = f.select(frame, candidates, now, api)
+            result |= passed
+            candidates = candidates & ~passed
+        return result
 
 class All(CardFilter):
+    cost = 0
+
     def filter(self, card) -> bool:
         return True
 
+    def select(self, frame, candidates, now, api=None):
+        return candidates
+
 class HasUncheckedItems(CardFilter):
+    cost = API_COST
 
     def __init__(self, api: TrelloAPI):
         self.api = api
@@ -525,16 +1117,17 @@ class HasUncheckedItems(CardFilter):
     def filter(self, card) -> bool:
         if "idChecklists" not in card or len(card["idChecklists"]) == 0:
             return False
-        checklist_id = card["idChecklists"][0]
-        checklist = self.api.get_checklist(card)
-        if checklist is None:
-            return False
-        for item in checklist["checkItems"]:
-            if item["state"] == "incomplete":
-                return True
-        return False
+        return any(
+            item["state"] == "incomplete"
+            for checklist in self.api.get_checklists(card)
+            for item in checklist["checkItems"]
+        )
+
+    def select(self, frame, candidates, now, api=None):
+        return super().select(frame, candidates & frame.has_checklists, now, self.api)
 
 class HasCheckedItems(CardFilter):
+    cost = API_COST
 
     def __init__(self, api: TrelloAPI):
         self.api = api
@@ -542,24 +1135,42 @@ class HasCheckedItems(CardFilter):
     def filter(self, card) -> bool:
         if "idChecklists" not in card or len(card["idChecklists"]) == 0:
             return False
-        checklist_id = card["idChecklists"][0]
-        checklist = self.api.get_checklist(card)
-        if checklist is None:
-            return False
-        for item in checklist["checkItems"]:
-            if item["state"] == "complete":
-                return True
-        return False
+        return any(
+            item["state"] == "complete"
+            for checklist in self.api.get_checklists(card)
+            for item in checklist["checkItems"]
+        )
+
+    def select(self, frame, candidates, now, api=None):
+        return super().select(frame, candidates & frame.has_checklists, now, self.api)
 
 def get_closed_dates(api: TrelloAPI, closed_cards):
-    closed_this_week = {}
-    for c in closed_cards:
-        closure_date = api.get_closure_date(c)
-        closed_this_week[c['id']] = closure_date
-    return closed_this_week
-
-def task_section(title, cards, filter: CardFilter = All()):
-    filtered_cards = [c for c in cards if filter.filter(c)]
+    return api.get_closure_dates(closed_cards)
+
+def apply_filter(cards, filter: CardFilter, api: TrelloAPI = None, now=None):
+    """
+    Returns cards passing filter, in original order.
+
+    :param cards: List of cards
+    :param filter: Filter to evaluate
+    :param api: TrelloAPI used to evaluate filters fetching data per card concurrently
+    :param now: Time used by date filters, current time if not provided
+    """
+    import numpy as np
+    cards = list(cards)
+    frame = CardFrame(cards)
+    passed = filter.select(frame, np.ones(len(frame), dtype=bool), now or datetime.datetime.now(), api)
+    return [cards[i] for i in np.flatnonzero(passed)]
+
+def filter_cards(api: TrelloAPI, cards, filter: CardFilter):
+    """
+    Returns cards passing filter, evaluating filters which fetch data per card, like
+    HasCheckedItems, concurrently.
+    """
+    return apply_filter(cards, filter, api)
+
+def task_section(title, cards, filter: CardFilter = All(), api: TrelloAPI = None):
+    filtered_cards = apply_filter(cards, filter, api)
     if len(filtered_cards) == 0:
         return []
     return [section(title), items([ticket(c) for c in filtered_cards])]
@@ -580,12 +1191,12 @@ def deliverables_report(api: TrelloAPI, board_name, cards, week_start):
     result = []
     result.append(section("Deliverables this week for board %s" % board_name))
     deliverables = {}
+    api.prefetch_card_details(cards)
+    api.prefetch_list_names(cards)
+    card_data = api.map_cards(lambda c: (api.get_attachments(c), api.get_comments(c), api.get_list_name(c)), cards)
     
-    for c in cards:
+    for c, (attachments, comments, list_name) in zip(cards, card_data):
         logger.info("Processing card %s", c["name"])
-        attachments = api.get_attachments(c)
-        comments = api.get_comments(c)
-        list_name = api.get_list_name(c)
         logger.debug(
             "Attachments: %s, Comments: %s, List name: %s",
             attachments,
@@ -607,11 +1218,11 @@ def deliverables_report(api: TrelloAPI, board_name, cards, week_start):
             com_date_str = com_obj['date']
             
             # Parse comment date
-            try:
-                com_date = datetime.datetime.strptime(com_date_str, "%Y-%m-%dT%H:%M:%S.%fZ").date()
-            except ValueError:
+            com_date = parse_utc(com_date_str)
+            if com_date is None:
                 logger.warning("Could not parse comment date: %s", com_date_str)
                 continue
+            com_date = com_date.date()
             
             # Only include comments from this week onwards
             if com_date < week_start:
@@ -661,14 +1272,15 @@ def generate_report():
     result.append("<h1>Trello Report</h1>")
     try:
         logger.info("Initializing Trello API")
-        api = TrelloAPI()
+        api = get_api()
         logger.info("Trello API initialized successfully, getting backlog lists")
         backlog = api.get_lists()
         logger.debug("Backlog lists: %s", backlog)
         logger.info("Getting open cards")
-        open_cards = api.get_open_cards()
+        open_cards = Card.wrap_all(api.get_open_cards())
+        open_frame = CardFrame(open_cards)
         logger.info("Getting cards for this week")
-        this_week = list([c for c in open_cards if api.has_label(c, this_week_label)])
+        this_week = open_frame.take(open_frame.has_label(this_week_label))
 
         card_to_list = {}
         for c in this_week:
@@ -688,11 +1300,12 @@ def generate_report():
             result.append(section(mylist, level=1))
             result.append(items([ticket(c) for c in cards]))
 
-        due_soon = list([c for c in open_cards if CheckField("due")(c) and not CheckField("idChecklists")(c) and (utc_to_this_tz(c["due"]) - datetime.datetime.now()).days <= 7])
-        due_soon = sorted(due_soon, key=lambda c: utc_to_this_tz(c["due"]))
+        now = datetime.datetime.now()
+        due_soon = open_frame.take(open_frame.due_within(7, now) & ~open_frame.has_checklists)
+        due_soon = sorted(due_soon, key=lambda c: c.due)
         if len(due_soon) > 0:
             logger.info("Discovered %d tickets due in the next 7 days without checklists, adding to report", len(due_soon))
-            result.extend(task_section("Tickets due in 7 days without checklists or without unchecked items", due_soon, filter=Not(HasChecklist() & HasUncheckedItems(api))))
+            result.extend(task_section("Tickets due in 7 days without checklists or without unchecked items", due_soon, filter=Not(HasChecklist() & HasUncheckedItems(api)), api=api))
         result.extend(task_section("Tickets due in 14 days without label for this week", open_cards, filter=DueIn(14) & Not(HasLabel(this_week_label))))
         if get_config_bool("report_this_week_without_checklist", False, "Whether to report tickets for this week without checklist and generate action points for them"):
             result.append(section("Tickets this week without checklist"))
@@ -723,17 +1336,12 @@ def generate_report():
                     else:
                         result.append(paragraph("No suggestions found"))
         logger.info("Getting closed cards")
-        closed_cards = api.get_closed_cards()
+        closed_cards = Card.wrap_all(api.get_closed_cards())
+        closed_frame = CardFrame(closed_cards)
         number_closed_cards = len(closed_cards)
         # first day is day when we created first card
 
-        first_day = None
-        for c in open_cards + closed_cards:
-            if first_day is None:
-                first_day = datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date()
-            else:
-                if datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date() < first_day:
-                    first_day = datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date()
+        first_day = min((d for d in (open_frame.first_activity_date(), closed_frame.first_activity_date()) if d is not None), default=None)
         if first_day is None:
             first_day = datetime.datetime.now().date()
         days_passed = 1 + (datetime.datetime.now().date() - first_day).days
@@ -741,16 +1349,13 @@ def generate_report():
             days_passed = 1
         boards = api.get_default_boards()
         logger.debug("Boards: %s", boards)
+        import pandas as pd
         if len(boards) == 1:
             result.append(section("Number of open cards per list"))
-            data_table = [] 
-            
-            for l in backlog:
-                data_table.append({
-                    "List": l["name"],
-                    "Number of open cards": len([c for c in open_cards if c["idList"] == l["id"]])
-                })
-            df = pd.DataFrame(data_table)
+            df = pd.DataFrame({
+                "List": [l["name"] for l in backlog],
+                "Number of open cards": open_frame.count_per_list([l["id"] for l in backlog]),
+            })
             df["Cuumulative"] = df["Number of open cards"].cumsum()
             logger.debug("Data table for open cards per list: %s", df)
             result.append(table(df))
@@ -797,7 +1402,8 @@ def generate_report():
         )
         logger.info("Calculating closed cards for this week")
         closed_dates = get_closed_dates(api, closed_cards)
-        closed_this_week = [c for c in closed_cards if c['id'] in closed_dates and closed_dates[c['id']] is not None and closed_dates[c['id']] >= start_of_week]
+        closed_frame.set_closed_dates(closed_dates)
+        closed_this_week = closed_frame.take(closed_frame.closed_since(start_of_week))
         if get_config_bool("report_score", False, "Whether to report score for closed cards this week"):
             logger.info("Calculating score")
             score = score_closed_cards(
@@ -806,9 +1412,9 @@ def generate_report():
                 closed_dates=closed_dates
             )
             result.append(paragraph("Score for this week: %d" % score))
-        opened_this_week = list([c for c in open_cards if api.get_creation_date(c).date() >= start_of_week])
-        result.append(paragraph("Cards opened this week: %d" % len(opened_this_week)))
-        result.append("Net closure this week: %d" % (len(closed_this_week) - len(opened_this_week)))
+        opened_this_week = open_frame.count(open_frame.created_since(start_of_week))
+        result.append(paragraph("Cards opened this week: %d" % opened_this_week))
+        result.append("Net closure this week: %d" % (len(closed_this_week) - opened_this_week))
         list_to_closed_cards = {}
         for c in closed_this_week:
             list_name = api.get_list_name(c)
@@ -840,6 +1446,9 @@ def generate_report():
         result.append(error("%s" % e))
     result.append("</body>")
     result.append("</html>")
+    stats = get_retry_stats()
+    if stats["retries"] > 0:
+        logger.info("Retried %d requests, slept %.1f seconds", stats["retries"], stats["sleep_seconds"])
     logger.info("Report generated successfully")
     return "\n".join(result)
 
@@ -847,6 +1456,9 @@ def generate_report():
 
 def ai_help(api: TrelloAPI, cards, ai_help_label):
     api_key = load_credentials()
+    help_cards = [card for card in cards if api.has_label(card, ai_help_label)]
+    api.prefetch_card_details(help_cards)
+    api.prefetch_list_names(help_cards)
     for card in cards:
         if api.has_label(card, ai_help_label):
             project = api.get_list_name(card)
@@ -855,9 +1467,12 @@ def ai_help(api: TrelloAPI, cards, ai_help_label):
             description = card.get("desc", "")
             checklist = []
             if CheckField("idChecklists")(card):
-                checklist = api.get_checklist(card)
-                checklist = checklist["checkItems"]
-                checklist = [c["name"] for c in checklist if c["state"] == "incomplete"]
+                checklist = [
+                    item["name"]
+                    for c in api.get_checklists(card)
+                    for item in c["checkItems"]
+                    if item["state"] == "incomplete"
+                ]
             comment_objs = api.get_comments(card)
             # Extract just the text from comment objects for compatibility with get_help_with_task
             comments = [c['text'] for c in comment_objs] if comment_objs else None
@@ -871,21 +1486,134 @@ def ai_help(api: TrelloAPI, cards, ai_help_label):
             api.attach(card, attachment_name, response)
             logger.info("Attached response to card %s", attachment_name)
 
+# distance between positions of cards created by one upload, same as Trello leaves between cards
+CARD_POS_STEP = 16384
+
+def _attempt(func, *args, **kwargs):
+    """
+    Returns result of func or exception it raised.
+    """
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        return e
+
+DUE_DATE_IN_TITLE = re.compile(r"\[(\d{4}-\d{2}-\d{2})\]")
+
+def split_due_date(title):
+    """
+    Due date can be specified in title as [yyyy-mm-dd]. Returns title without it and
+    the due date, or unchanged title and None if title has no valid due date.
+    """
+    match = DUE_DATE_IN_TITLE.search(title)
+    if match is None:
+        return title, None
+    try:
+        due_date = datetime.datetime.strptime(match.group(1), "%Y-%m-%d").date()
+    except ValueError:
+        logger.warning("Could not parse due date from title: %s", match.group(1))
+        return title, None
+    return DUE_DATE_IN_TITLE.sub("", title).strip(), due_date
+
 class TrelloImporter(Importer):
+    """
+    Creates cards in Trello. Importer instance is an import session, until begin_session
+    starts a new one: lists and titles of open cards of a board are fetched once, on first
+    use of that board, and lists and cards created by the session are added to them, so
+    duplicates within the same upload are found too.
+    """
 
     def __init__(self):
         self.api = TrelloAPI()
+        self.lock = threading.RLock()
+        self.begin_session()
+
+    def begin_session(self):
+        """
+        Forgets lists and titles fetched by previous session, so cards and lists archived,
+        deleted or created by other clients since then are seen by the next upload.
+        """
+        with self.lock:
+            # (board, list name) -> titles of open cards in the list
+            self.titles = {}
+            self.indexed_boards = set()
+            # board -> list name -> list id, in board order
+            self.lists = {}
+            self.api.invalidate_snapshots()
+
+    def _board(self, context):
+        return context if context is not None else self.api.get_default_boards()[0]
+
+    def _lists(self, board_name, refresh=False):
+        """
+        Returns dictionary mapping list name to list id for the board, fetching lists on first use or on refresh.
+        """
+        with self.lock:
+            if refresh or board_name not in self.lists:
+                self.lists[board_name] = {l["name"].strip(): l["id"] for l in self.api.get_lists(board_name)}
+            return self.lists[board_name]
+
+    def _list_id(self, board_name, project):
+        """
+        Returns id of list with given name, creating the list if board does not have it.
+        """
+        with self.lock:
+            list_id = self._lists(board_name).get(project)
+            if list_id is None:
+                list_id = self._lists(board_name, refresh=True).get(project)
+            if list_id is None:
+                logger.info("Project %s not found, creating it", project)
+                list_id = self._add_list(project, board_name)
+            return list_id
+
+    def _add_list(self, name, board_name):
+        with self.lock:
+            new_list = self.api.add_list(name, board_name=board_name)
+            self._lists(board_name)[name.strip()] = new_list["id"]
+            return new_list["id"]
+
+    def _index_board(self, board_name):
+        with self.lock:
+            if board_name in self.indexed_boards:
+                return
+            list_names = {list_id: name for name, list_id in self._lists(board_name).items()}
+            for card in self.api.get_open_cards(board_name):
+                list_name = list_names.get(card["idList"])
+                if list_name is not None:
+                    self.titles.setdefault((board_name, list_name), set()).add(card["name"])
+            self.indexed_boards.add(board_name)
+            logger.info("Indexed titles of %d lists of board %s", len(list_names), board_name)
+
+    def _add_title(self, board_name, list_name, *titles):
+        with self.lock:
+            self.titles.setdefault((board_name, list_name), set()).update(titles)
 
     def list_projects(self, board_name=None):
-        return [l["name"].strip() for l in self.api.get_lists(board_name=board_name)]
+        if board_name is None:
+            return [name for b in self.api.get_default_boards() for name in self._lists(b)]
+        return list(self._lists(board_name))
 
     def create(self, title, description, due_date = None, context = None, project = None, checklists = None):
+        result = self.create_many([{
+            "title": title,
+            "description": description,
+            "due_date": due_date,
+            "context": context,
+            "project": project,
+            "checklists": checklists,
+        }])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _prepare(self, title, description = None, due_date = None, context = None, project = None, checklists = None):
+        """
+        Resolves board and list of the task, returns dictionary describing card to create.
+        """
         # context here represents the board
-        board_name = None 
         boards = self.api.get_default_boards()
         if context is None:
-            board_name = boards[0]
-            context = board_name
+            context = boards[0]
         if context not in boards:
             raise ValueError("Board %s not found in Trello boards: %s" % (context, ", ".join(boards)))
         logger.info("""
@@ -902,35 +1630,108 @@ class TrelloImporter(Importer):
             project = self.list_projects(context)[0]
         else:
             project = project.strip()
-        if project not in self.list_projects(context):
-            logger.info("Project %s not found, creating it", project)
-            self.api.add_list(project, board_name=context)
-        list_id = next(l for l in self.api.get_lists(context) if l["name"].strip() == project)["id"]
-
-        # Due date can be specified in title as [yyyy-mm-dd]. If due date is 
-        # not specified, it will be None
-        due_date_regex = re.compile(r"\[(\d{4}-\d{2}-\d{2})\]")
-        due_date_match = due_date_regex.search(title)
-        if due_date is None and due_date_match:
-            due_date_str = due_date_match.group(1)
+        list_id = self._list_id(context, project)
+        raw_title = title
+        if due_date is None:
+            title, due_date = split_due_date(title)
+        return {
+            "board": context,
+            "project": project,
+            "list_id": list_id,
+            "raw_title": raw_title,
+            "title": title,
+            "description": description,
+            "due_date": due_date,
+            "checklists": [(name, items) for name, items in (checklists or {}).items() if len(items) > 0],
+        }
+
+    def _create_cards(self, prepared):
+        """
+        Creates cards keeping order of tasks within every list. First card of each list is
+        put at the bottom of the list, remaining cards of the list get explicit positions
+        after it, so they can be created concurrently.
+
+        :return: List with created card or raised exception for each prepared task
+        """
+        add = lambda job, pos: _attempt(self.api.add_card, job[1]["title"], job[1]["list_id"], desc=job[1]["description"], due=job[1]["due_date"], pos=pos)
+        results = {}
+        pending = {}
+        for job in prepared:
+            pending.setdefault(job[1]["list_id"], []).append(job)
+        # list id -> position of its first created card
+        anchors = {}
+        while True:
+            # card failing to be created is replaced with next card of the list
+            first = [jobs.pop(0) for list_id, jobs in pending.items() if list_id not in anchors and len(jobs) > 0]
+            if len(first) == 0:
+                break
+            for job, result in zip(first, self.api.map_cards(lambda job: add(job, "bottom"), first)):
+                results[job[0]] = result
+                if not isinstance(result, Exception):
+                    anchors[job[1]["list_id"]] = float(result["pos"])
+        rest = [
+            (job, anchors[list_id] + (k + 1) * CARD_POS_STEP)
+            for list_id, jobs in pending.items()
+            for k, job in enumerate(jobs)
+        ]
+        for (job, _), result in zip(rest, self.api.map_cards(lambda item: add(*item), rest)):
+            results[job[0]] = result
+        return [results[i] for i, _ in prepared]
+
+    def create_many(self, tasks):
+        """
+        Creates cards for tasks concurrently: first all cards, then their checklists and then
+        all checklist items, each step running requests for independent cards in parallel
+        under the shared rate limiter. Positions of cards, checklists and items are sent
+        explicitly so they keep order of tasks.
+
+        :param tasks: List of dictionaries with create parameters
+        :return: List with URL of created card or raised exception for each task, in order of tasks
+        """
+        results = [None] * len(tasks)
+        prepared = []
+        for i, task in enumerate(tasks):
             try:
-                due_date = datetime.datetime.strptime(due_date_str, "%Y-%m-%d").date()
-                title = due_date_regex.sub("", title).strip()
-            except ValueError:
-                logger.warning("Could not parse due date from title: %s", due_date_str)
-
-        card = self.api.add_card(title, list_id, desc=description, due=due_date)
-        if checklists is not None and len(checklists.keys()) > 0:
-            for checklist_name, checklist_items in checklists.items():
-                if len(checklist_items) > 0:
-                    checklist_id = self.api.add_checklist(card["id"], checklist_name)["id"]
-                    for item in checklist_items:
-                        self.api.add_checklist_item(checklist_id, item)
-        logger.info("Card created: %s", card["shortUrl"])
-        return card["shortUrl"]
+                prepared.append((i, self._prepare(**task)))
+            except Exception as e:
+                results[i] = e
+
+        cards = self._create_cards(prepared)
+        created = []
+        for (i, card), result in zip(prepared, cards):
+            if isinstance(result, Exception):
+                results[i] = result
+                continue
+            self._add_title(card["board"], card["project"], card["raw_title"], card["title"])
+            results[i] = result["shortUrl"]
+            created.append((i, card, result))
+
+        checklist_jobs = [
+            (i, result["id"], name, pos + 1, items)
+            for i, card, result in created
+            for pos, (name, items) in enumerate(card["checklists"])
+        ]
+        checklists = self.api.map_cards(lambda job: _attempt(self.api.add_checklist, job[1], job[2], pos=job[3]), checklist_jobs)
+        item_jobs = []
+        for (i, _, name, _, items), checklist in zip(checklist_jobs, checklists):
+            if isinstance(checklist, Exception):
+                results[i] = checklist
+                continue
+            item_jobs += [(i, checklist["id"], item, pos + 1) for pos, item in enumerate(items)]
+        items = self.api.map_cards(lambda job: _attempt(self.api.add_checklist_item, job[1], job[2], pos=job[3]), item_jobs)
+        for (i, _, _, _), item in zip(item_jobs, items):
+            if isinstance(item, Exception) and not isinstance(results[i], Exception):
+                results[i] = item
+
+        for i, card, result in created:
+            if isinstance(results[i], Exception):
+                logger.error("Card %s created but its checklists were not: %s", result["shortUrl"], results[i])
+            else:
+                logger.info("Card created: %s", result["shortUrl"])
+        return results
 
     def create_project(self, name, context = None):
-        self.api.add_list(name, board_name=context)
+        self._add_list(name, self._board(context))
     
     def exists(self, title, description = None, due_date = None, context = None, project = None):
         """
@@ -943,16 +1744,12 @@ class TrelloImporter(Importer):
         :param project: Project of the card
         :return: True if the card exists, False otherwise
         """
+        board_name = self._board(context)
         if project is None:
-            project = self.list_projects(context)[0]
-        list_id = next(iter([l for l in self.api.get_lists(context) if l["name"] == project]), {"id": None})["id"]
-        if list_id is None:
-            return False 
-        cards = self.api.get_open_cards(context)
-        for card in cards:
-            if card["name"] == title and card["idList"] == list_id:
-                return True
-        return False    
+            project = self.list_projects(board_name)[0]
+        self._index_board(board_name)
+        titles = self.titles.get((board_name, project.strip()), set())
+        return title in titles or split_due_date(title)[0] in titles
 
 def generate_retro_report(year, week, start=-1):
     """
@@ -977,10 +1774,10 @@ def generate_retro_report(year, week, start=-1):
     result.append("<body>")
     result.append("<h1>Trello Report</h1>")
     try:
-        api = TrelloAPI()
-        closed_cards = api.get_closed_cards()
+        api = get_api()
+        closed_cards = Card.wrap_all(api.get_closed_cards())
 
-        this_week = [c for c in closed_cards if datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date() >= week_first_day and datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date() <= week_last_day]
+        this_week = [c for c in closed_cards if c.last_activity is not None and week_first_day <= c.last_activity.date() <= week_last_day]
         card_to_list = {}
         for c in this_week:
             list_name = api.get_list_name(c)
@@ -1016,12 +1813,12 @@ class TrelloOpenCards(ReportService):
         logger.info("Generating report of open cards in Trello")
         result = [] 
         try:
-            api = TrelloAPI()
-            open_cards = api.get_open_cards()
+            api = get_api()
+            open_cards = Card.wrap_all(api.get_open_cards())
             return [{
                 "title": c["name"],
                 "description": c.get("desc", ""),
-                "due_date": utc_to_this_tz(c["due"]) if c["due"] else None,
+                "due_date": c.due,
                 "project": api.get_list_name(c),
                 "url": c["shortUrl"],
                 "labels": [l["name"] for l in c["labels"]],
@@ -1042,25 +1839,28 @@ class TrelloClosedCards(ReportService):
         result = [] 
         try:
             today = datetime.datetime.now().date()
-            api = TrelloAPI()
-            closed_cards = api.get_closed_cards()
+            api = get_api()
+            closed_cards = Card.wrap_all(api.get_closed_cards())
             closed_dates = get_closed_dates(api, closed_cards)
-            result =  [{
+            frame = CardFrame(closed_cards, closed_dates)
+            closed_from_today = dict(zip(frame.ids.tolist(), frame.days_since("closed", today)))
+            created_from_today = dict(zip(frame.ids.tolist(), frame.days_since("created", today)))
+            result = api.map_cards(lambda c: {
                 "title": c["name"],
                 "description": c.get("desc", ""),
-                "due_date": utc_to_this_tz(c["due"]) if c["due"] else None,
+                "due_date": c.due,
                 "project": api.get_list_name(c),
                 "url": c["shortUrl"],
                 "labels": [l["name"] for l in c["labels"]],
                 "id": c["id"],
                 "closed_date": closed_dates.get(c["id"], None),
-                "closed_from_today": (today - closed_dates.get(c["id"], today)).days if closed_dates.get(c["id"], None) is not None else None,
+                "closed_from_today": closed_from_today[c["id"]],
                 "board": api.get_board_name(c),
-                "created_date": api.get_creation_date(c).date() if api.get_creation_date(c) is not None else None,
-                "created_from_today": (today - api.get_creation_date(c).date()).days if api.get_creation_date(c) is not None else None,
+                "created_date": c.created.date() if c.created is not None else None,
+                "created_from_today": created_from_today[c["id"]],
                 "has_primary_label": api.has_label(c, primary_label),
                 "has_secondary_label": api.has_label(c, secondary_label),
-            } for c in closed_cards]
+            }, closed_cards)
             return result
         except Exception as e:
             return {
@@ -1077,13 +1877,13 @@ class TrelloThisWeekCards(ReportService):
         logger.info("Generating report of cards for this week in Trello")
         result = [] 
         try:
-            api = TrelloAPI()
-            open_cards = api.get_open_cards()
-            this_week = [c for c in open_cards if this_week_label in [l["name"] for l in c["labels"]]]
+            api = get_api()
+            open_cards = Card.wrap_all(api.get_open_cards())
+            this_week = [c for c in open_cards if this_week_label in c.label_names]
             return [{
                 "title": c["name"],
                 "description": c.get("desc", ""),
-                "due_date": utc_to_this_tz(c["due"]) if c["due"] else None,
+                "due_date": c.due,
                 "project": api.get_list_name(c),
                 "url": c["shortUrl"],
                 "labels": [l["name"] for l in c["labels"]],
@@ -1104,14 +1904,14 @@ class TrelloThisWeekNetClosure(ReportService):
         try:
             today = datetime.datetime.now().date()
             start_of_week = today - datetime.timedelta(days=6)
-            api = TrelloAPI()
-            closed_cards = api.get_closed_cards()
-            all_cards = api.get_open_cards() + closed_cards
-            open_this_week = [c for c in all_cards if api.get_creation_date(c).date() >= start_of_week]
-            closed_this_week = list([c for c in closed_cards if datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date() >= start_of_week])
-            result["open_this_week"] = len(open_this_week)
-            result["closed_this_week"] = len(closed_this_week)
-            result["net_closure"] = len(closed_this_week) - len(open_this_week)
+            api = get_api()
+            open_frame = CardFrame(api.get_open_cards())
+            closed_frame = CardFrame(api.get_closed_cards())
+            open_this_week = open_frame.count(open_frame.created_since(start_of_week)) + closed_frame.count(closed_frame.created_since(start_of_week))
+            closed_this_week = closed_frame.count(closed_frame.active_between(start_of_week))
+            result["open_this_week"] = open_this_week
+            result["closed_this_week"] = closed_this_week
+            result["net_closure"] = closed_this_week - open_this_week
             return result
         except Exception as e:
             return {
@@ -1122,6 +1922,45 @@ class TrelloThisWeekNetClosure(ReportService):
 primary_label = get_config_str("trello_primary_label", "Primary", "Label used in Trello to mark primary tasks")
 secondary_label = get_config_str("trello_secondary_label", "Secondary", "Label used in Trello to mark secondary tasks")
 
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+def _default_closed_dates(closed_cards):
+    # without closure dates last activity is the best guess when card was closed
+    return {c.id: c.last_activity.date() for c in closed_cards if c.last_activity is not None}
+
+def card_scores(closed_cards, closed_dates, closed_lists) -> dict:
+    """
+    Returns dictionary mapping card id to score of closed card, see score_closed_cards for rules.
+
+    :param closed_cards: List of closed cards
+    :param closed_dates: Dictionary mapping card id to date when it was closed
+    :param closed_lists: List of closed lists, last card closed in closed list closed the list
+    """
+    closed_list_ids = set(l["id"] for l in closed_lists)
+    list_closure_cards = {}
+    for card in closed_cards:
+        list_id = card.get("idList")
+        if list_id not in closed_list_ids:
+            continue
+        current = list_closure_cards.get(list_id)
+        date = _as_date(closed_dates.get(card.id)) or datetime.date.min
+        if current is None or date > current[0]:
+            list_closure_cards[list_id] = (date, card.id)
+    closers = set(card_id for _, card_id in list_closure_cards.values())
+    scores = {}
+    for card in closed_cards:
+        if card.id in closers:
+            scores[card.id] = 4
+        elif card.has_label(primary_label):
+            scores[card.id] = 3
+        else:
+            # secondary and unlabeled cards score the same
+            scores[card.id] = 1
+    return scores
+
 def score_closed_cards(
         api: TrelloAPI, 
         closed_cards=None, 
@@ -1148,61 +1987,89 @@ def score_closed_cards(
     Returns:
         int: The total score of closed cards on the board.
     """
-    logger.info(f"Scoring {len(closed_cards)} closed cards.")
     if closed_cards is None:
         closed_cards = api.get_closed_cards()
+    closed_cards = Card.wrap_all(closed_cards)
+    logger.info(f"Scoring {len(closed_cards)} closed cards.")
     if closed_dates is None:
-        closed_dates = {
-            card['id']: card.get("dateLastActivity", datetime.datetime.min) for card in closed_cards
-        }
+        closed_dates = _default_closed_dates(closed_cards)
+    scores = card_scores(closed_cards, closed_dates, api.get_closed_lists())
+    score_from_date = _as_date(score_from_date)
+    score_to_date = _as_date(score_to_date)
     total_score = 0
-    already_closed_list_ids = set()
-    closed_lists = api.get_closed_lists()
-    list_closure_cards = {}
-    for closed_list in closed_lists:
-        logger.debug(f"Processing closed list '{closed_list.get('name')}' (ID: {closed_list.get('id')})")
-        list_cards = [
-            card for card in closed_cards 
-            if card.get('idList') == closed_list['id']
-        ]
-        if list_cards:
-            list_closure_cards[closed_list['id']] = max(
-                list_cards,
-                key=lambda c: closed_dates.get(c['id'], datetime.datetime.min)
-            )
-        else:
-            logger.debug(f"No closed cards found for list '{closed_list.get('name')}' (ID: {closed_list.get('id')})")
     for card in closed_cards:
         if score_from_date or score_to_date:
-            closed_date = closed_dates.get(card['id'])
+            closed_date = _as_date(closed_dates.get(card.id))
             if closed_date is None:
-                logger.warning(f"Card '{card.get('name')}' does not have a closed date. Skipping scoring.")
-                continue
-            if score_from_date and closed_date <= score_from_date:
-                logger.debug(f"Card '{card.get('name')}' closed on {closed_date}, which is before the score_from_date {score_from_date}. Skipping scoring.")
+                logger.warning(f"Card '{card.name}' does not have a closed date. Skipping scoring.")
                 continue
-            if score_to_date and closed_date >= score_to_date:
-                logger.debug(f"Card '{card.get('name')}' closed on {closed_date}, which is after the score_to_date {score_to_date}. Skipping scoring.")
+            if (score_from_date and closed_date < score_from_date) or (score_to_date and closed_date > score_to_date):
                 continue
-        card_score = 0
-        if api.has_label(card, primary_label):
-            card_score = 3
-        elif api.has_label(card, secondary_label):
-            card_score = 1
-        else:
-            card_score = 1
-
-        list_id = card.get('idList')
-        if list_id and list_id not in already_closed_list_ids:
-            if any(closed_list['id'] == list_id for closed_list in closed_lists):
-                # If the card closed the list, it scores 4 points.
-                if list_closure_cards.get(list_id, {}).get("id", "") == card['id']:
-                    card_score = 4
-                already_closed_list_ids.add(list_id)
-        logger.debug(f"Card '{card.get('name')}' scored {card_score} points.")
-        total_score += card_score
+        logger.debug(f"Card '{card.name}' scored {scores[card.id]} points.")
+        total_score += scores[card.id]
     return total_score
 
+def iso_week_start(date) -> datetime.date:
+    """
+    Returns Monday of ISO week of given date.
+    """
+    date = _as_date(date)
+    return date - datetime.timedelta(days=date.weekday())
+
+def weekly_scores(api: TrelloAPI, first_week, last_week=None, closed_cards=None, closed_dates=None) -> list:
+    """
+    Returns scores of closed cards for every ISO week in range, weeks without closed cards included.
+
+    :param api: TrelloAPI instance
+    :param first_week: Any date in first week of the range
+    :param last_week: Any date in last week of the range, current week if not provided
+    :param closed_cards: Closed cards, fetched if not provided
+    :param closed_dates: Dictionary mapping card id to date when card was closed, fetched if not provided
+    :return: List of dictionaries with keys week (like 2025-W19), start (Monday of the week), score and closed (number of closed cards)
+    """
+    if closed_cards is None:
+        closed_cards = api.get_closed_cards()
+    closed_cards = Card.wrap_all(closed_cards)
+    if closed_dates is None:
+        closed_dates = api.get_closure_dates(closed_cards)
+    first_week = iso_week_start(first_week)
+    last_week = iso_week_start(last_week or datetime.date.today())
+    weeks = {}
+    week = first_week
+    while week <= last_week:
+        year, number, _ = week.isocalendar()
+        weeks[week] = {"week": "%d-W%02d" % (year, number), "start": week, "score": 0, "closed": 0}
+        week += datetime.timedelta(days=7)
+    scores = card_scores(closed_cards, closed_dates, api.get_closed_lists())
+    for card in closed_cards:
+        closed_date = _as_date(closed_dates.get(card.id))
+        if closed_date is None:
+            continue
+        entry = weeks.get(iso_week_start(closed_date))
+        if entry is None:
+            continue
+        entry["score"] += scores[card.id]
+        entry["closed"] += 1
+    return list(weeks.values())
+
+class TrelloWeeklyScores(ReportService):
+    """
+    Provides score of closed cards for each of last weeks, for trend charts.
+    """
+
+    def provide(self):
+        logger.info("Generating weekly scores of closed cards in Trello")
+        try:
+            weeks = get_config_int("trello_score_weeks", 12, "Number of weeks reported by TrelloWeeklyScores service")
+            today = datetime.datetime.now().date()
+            api = get_api()
+            return weekly_scores(api, today - datetime.timedelta(weeks=weeks - 1), today)
+        except Exception as e:
+            return {
+                "error": "Error getting weekly scores from Trello. Please check your configuration and API key.",
+                "details": str(e)
+            }
+
 class TrelloWeeklyBoard(ReportService):
     """
     Provides dashboard of:
@@ -1219,15 +2086,18 @@ class TrelloWeeklyBoard(ReportService):
         logger.info("Generating weekly board report for Trello")
         data = []
         try:
-            api = TrelloAPI()
+            api = get_api()
             lists = api.get_lists()
-            open_cards = api.get_open_cards()
-            closed_cards = api.get_closed_cards()
-            this_week = [c for c in open_cards if this_week_label in [l["name"] for l in c["labels"]]]
-            closed_this_week = list([c for c in closed_cards if datetime.datetime.strptime(c["dateLastActivity"], "%Y-%m-%dT%H:%M:%S.%fZ").date() >= (datetime.datetime.now() - datetime.timedelta(days=datetime.datetime.now().weekday())).date()])
+            open_cards = Card.wrap_all(api.get_open_cards())
+            closed_cards = Card.wrap_all(api.get_closed_cards())
+            this_week = [c for c in open_cards if this_week_label in c.label_names]
+            start_of_week = (datetime.datetime.now() - datetime.timedelta(days=datetime.datetime.now().weekday())).date()
+            closed_this_week = list([c for c in closed_cards if c.last_activity is not None and c.last_activity.date() >= start_of_week])
             tod = list([c for c in this_week if not CheckField("idChecklists")(c)])
-            ready = list([c for c in this_week if CheckField("idChecklists")(c) and not HasCheckedItems(api).filter(c)])
-            in_progress = list([c for c in this_week if CheckField("idChecklists")(c) and HasCheckedItems(api).filter(c)])
+            with_checklists = [c for c in this_week if CheckField("idChecklists")(c)]
+            checked = api.map_cards(HasCheckedItems(api).filter, with_checklists)
+            ready = [c for c, has_checked in zip(with_checklists, checked) if not has_checked]
+            in_progress = [c for c, has_checked in zip(with_checklists, checked) if has_checked]
             done = closed_this_week
             card_to_labels = {}
             card_to_title = {}
@@ -1235,8 +2105,8 @@ class TrelloWeeklyBoard(ReportService):
                 list_name = api.get_list_name(c)
                 board_name = api.get_board_name(c)
                 card_to_title[c["id"]] = "[%s] %s: %s" % (board_name, list_name, c["name"])
-                logger.info("Card with title '%s' has labels: %s", card_to_title[c["id"]], [l["name"] for l in c["labels"]])
-                card_to_labels[c["id"]] = [l["name"].upper() for l in c["labels"] if l["name"] not in [this_week_label]]
+                logger.info("Card with title '%s' has labels: %s", card_to_title[c["id"]], sorted(c.label_names))
+                card_to_labels[c["id"]] = [l["name"].upper() for l in c["labels"] if l["name"] != this_week_label]
             for c in tod:
                 data.append({
                     "status": "TODO",
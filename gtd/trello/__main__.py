@@ -1,6 +1,7 @@
 
 from gtd.config import get_config_str
 from gtd.trello import TrelloAPI, ai_help,  deliverables_report
+from gtd.trello.backup import compact, write_diff_backup, write_full_backup
 import sys 
 import json
 import datetime
@@ -9,20 +10,43 @@ import logging
 api = TrelloAPI()
 
 if sys.argv[1] == "backup":
-    backlog = api.get_default_boards()
-    cards = api.get_open_cards(backlog)
-    closed_cards = api.get_closed_cards(backlog)
+    # python -m gtd.trello backup FILE [--diff PREVIOUS]
+    # FILE ending with .json is single JSON document, otherwise gzip compressed NDJSON written while boards are fetched
+    usage = "Usage: python -m gtd.trello backup FILE [--diff PREVIOUS]"
+    if len(sys.argv) < 3 or sys.argv[2] == "--diff":
+        sys.exit(usage)
     backup_file = sys.argv[2]
-    with open(backup_file, "w") as f:
-        json.dump({
-            "open_cards": [
-                {
-                    "checklist": api.get_checklist(card),
-                    **card,
-                } for card in cards
-            ],
-            "closed_cards": closed_cards
-        }, f)
+    base_file = None
+    if "--diff" in sys.argv[3:]:
+        diff_index = sys.argv.index("--diff", 3)
+        if diff_index + 1 >= len(sys.argv):
+            sys.exit(usage)
+        base_file = sys.argv[diff_index + 1]
+    board_ids = [api.get_board(b)["id"] for b in api.get_default_boards()]
+    if base_file is not None:
+        write_diff_backup(api.api, board_ids, backup_file, base_file)
+    elif backup_file.endswith(".json"):
+        cards = api.get_open_cards()
+        closed_cards = api.get_closed_cards()
+        with open(backup_file, "w") as f:
+            json.dump({
+                "open_cards": [
+                    {
+                        "checklist": api.get_checklist(card),
+                        **card,
+                    } for card in cards
+                ],
+                "closed_cards": [card.raw for card in closed_cards]
+            }, f)
+    else:
+        write_full_backup(api.api, board_ids, backup_file)
+elif sys.argv[1] == "compact":
+    # python -m gtd.trello compact OUTPUT FULL_BACKUP DIFF...
+    compact(sys.argv[3:], sys.argv[2])
+elif sys.argv[1] == "sync":
+    # python -m gtd.trello sync [--resync]
+    api.sync(resync="--resync" in sys.argv[2:])
+    print("Trello store %s synced" % api.store.path)
 elif sys.argv[1] == "list":
     for board in api.get_boards():
         print(f"{board['name']} ({board['id']})")
@@ -0,0 +1,294 @@
+"""
+Streaming backups of Trello boards.
+
+Backup is a gzip compressed file with one JSON record per line. First line is a
+header with kind of backup ("full" or "diff") and sync cursor of every board -
+id of the newest board action the backup includes. Records follow in order they
+are fetched, so memory used does not grow with size of the boards.
+
+Full backup has every board, list, card (archived included, with attachments),
+checklist, card comment and card closure date. Diff backup has records only for entities changed by actions made
+after cursors of the backup it is based on, and deleted records for entities
+which are gone. compact applies chain of diffs on a full backup and writes the
+result as a new full backup, keeping latest records in temporary SQLite database
+rather than in memory.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+
+from gtd.trello.store import (
+    CLOSURE_ACTIONS_FILTER,
+    closure_dates_from_actions,
+    collect_changes,
+    fetch_or_none,
+    iter_board_actions,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CARDS_PAGE_SIZE = 1000
+
+# record types in order they are written for a board
+RECORD_TYPES = ("board", "list", "card", "checklist", "comment", "closure")
+
+# latest record of every entity while backups are compacted, seq keeps order in which entities first appeared
+COMPACT_SCHEMA = """
+CREATE TABLE records (type TEXT NOT NULL, id TEXT NOT NULL, seq INTEGER NOT NULL, board_id TEXT NOT NULL, data TEXT NOT NULL, date TEXT, PRIMARY KEY (type, id));
+CREATE INDEX records_order ON records (type, seq);
+"""
+
+COMMENT_ACTIONS_FILTER = "commentCard"
+
+def iter_board_cards(api, board_id):
+    """
+    Yields all cards of the board, archived included, fetching them in pages.
+    """
+    before = None
+    while True:
+        page = api.boards.get_card(board_id, filter="all", attachments="true", limit=CARDS_PAGE_SIZE, before=before)
+        yield from page
+        if len(page) < CARDS_PAGE_SIZE:
+            return
+        before = min(c["id"] for c in page)
+
+def _latest_action_id(api, board_id):
+    latest = api.boards.get_action(board_id, limit=1)
+    return latest[0]["id"] if len(latest) > 0 else None
+
+class BackupWriter:
+    """
+    Writes backup records to gzip compressed NDJSON file.
+
+    :param path: Path of the backup file
+    :param header: Header of the backup, written as first line
+    """
+
+    def __init__(self, path, header: dict) -> None:
+        self.path = path
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.count = 0
+        self._write({"type": "header", "version": FORMAT_VERSION, **header})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+    def write(self, type, board_id, data):
+        self._write({"type": type, "board": board_id, "data": data})
+        self.count += 1
+
+    def write_deleted(self, type, board_id, entity_id):
+        self._write({"type": type, "board": board_id, "id": entity_id, "deleted": True})
+        self.count += 1
+
+    def write_closure(self, board_id, card_id, date):
+        self.write("closure", board_id, {"id": card_id, "date": date.isoformat()})
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def read_header(path) -> dict:
+    """
+    Returns header of the backup.
+
+    :raises ValueError: If file is not a backup in supported format
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "null")
+    if not isinstance(header, dict) or header.get("type") != "header":
+        raise ValueError("%s is not a Trello backup" % path)
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError("Backup %s has unsupported version %s" % (path, header.get("version")))
+    return header
+
+def iter_records(path):
+    """
+    Yields records of the backup, without header.
+    """
+    read_header(path)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            if line.strip() != "":
+                yield json.loads(line)
+
+def _write_board(api, writer, board_id):
+    board = api.boards.get(board_id, labels="all")
+    writer.write("board", board_id, board)
+    for l in api.boards.get_list(board_id, filter="all"):
+        writer.write("list", board_id, l)
+    for c in iter_board_cards(api, board_id):
+        writer.write("card", board_id, c)
+    for c in api.boards.get_checklist(board_id):
+        writer.write("checklist", board_id, c)
+    for action in iter_board_actions(api, board_id, filter=COMMENT_ACTIONS_FILTER):
+        if action.get("type") == COMMENT_ACTIONS_FILTER:
+            writer.write("comment", board_id, action)
+    closures = closure_dates_from_actions(iter_board_actions(api, board_id, filter=CLOSURE_ACTIONS_FILTER))
+    for card_id, date in closures.items():
+        writer.write_closure(board_id, card_id, date)
+    logger.info("Backed up board %s", board["name"])
+
+def write_full_backup(api, board_ids, path):
+    """
+    Writes full backup of boards.
+
+    :param api: trello.TrelloApi instance
+    :param board_ids: Ids of boards to back up
+    :param path: Path of the backup file
+    :return: Header of written backup
+    """
+    # cursors are taken before download so that changes made during download are in next diff
+    header = {
+        "kind": "full",
+        "created": datetime.datetime.utcnow().isoformat(),
+        "cursors": {board_id: _latest_action_id(api, board_id) for board_id in board_ids},
+    }
+    with BackupWriter(path, header) as writer:
+        for board_id in board_ids:
+            _write_board(api, writer, board_id)
+    logger.info("Full backup %s written with %d records", path, writer.count)
+    return header
+
+def write_diff_backup(api, board_ids, path, base_path):
+    """
+    Writes backup of changes made since backup at base_path. Boards which are not in the
+    base backup are backed up fully.
+
+    :param api: trello.TrelloApi instance
+    :param board_ids: Ids of boards to back up
+    :param path: Path of the backup file
+    :param base_path: Path of the previous backup, full or diff
+    :return: Header of written backup
+    """
+    base = read_header(base_path)
+    actions = {}
+    cursors = {}
+    for board_id in board_ids:
+        if board_id in base["cursors"]:
+            actions[board_id] = list(iter_board_actions(api, board_id, since=base["cursors"][board_id]))
+            # actions are newest first
+            cursors[board_id] = actions[board_id][0]["id"] if len(actions[board_id]) > 0 else base["cursors"][board_id]
+        else:
+            cursors[board_id] = _latest_action_id(api, board_id)
+    header = {
+        "kind": "diff",
+        "created": datetime.datetime.utcnow().isoformat(),
+        "based_on": base["created"],
+        "cursors": cursors,
+    }
+    with BackupWriter(path, header) as writer:
+        for board_id in board_ids:
+            if board_id not in actions:
+                _write_board(api, writer, board_id)
+                continue
+            _write_changes(api, writer, board_id, actions[board_id])
+    logger.info("Diff backup %s written with %d records", path, writer.count)
+    return header
+
+def _write_changes(api, writer, board_id, actions):
+    changes = collect_changes(actions)
+    if changes["board_changed"]:
+        writer.write("board", board_id, api.boards.get(board_id, labels="all"))
+    fetchers = (
+        ("list", changes["lists"], set(), api.lists.get),
+        ("card", changes["cards"], changes["deleted_cards"], lambda card_id: api.cards.get(card_id, attachments="true")),
+        ("checklist", changes["checklists"], changes["deleted_checklists"], api.checklists.get),
+    )
+    for type, ids, deleted, get in fetchers:
+        for entity_id in sorted(ids):
+            entity = None if entity_id in deleted else fetch_or_none(lambda: get(entity_id))
+            if entity is None or entity.get("idBoard", board_id) != board_id:
+                writer.write_deleted(type, board_id, entity_id)
+            else:
+                writer.write(type, board_id, entity)
+    for action in actions:
+        if action.get("type") == COMMENT_ACTIONS_FILTER:
+            writer.write("comment", board_id, action)
+    for card_id, date in closure_dates_from_actions(actions).items():
+        writer.write_closure(board_id, card_id, date)
+    logger.info("Backed up %d changes of board %s", len(actions), board_id)
+
+def compact(paths, output):
+    """
+    Applies diff backups on full backup and writes the result as full backup.
+
+    :param paths: Paths of full backup followed by diffs, each based on the previous one
+    :param output: Path of the compacted backup
+    :return: Header of written backup
+    :raises ValueError: If first backup is not full or diffs do not form a chain
+    """
+    headers = [read_header(p) for p in paths]
+    if len(headers) == 0 or headers[0]["kind"] != "full":
+        raise ValueError("Chain of backups must start with full backup")
+    for previous, (path, header) in zip(headers, zip(paths[1:], headers[1:])):
+        if header["kind"] != "diff" or header.get("based_on") != previous["created"]:
+            raise ValueError("Backup %s is not a diff of backup created at %s" % (path, previous["created"]))
+    cursors = {}
+    # entities are kept in temporary database instead of memory, so compacting does not need memory for whole boards
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = sqlite3.connect(os.path.join(tmpdir, "compact.sqlite"))
+        try:
+            db.executescript(COMPACT_SCHEMA)
+            with db:
+                seq = 0
+                for path, header in zip(paths, headers):
+                    cursors.update(header["cursors"])
+                    for record in iter_records(path):
+                        if record.get("deleted"):
+                            db.execute("DELETE FROM records WHERE type = ? AND id = ?", (record["type"], record["id"]))
+                            continue
+                        seq += 1
+                        # closure is replaced only by a later one
+                        db.execute(
+                            "INSERT INTO records (type, id, seq, board_id, data, date) VALUES (?, ?, ?, ?, ?, ?) "
+                            "ON CONFLICT(type, id) DO UPDATE SET board_id = excluded.board_id, data = excluded.data, date = excluded.date "
+                            "WHERE excluded.date IS NULL OR excluded.date >= records.date",
+                            (record["type"], record["data"]["id"], seq, record["board"], json.dumps(record["data"]), record["data"].get("date") if record["type"] == "closure" else None)
+                        )
+            header = {"kind": "full", "created": headers[-1]["created"], "cursors": cursors}
+            with BackupWriter(output, header) as writer:
+                for type in RECORD_TYPES:
+                    for board_id, data in db.execute("SELECT board_id, data FROM records WHERE type = ? ORDER BY seq", (type,)):
+                        writer.write(type, board_id, json.loads(data))
+        finally:
+            db.close()
+    logger.info("Compacted %d backups into %s with %d records", len(paths), output, writer.count)
+    return header
+
+def load_backup(path) -> dict:
+    """
+    Returns content of full backup as dictionary mapping board id to board in format of
+    Trello board endpoint (with nested lists, cards, checklists and labels) with two more
+    keys: comments (comment actions of cards of the board) and closures (dictionary
+    mapping card id to closure date).
+
+    :raises ValueError: If file is not a full backup
+    """
+    if read_header(path)["kind"] != "full":
+        raise ValueError("Backup %s is a diff, compact it with its full backup first" % path)
+    boards = {}
+    for record in iter_records(path):
+        board = boards.setdefault(record["board"], {
+            "id": record["board"], "name": record["board"],
+            "lists": [], "cards": [], "checklists": [], "comments": [], "closures": {},
+        })
+        if record["type"] == "board":
+            board.update({k: v for k, v in record["data"].items() if k not in ("lists", "cards", "checklists")})
+        elif record["type"] == "closure":
+            board["closures"][record["data"]["id"]] = datetime.date.fromisoformat(record["data"]["date"])
+        else:
+            board[record["type"] + "s"].append(record["data"])
+    return boards
@@ -0,0 +1,84 @@
+"""
+Card model for Trello cards.
+
+Card wraps card JSON returned by Trello and behaves like a read-only dictionary,
+so code indexing cards by Trello keys keeps working. Timestamps and label names
+are parsed once when card is created instead of on every use.
+"""
+from collections.abc import Mapping
+import datetime
+
+from gtd.trello.timestamps import parse_local, parse_utc
+
+def creation_date(card_id):
+    """
+    Returns naive UTC datetime when card was created, encoded in first 8 hex digits of its id.
+    """
+    return datetime.datetime.utcfromtimestamp(int(card_id[:8], 16))
+
+class Card(Mapping):
+    """
+    Trello card.
+
+    :param raw: Card as returned by Trello
+    :param offset: Offset of local time from UTC used for due date, offset of local time
+        zone at the due date if not provided
+
+    Attributes:
+
+    - due - due date in local time or None
+    - last_activity - date of last activity in UTC or None
+    - created - creation date in UTC or None if card id is not Trello id
+    - label_names - frozenset of label names
+    """
+    __slots__ = ("raw", "id", "name", "due", "last_activity", "created", "label_names")
+
+    def __init__(self, raw: dict, offset: datetime.timedelta = None) -> None:
+        self.raw = raw
+        self.id = raw.get("id")
+        self.name = raw.get("name")
+        if offset is None:
+            self.due = parse_local(raw.get("due"))
+        else:
+            due = parse_utc(raw.get("due"))
+            self.due = due + offset if due is not None else None
+        self.last_activity = parse_utc(raw.get("dateLastActivity"))
+        try:
+            self.created = creation_date(self.id)
+        except (TypeError, ValueError, OverflowError, OSError):
+            self.created = None
+        self.label_names = frozenset(l["name"] for l in raw.get("labels") or [])
+
+    @classmethod
+    def of(cls, card, offset: datetime.timedelta = None) -> "Card":
+        """
+        Returns card as Card, wrapping it if it is plain dictionary.
+        """
+        if isinstance(card, Card):
+            return card
+        return cls(card, offset)
+
+    @classmethod
+    def wrap_all(cls, cards) -> list:
+        """
+        Returns list of given cards as Card objects.
+        """
+        return [cls.of(c) for c in cards]
+
+    def has_label(self, label_name) -> bool:
+        return label_name in self.label_names
+
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __contains__(self, key):
+        return key in self.raw
+
+    def __repr__(self) -> str:
+        return "Card(%r)" % (self.raw,)
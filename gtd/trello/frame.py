@@ -0,0 +1,212 @@
+"""
+Columnar view of Trello cards for report statistics.
+
+CardFrame keeps fields of many cards as NumPy arrays (list ids as integer codes,
+labels as bitmask, timestamps as datetime64) so statistics over whole boards are
+single vectorized operations instead of loops over card dictionaries.
+"""
+import datetime
+import functools
+
+from gtd.trello.card import Card
+
+MICROSECONDS_PER_DAY = 86400 * 10**6
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECOND = datetime.timedelta(microseconds=1)
+# smallest int64, numpy reads it as NaT; numpy is imported lazily to keep CLI startup fast
+NAT = -2**63
+
+def _to_datetime64(values):
+    import numpy as np
+    # integer arithmetic on python side is several times faster than numpy parsing datetime objects
+    return np.array([(v - EPOCH) // MICROSECOND if v is not None else NAT for v in values], dtype=np.int64).view("datetime64[us]")
+
+def _to_date64(value):
+    import numpy as np
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+class CardFrame:
+    """
+    Fields of given cards as arrays, row i describes cards[i].
+
+    Columns are built on first use, since building them loops over all cards in Python
+    and costs more than queries on them; frame pays only for columns its queries need.
+
+    :param cards: List of cards (Card objects or Trello dictionaries)
+    :param closed_dates: Optional dictionary mapping card id to closure date
+    """
+
+    def __init__(self, cards, closed_dates=None) -> None:
+        self.cards = Card.wrap_all(cards)
+        self.closed_dates = closed_dates or {}
+
+    @functools.cached_property
+    def ids(self):
+        import numpy as np
+        return np.array([c.id for c in self.cards], dtype=object)
+
+    @functools.cached_property
+    def _lists(self):
+        index = {}
+        codes = [index.setdefault(list_id, len(index)) for list_id in (c.raw.get("idList") for c in self.cards)]
+        return index, codes
+
+    @property
+    def list_index(self):
+        """
+        Dictionary mapping list id to its code in list_codes.
+        """
+        return self._lists[0]
+
+    @functools.cached_property
+    def list_codes(self):
+        import numpy as np
+        return np.array(self._lists[1], dtype=np.int64)
+
+    @functools.cached_property
+    def _labels(self):
+        index = {}
+        # cards mostly share few combinations of labels, mask is computed once per combination
+        masks = {}
+        for names in set(c.label_names for c in self.cards):
+            mask = 0
+            for name in names:
+                mask |= 1 << index.setdefault(name, len(index))
+            masks[names] = mask
+        return index, masks
+
+    @property
+    def label_index(self):
+        """
+        Dictionary mapping label name to its bit in label_masks.
+        """
+        return self._labels[0]
+
+    @functools.cached_property
+    def label_masks(self):
+        import numpy as np
+        index, masks = self._labels
+        # boards with more than 63 labels keep masks as python ints
+        return np.array([masks[c.label_names] for c in self.cards], dtype=object if len(index) > 63 else np.int64)
+
+    @functools.cached_property
+    def due(self):
+        return _to_datetime64([c.due for c in self.cards])
+
+    @functools.cached_property
+    def created(self):
+        return _to_datetime64([c.created for c in self.cards])
+
+    @functools.cached_property
+    def last_activity(self):
+        return _to_datetime64([c.last_activity for c in self.cards])
+
+    @functools.cached_property
+    def closed(self):
+        import numpy as np
+        get = self.closed_dates.get
+        days = (get(c.id) for c in self.cards)
+        return np.array([d.toordinal() - EPOCH_ORDINAL if d is not None else NAT for d in days], dtype=np.int64).view("datetime64[D]")
+
+    @functools.cached_property
+    def has_checklists(self):
+        import numpy as np
+        return np.array([bool(c.raw.get("idChecklists")) for c in self.cards], dtype=bool)
+
+    def set_closed_dates(self, closed_dates):
+        """
+        Replaces closure dates, closed column is built again on next use.
+        """
+        self.closed_dates = closed_dates or {}
+        self.__dict__.pop("closed", None)
+
+    def __len__(self):
+        return len(self.cards)
+
+    @staticmethod
+    def count(mask) -> int:
+        import numpy as np
+        return int(np.count_nonzero(mask))
+
+    def take(self, mask) -> list:
+        """
+        Returns cards selected by boolean mask, in original order.
+        """
+        import numpy as np
+        return [self.cards[i] for i in np.flatnonzero(mask)]
+
+    def count_per_list(self, list_ids) -> list:
+        """
+        Returns number of cards in each of given lists.
+        """
+        import numpy as np
+        counts = np.bincount(self.list_codes, minlength=len(self.list_index))
+        return [int(counts[self.list_index[l]]) if l in self.list_index else 0 for l in list_ids]
+
+    def has_label(self, label_name):
+        """
+        Returns mask of cards having given label.
+        """
+        import numpy as np
+        if label_name not in self.label_index:
+            return np.zeros(len(self), dtype=bool)
+        bit = 1 << self.label_index[label_name]
+        return np.array((self.label_masks & bit) != 0, dtype=bool)
+
+    def due_within(self, days, now=None):
+        """
+        Returns mask of cards due in given number of whole days from now (overdue included).
+        """
+        import numpy as np
+        now = np.datetime64(now or datetime.datetime.now(), "us")
+        whole_days = np.floor_divide((self.due - now).astype(np.int64), MICROSECONDS_PER_DAY)
+        return ~np.isnat(self.due) & (whole_days <= days)
+
+    def created_since(self, date):
+        """
+        Returns mask of cards created on given date or later.
+        """
+        import numpy as np
+        return ~np.isnat(self.created) & (self.created.astype("datetime64[D]") >= _to_date64(date))
+
+    def active_between(self, first_date, last_date=None):
+        """
+        Returns mask of cards whose last activity date is in given range, both ends included.
+        """
+        import numpy as np
+        days = self.last_activity.astype("datetime64[D]")
+        mask = ~np.isnat(days) & (days >= _to_date64(first_date))
+        if last_date is not None:
+            mask &= days <= _to_date64(last_date)
+        return mask
+
+    def closed_since(self, date):
+        """
+        Returns mask of cards closed on given date or later.
+        """
+        import numpy as np
+        return ~np.isnat(self.closed) & (self.closed >= _to_date64(date))
+
+    def first_activity_date(self):
+        """
+        Returns date of earliest last activity among cards, None if there are no dates.
+        """
+        import numpy as np
+        days = self.last_activity[~np.isnat(self.last_activity)]
+        if len(days) == 0:
+            return None
+        return days.min().astype("datetime64[D]").item()
+
+    def days_since(self, column, today) -> list:
+        """
+        Returns list of whole days from dates in given column ("created" or "closed") to today, None for missing dates.
+        """
+        import numpy as np
+        days = getattr(self, column).astype("datetime64[D]")
+        missing = np.isnat(days)
+        result = (_to_date64(today) - days).astype(np.int64)
+        return [None if m else d for m, d in zip(missing.tolist(), result.tolist())]
@@ -0,0 +1,81 @@
+"""
+Snapshot of a Trello board fetched with a single request.
+
+Trello board endpoint can nest cards, lists, checklists and labels of the board
+in its response. BoardSnapshot keeps them indexed by id so that TrelloAPI can
+answer questions about open and closed cards, list names and checklists without
+issuing request per card.
+"""
+import logging
+
+from gtd.trello.card import Card
+
+logger = logging.getLogger(__name__)
+
+class BoardSnapshot:
+    """
+    Cards, lists, checklists and labels of one board.
+
+    :param board: Board as returned by Trello board endpoint with nested cards, lists, checklists and labels
+    """
+
+    def __init__(self, board: dict) -> None:
+        self.id = board["id"]
+        self.name = board["name"]
+        self.board = {k: v for k, v in board.items() if k not in ("cards", "lists", "checklists", "labels")}
+        self.cards = Card.wrap_all(board.get("cards", []))
+        self.lists = board.get("lists", [])
+        self.labels = board.get("labels", [])
+        self.checklists = {c["id"]: c for c in board.get("checklists", [])}
+        self.list_by_id = {l["id"]: l for l in self.lists}
+
+    @classmethod
+    def fetch(cls, api, board_id):
+        """
+        Fetches board with all its cards (archived included), lists, checklists and labels.
+
+        :param api: trello.TrelloApi instance
+        :param board_id: Id of the board
+        """
+        logger.info("Fetching snapshot of board %s", board_id)
+        board = api.boards.get(
+            board_id,
+            cards="all",
+            card_fields="all",
+            lists="all",
+            checklists="all",
+            labels="all",
+        )
+        snapshot = cls(board)
+        logger.info("Board %s has %d cards, %d lists and %d checklists", snapshot.name, len(snapshot.cards), len(snapshot.lists), len(snapshot.checklists))
+        return snapshot
+
+    def is_list_open(self, list_id):
+        l = self.list_by_id.get(list_id)
+        return l is not None and not l.get("closed", False)
+
+    def get_visible_cards(self):
+        """
+        Returns cards which are not archived and are in open list, same as
+        cards returned by Trello cards endpoint of the board.
+        """
+        return [c for c in self.cards if not c.get("closed", False) and self.is_list_open(c.get("idList"))]
+
+    def get_archived_cards(self):
+        return [c for c in self.cards if c.get("closed", False)]
+
+    def get_open_lists(self):
+        return [l for l in self.lists if not l.get("closed", False)]
+
+    def get_closed_lists(self):
+        return [l for l in self.lists if l.get("closed", False)]
+
+    def get_list_name(self, list_id):
+        """
+        Returns name of the list or None if list is not on this board.
+        """
+        l = self.list_by_id.get(list_id)
+        return l["name"] if l is not None else None
+
+    def get_checklist(self, checklist_id):
+        return self.checklists.get(checklist_id)
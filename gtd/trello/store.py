@@ -0,0 +1,293 @@
+"""
+Local SQLite store of Trello boards.
+
+Store keeps cards, lists, checklists and closure dates of boards together with
+a sync cursor - id of the newest board action seen. First sync of a board
+downloads whole board, later syncs read only actions created after the cursor
+and fetch again cards, lists and checklists those actions touched.
+"""
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+
+from gtd.trello.snapshot import BoardSnapshot
+from gtd.trello.timestamps import parse_utc
+
+logger = logging.getLogger(__name__)
+
+ACTIONS_PAGE_SIZE = 1000
+
+# actions which may close a card: archiving it or marking it as complete. Trello accepts
+# updateCard:closed but has no filter for dueComplete, so all card updates are fetched
+# and closures are picked by is_closure_action
+CLOSURE_ACTIONS_FILTER = "updateCard"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS lists (id TEXT PRIMARY KEY, board_id TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS cards (id TEXT PRIMARY KEY, board_id TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS checklists (id TEXT PRIMARY KEY, board_id TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS closures (card_id TEXT PRIMARY KEY, board_id TEXT NOT NULL, closed_date TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sync_state (board_id TEXT PRIMARY KEY, cursor TEXT, synced_at TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS lists_board ON lists (board_id);
+CREATE INDEX IF NOT EXISTS cards_board ON cards (board_id);
+CREATE INDEX IF NOT EXISTS checklists_board ON checklists (board_id);
+"""
+
+def parse_action_date(date_str):
+    date = parse_utc(date_str)
+    if date is None:
+        raise ValueError("Invalid date of action: %s" % date_str)
+    return date.date()
+
+def is_closure_action(action):
+    """
+    Returns True if action archived the card or marked it as complete.
+    """
+    if action.get("type") != "updateCard":
+        return False
+    old = action.get("data", {}).get("old", {})
+    card = action.get("data", {}).get("card", {})
+    return (
+        ("closed" in old and not old["closed"] and card.get("closed", True)) or
+        ("dueComplete" in old and not old["dueComplete"] and card.get("dueComplete", True))
+    )
+
+def closure_dates_from_actions(actions):
+    """
+    Returns dictionary mapping card id to date of its latest closure found in given actions.
+    """
+    result = {}
+    for action in actions:
+        if not is_closure_action(action):
+            continue
+        card_id = action["data"]["card"]["id"]
+        date = parse_action_date(action["date"])
+        if card_id not in result or result[card_id] < date:
+            result[card_id] = date
+    return result
+
+def iter_board_actions(api, board_id, filter=None, since=None):
+    """
+    Yields actions of the board from newest to oldest, paginating with before.
+
+    :param api: trello.TrelloApi instance
+    :param board_id: Id of the board
+    :param filter: Comma separated action types, all actions if not provided
+    :param since: Action id or date, only newer actions are returned
+    """
+    before = None
+    while True:
+        page = api.boards.get_action(board_id, filter=filter, limit=ACTIONS_PAGE_SIZE, since=since, before=before)
+        yield from page
+        if len(page) < ACTIONS_PAGE_SIZE:
+            return
+        before = page[-1]["id"]
+
+def collect_changes(actions):
+    """
+    Returns entities touched by board actions as dictionary with keys cards, lists and
+    checklists (sets of ids to fetch again), deleted_cards, deleted_checklists (sets of ids)
+    and board_changed (True if board itself, like its labels, changed).
+    """
+    changes = {
+        "cards": set(),
+        "lists": set(),
+        "checklists": set(),
+        "deleted_cards": set(),
+        "deleted_checklists": set(),
+        "board_changed": False,
+    }
+    for action in actions:
+        data = action.get("data", {})
+        kind = action.get("type", "")
+        if "card" in data:
+            changes["cards"].add(data["card"]["id"])
+        for key in ("list", "listBefore", "listAfter"):
+            if key in data:
+                changes["lists"].add(data[key]["id"])
+        if "checklist" in data:
+            changes["checklists"].add(data["checklist"]["id"])
+        if kind == "deleteCard":
+            changes["deleted_cards"].add(data["card"]["id"])
+        if kind == "removeChecklistFromCard":
+            changes["deleted_checklists"].add(data["checklist"]["id"])
+        if kind == "updateBoard":
+            changes["board_changed"] = True
+    return changes
+
+def fetch_or_none(request):
+    """
+    Fetches entity, returns None if it was deleted from Trello.
+    """
+    try:
+        return request()
+    except Exception as e:
+        if _is_not_found(e):
+            return None
+        raise
+
+def _is_not_found(e):
+    response = getattr(e, "response", None)
+    return response is not None and getattr(response, "status_code", None) == 404
+
+class CardStore:
+    """
+    SQLite store of Trello boards.
+
+    :param path: Path of the database file
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def get_cursor(self, board_id):
+        with self.lock:
+            row = self.db.execute("SELECT cursor FROM sync_state WHERE board_id = ?", (board_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def is_synced(self, board_id):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM sync_state WHERE board_id = ?", (board_id,)).fetchone() is not None
+
+    def sync(self, api, board_id, resync=False):
+        """
+        Brings board in sync with Trello. Board is downloaded as a whole on first sync or
+        when resync is requested, otherwise only changes since last sync are fetched.
+
+        :param api: trello.TrelloApi instance
+        :param board_id: Id of the board
+        :param resync: Download whole board even if it was synced before
+        :return: Number of actions applied, None for full sync
+        """
+        if resync or not self.is_synced(board_id):
+            self.full_sync(api, board_id)
+            return None
+        return self.incremental_sync(api, board_id)
+
+    def full_sync(self, api, board_id):
+        logger.info("Full sync of board %s", board_id)
+        # cursor is taken before download so that changes made during download are applied next time
+        latest = api.boards.get_action(board_id, limit=1)
+        cursor = latest[0]["id"] if len(latest) > 0 else None
+        snapshot = BoardSnapshot.fetch(api, board_id)
+        closures = closure_dates_from_actions(iter_board_actions(api, board_id, filter=CLOSURE_ACTIONS_FILTER))
+        with self.lock, self.db:
+            for table in ("lists", "cards", "checklists", "closures"):
+                self.db.execute("DELETE FROM %s WHERE board_id = ?" % table, (board_id,))
+            self._put_board(board_id, {**snapshot.board, "labels": snapshot.labels})
+            for l in snapshot.lists:
+                self._put("lists", board_id, l)
+            for c in snapshot.cards:
+                self._put("cards", board_id, c.raw)
+            for c in snapshot.checklists.values():
+                self._put("checklists", board_id, c)
+            for card_id, date in closures.items():
+                self._put_closure(board_id, card_id, date)
+            self._set_cursor(board_id, cursor)
+        logger.info("Stored %d cards and %d closures of board %s", len(snapshot.cards), len(closures), snapshot.name)
+
+    def incremental_sync(self, api, board_id):
+        cursor = self.get_cursor(board_id)
+        logger.info("Syncing board %s since action %s", board_id, cursor)
+        actions = list(iter_board_actions(api, board_id, since=cursor))
+        if len(actions) == 0:
+            with self.lock, self.db:
+                self._set_cursor(board_id, cursor)
+            return 0
+        changes = collect_changes(actions)
+        # actions are newest first
+        closures = closure_dates_from_actions(actions)
+        board = fetch_or_none(lambda: api.boards.get(board_id, labels="all")) if changes["board_changed"] else None
+        cards = {i: None if i in changes["deleted_cards"] else fetch_or_none(lambda: api.cards.get(i)) for i in changes["cards"]}
+        lists = {i: fetch_or_none(lambda: api.lists.get(i)) for i in changes["lists"]}
+        checklists = {
+            i: None if i in changes["deleted_checklists"] else fetch_or_none(lambda: api.checklists.get(i))
+            for i in changes["checklists"]
+        }
+        with self.lock, self.db:
+            if board is not None:
+                self._put_board(board_id, board)
+            for table, entities in (("cards", cards), ("lists", lists), ("checklists", checklists)):
+                for entity_id, entity in entities.items():
+                    if entity is None or entity.get("idBoard", board_id) != board_id:
+                        self.db.execute("DELETE FROM %s WHERE id = ?" % table, (entity_id,))
+                    else:
+                        self._put(table, board_id, entity)
+            for card_id, date in closures.items():
+                self._put_closure(board_id, card_id, date)
+            self._set_cursor(board_id, actions[0]["id"])
+        logger.info("Applied %d actions to board %s: %d cards, %d lists, %d checklists fetched", len(actions), board_id, len(cards), len(lists), len(checklists))
+        return len(actions)
+
+    def _put_board(self, board_id, board):
+        self.db.execute("INSERT OR REPLACE INTO boards (id, data) VALUES (?, ?)", (board_id, json.dumps(board)))
+
+    def _put(self, table, board_id, entity):
+        self.db.execute(
+            "INSERT OR REPLACE INTO %s (id, board_id, data) VALUES (?, ?, ?)" % table,
+            (entity["id"], board_id, json.dumps(entity))
+        )
+
+    def _put_closure(self, board_id, card_id, date):
+        self.db.execute(
+            "INSERT INTO closures (card_id, board_id, closed_date) VALUES (?, ?, ?) "
+            "ON CONFLICT(card_id) DO UPDATE SET closed_date = MAX(closed_date, excluded.closed_date)",
+            (card_id, board_id, date.isoformat())
+        )
+
+    def _set_cursor(self, board_id, cursor):
+        self.db.execute(
+            "INSERT OR REPLACE INTO sync_state (board_id, cursor, synced_at) VALUES (?, ?, ?)",
+            (board_id, cursor, datetime.datetime.utcnow().isoformat())
+        )
+
+    def _load(self, table, board_id):
+        with self.lock:
+            rows = self.db.execute("SELECT data FROM %s WHERE board_id = ?" % table, (board_id,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def get_board_ids(self):
+        with self.lock:
+            return [r[0] for r in self.db.execute("SELECT id FROM boards ORDER BY id").fetchall()]
+
+    def get_snapshot(self, board_id) -> BoardSnapshot:
+        """
+        Returns BoardSnapshot of synced board.
+
+        :raises ValueError: If board was never synced
+        """
+        with self.lock:
+            row = self.db.execute("SELECT data FROM boards WHERE id = ?", (board_id,)).fetchone()
+        if row is None:
+            raise ValueError("Board %s is not in the store, sync it first" % board_id)
+        lists = sorted(self._load("lists", board_id), key=lambda l: l.get("pos", 0))
+        # cards in board order: by position of their list, then position in it; cards of unknown lists go last
+        list_order = {l["id"]: i for i, l in enumerate(lists)}
+        cards = sorted(self._load("cards", board_id), key=lambda c: (list_order.get(c.get("idList"), len(lists)), c.get("pos", 0)))
+        return BoardSnapshot({
+            **json.loads(row[0]),
+            "lists": lists,
+            "cards": cards,
+            "checklists": self._load("checklists", board_id),
+        })
+
+    def get_closure_dates(self, board_id=None):
+        """
+        Returns dictionary mapping card id to date when it was closed.
+        """
+        with self.lock:
+            if board_id is None:
+                rows = self.db.execute("SELECT card_id, closed_date FROM closures").fetchall()
+            else:
+                rows = self.db.execute("SELECT card_id, closed_date FROM closures WHERE board_id = ?", (board_id,)).fetchall()
+        return {card_id: datetime.date.fromisoformat(date) for card_id, date in rows}
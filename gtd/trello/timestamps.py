@@ -0,0 +1,80 @@
+"""
+Parsing of Trello timestamps.
+
+Trello sends times in UTC as ISO 8601 strings like 2025-05-08T01:00:00.000Z. Strings
+are parsed with datetime.fromisoformat after their shape is checked with precompiled
+pattern, and results are memoized per distinct string, since the same timestamps
+(due dates, dates of actions) are parsed again by every report of a run.
+
+Local time is UTC plus offset of local time zone at that instant, so dates on the
+other side of daylight saving time change get their own offset. Offsets are cached
+per quarter of an hour (time zones change offset only on quarter hours), so converting
+to local time costs one dictionary lookup. Caches live for the run, clear_caches
+resets them when time zone changes.
+"""
+import datetime
+import functools
+import re
+
+TRELLO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# shape of timestamps parse_utc accepts, everything else is invalid
+TRELLO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?Z")
+
+MEMO_SIZE = 1 << 17
+
+EPOCH = datetime.datetime(1970, 1, 1)
+OFFSET_BUCKET = datetime.timedelta(minutes=15)
+
+# quarter of an hour since EPOCH -> offset of local time from UTC in it
+_offsets = {}
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def parse_utc(date_str):
+    """
+    Parses Trello timestamp to naive UTC datetime, returns None if it is missing or invalid.
+    """
+    if not isinstance(date_str, str) or TRELLO_DATE.fullmatch(date_str) is None:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(date_str[:-1])
+    except ValueError:
+        return None
+
+def local_offset(utc: datetime.datetime = None) -> datetime.timedelta:
+    """
+    Returns offset of local time from UTC at given naive UTC time, current one if not provided.
+    """
+    if utc is None:
+        utc = datetime.datetime.utcnow()
+    bucket = (utc - EPOCH) // OFFSET_BUCKET
+    offset = _offsets.get(bucket)
+    if offset is None:
+        start = EPOCH + bucket * OFFSET_BUCKET
+        try:
+            offset = datetime.datetime.fromtimestamp(bucket * OFFSET_BUCKET.total_seconds()) - start
+        except (OverflowError, OSError, ValueError):
+            # platform cannot convert times this far, use offset of the current time
+            delta = datetime.datetime.now() - datetime.datetime.utcnow()
+            offset = datetime.timedelta(minutes=round(delta.total_seconds() / 60))
+        _offsets[bucket] = offset
+    return offset
+
+def to_local(utc: datetime.datetime) -> datetime.datetime:
+    """
+    Converts naive UTC datetime to naive local datetime.
+    """
+    return utc + local_offset(utc)
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def parse_local(date_str):
+    """
+    Parses Trello timestamp to naive local datetime, returns None if it is missing or invalid.
+    """
+    utc = parse_utc(date_str)
+    return to_local(utc) if utc is not None else None
+
+def clear_caches():
+    parse_utc.cache_clear()
+    parse_local.cache_clear()
+    _offsets.clear()
@@ -3,56 +3,250 @@
 import time
 import json 
 import logging
+import threading
+import functools
+import random
+import contextvars
 
 logger = logging.getLogger(__name__)
 
-class ExponentialBackoff:
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _exception_chain(exc):
+    """
+    Yields exception and all exceptions it was raised from or during handling of.
+    """
+    seen = set()
+    pending = [exc]
+    while pending:
+        e = pending.pop(0)
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        yield e
+        pending += [e.__cause__, e.__context__]
+
+def _status_code(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+def _is_transient(exc):
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import requests
+    except ImportError:
+        return False
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+def is_retryable(exc) -> bool:
     """
-    A class to implement exponential backoff for retrying operations.
+    Returns True if exception, or any exception in its cause/context chain, is transient:
+    HTTP 429 or 5xx response, connection error (e.g. reset by peer) or timeout. Errors
+    whose retries were already exhausted by nested retry are not retryable.
     """
+    chain = list(_exception_chain(exc))
+    if any(getattr(e, "_retries_exhausted", False) for e in chain):
+        return False
+    return any(_is_transient(e) for e in chain)
 
-    def __init__(self, base_delay=1, max_delay=60, max_retries=5):
+def get_retry_after(exc):
+    """
+    Returns seconds from Retry-After header of HTTP response found in exception chain, None if there is none.
+    """
+    for e in _exception_chain(exc):
+        response = getattr(e, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers or headers.get("Retry-After") is None:
+            continue
+        value = headers.get("Retry-After")
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            from email.utils import parsedate_to_datetime
+            import datetime
+            when = parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    return None
+
+_retry_stats = {"retries": 0, "sleep_seconds": 0.0}
+_retry_stats_lock = threading.Lock()
+
+def get_retry_stats() -> dict:
+    """
+    Returns number of retries and seconds spent sleeping between them in this process.
+    """
+    with _retry_stats_lock:
+        return dict(_retry_stats)
+
+def reset_retry_stats():
+    with _retry_stats_lock:
+        _retry_stats["retries"] = 0
+        _retry_stats["sleep_seconds"] = 0.0
+
+# deadline of outermost retried operation, shared with retried calls nested in it
+_retry_deadline = contextvars.ContextVar("retry_deadline", default=None)
+
+class Retry:
+    """
+    Decorator retrying transient failures (see is_retryable) with exponential backoff
+    and full jitter. Retry-After sent by server is honored. Other errors are raised
+    immediately.
+
+    All retried calls made while retried operation is running share its deadline, so
+    nested decorated calls do not multiply waiting time.
+
+    :param base_delay: Delay before first retry in seconds
+    :param max_delay: Maximum delay between retries in seconds
+    :param max_retries: Maximum number of retries after first attempt
+    :param deadline: Maximum seconds spent in operation including retries, None for no limit
+    """
+
+    def __init__(self, base_delay=1, max_delay=60, max_retries=5, deadline=None):
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.max_retries = max_retries
+        self.deadline = deadline
 
     def get_delay(self, attempt):
         """
-        Calculate the delay for the given attempt.
+        Calculate the upper bound of delay for the given attempt.
         """
         max_attempt = min(attempt, self.max_retries)
         delay = min(self.base_delay * (2 ** max_attempt), self.max_delay)
         return delay
-    def wait(self, attempt):
-        """
-        Wait for the calculated delay before retrying.
-        """
-        delay = self.get_delay(attempt)
-        time.sleep(delay)
+
     def retry(self, func, *args, **kwargs):
         """
-        Retry the given function with exponential backoff.
+        Retry the given function until it succeeds, fails with error which is not transient,
+        runs out of retries or deadline passes.
         """
-        attempt = 0
-        while True:
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                self.wait(attempt)
-                attempt += 1
-                if attempt >= self.max_retries:
-                    logger.error("Max retries reached. Giving up.")
-                    raise
-                logger.warning(f"Retrying in {self.get_delay(attempt)} seconds...")
-                continue
+        outer_deadline = _retry_deadline.get()
+        deadline = outer_deadline
+        if self.deadline is not None:
+            own_deadline = time.monotonic() + self.deadline
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+        token = _retry_deadline.set(deadline)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    retry_after = get_retry_after(e)
+                    delay = random.uniform(0, self.get_delay(attempt))
+                    if retry_after is not None:
+                        delay = retry_after + random.uniform(0, self.base_delay)
+                    if attempt >= self.max_retries or (deadline is not None and time.monotonic() + delay > deadline):
+                        logger.error(f"Giving up after {attempt + 1} attempts: {e}")
+                        e._retries_exhausted = True
+                        raise
+                    logger.warning(f"Attempt {attempt + 1} failed: {e}, retrying in {delay:.2f} seconds")
+                    time.sleep(delay)
+                    with _retry_stats_lock:
+                        _retry_stats["retries"] += 1
+                        _retry_stats["sleep_seconds"] += delay
+                    attempt += 1
+        finally:
+            _retry_deadline.reset(token)
+
     def __call__(self, func):
         """
-        Decorator to apply exponential backoff to a function.
+        Decorator to apply retries to a function.
         """
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             return self.retry(func, *args, **kwargs)
         return wrapper
-    
 
+# kept for code which used previous name
+ExponentialBackoff = Retry
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens are added at given rate up to capacity and every
+    operation takes one token, waiting if there are none left.
+
+    :param rate: Tokens added per second, 0 or less means no limit
+    :param capacity: Maximum number of tokens, i.e. size of a burst
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Takes tokens from the bucket, waiting until they are available.
 
+        :return: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+def rate_limited(limiter: TokenBucket):
+    """
+    Decorator which takes token from limiter before every call of decorated function.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            limiter.acquire()
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def profile_imports(statement: str):
+    """
+    Runs statement in fresh interpreter with -X importtime and returns list of 
+    dicts with "module", "self_ms", "cumulative_ms" and "level" keys, slowest 
+    modules first. Level 0 means module was imported directly by the statement.
+    """
+    import subprocess
+    import sys
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError("Profiled statement failed: %s" % proc.stderr.strip().splitlines()[-1:])
+    result = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        result.append({
+            "module": fields[2].strip(),
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+            "level": (len(fields[2]) - len(fields[2].lstrip()) - 1) // 2,
+        })
+    return sorted(result, key=lambda r: r["self_ms"], reverse=True)
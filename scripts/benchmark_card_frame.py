@@ -0,0 +1,99 @@
+"""
+This script compares report statistics computed by looping over cards with the same
+statistics computed on CardFrame, for synthetic boards of given sizes. Speedup counts
+building the frame too, as reports build their frames on every run; reused_speedup is
+for queries on a frame which is already built.
+"""
+
+import argparse
+import datetime
+import random
+import timeit
+
+import pandas as pd
+
+from gtd.trello.card import Card
+from gtd.trello.frame import CardFrame
+
+LABELS = ["This week", "Help", "Primary", "Secondary", "Waiting"]
+
+def generate_cards(count, lists=20, seed=0):
+    """
+    Generates cards in Trello format with random lists, labels and dates.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    cards = []
+    for i in range(count):
+        created = now - datetime.timedelta(days=rng.randint(0, 365))
+        activity = created + datetime.timedelta(hours=rng.randint(0, 24 * 30))
+        due = now + datetime.timedelta(days=rng.randint(-30, 60), hours=rng.randint(0, 23)) if rng.random() < 0.5 else None
+        cards.append({
+            "id": "%08x%016x" % (int(created.timestamp()), i),
+            "name": "Card %d" % i,
+            "idList": "list%d" % rng.randrange(lists),
+            "labels": [{"name": l} for l in LABELS if rng.random() < 0.2],
+            "due": due.strftime("%Y-%m-%dT%H:%M:%S.000Z") if due is not None else None,
+            "dateLastActivity": activity.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "idChecklists": ["checklist%d" % i] if rng.random() < 0.3 else [],
+        })
+    closed_dates = {c["id"]: (now - datetime.timedelta(days=rng.randint(0, 30))).date() for c in cards if rng.random() < 0.5}
+    return cards, closed_dates
+
+def loop_statistics(cards, closed_dates, list_ids, now, start_of_week):
+    return (
+        [len([c for c in cards if c["idList"] == l]) for l in list_ids],
+        len([c for c in cards if "This week" in c.label_names]),
+        len([c for c in cards if c.due is not None and not c.get("idChecklists") and (c.due - now).days <= 7]),
+        len([c for c in cards if c.created is not None and c.created.date() >= start_of_week]),
+        len([c for c in cards if closed_dates.get(c.id) is not None and closed_dates[c.id] >= start_of_week]),
+    )
+
+def frame_statistics(frame, list_ids, now, start_of_week):
+    return (
+        frame.count_per_list(list_ids),
+        frame.count(frame.has_label("This week")),
+        frame.count(frame.due_within(7, now) & ~frame.has_checklists),
+        frame.count(frame.created_since(start_of_week)),
+        frame.count(frame.closed_since(start_of_week)),
+    )
+
+def build_frame(cards, closed_dates):
+    """
+    Returns CardFrame with columns used by frame_statistics built.
+    """
+    frame = CardFrame(cards, closed_dates)
+    for column in ("list_codes", "label_masks", "due", "has_checklists", "created", "closed"):
+        getattr(frame, column)
+    return frame
+
+def benchmark(count, repeat):
+    raw, closed_dates = generate_cards(count)
+    cards = Card.wrap_all(raw)
+    list_ids = sorted(set(c["idList"] for c in raw))
+    now = datetime.datetime.now()
+    start_of_week = now.date() - datetime.timedelta(days=now.weekday())
+    frame = build_frame(cards, closed_dates)
+    assert loop_statistics(cards, closed_dates, list_ids, now, start_of_week) == frame_statistics(frame, list_ids, now, start_of_week)
+    loop = min(timeit.repeat(lambda: loop_statistics(cards, closed_dates, list_ids, now, start_of_week), number=1, repeat=repeat))
+    build = min(timeit.repeat(lambda: build_frame(cards, closed_dates), number=1, repeat=repeat))
+    vectorized = min(timeit.repeat(lambda: frame_statistics(frame, list_ids, now, start_of_week), number=1, repeat=repeat))
+    return {
+        "cards": count,
+        "loop_ms": loop * 1000,
+        "frame_build_ms": build * 1000,
+        "frame_ms": vectorized * 1000,
+        "speedup": loop / (build + vectorized),
+        "reused_speedup": loop / vectorized,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CardFrame statistics against loops over cards")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Numbers of cards to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions, best time is reported")
+    args = parser.parse_args()
+    df = pd.DataFrame([benchmark(size, args.repeat) for size in args.sizes])
+    print(df.to_string(index=False, float_format="%.2f"))
+
+if __name__ == "__main__":
+    main()
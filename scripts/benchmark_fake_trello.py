@@ -0,0 +1,91 @@
+"""
+This script measures how long report queries and upload take against local Trello
+stand-in (gtd.test.fake_trello) serving generated boards of given sizes, with given
+latency of every request and share of requests answered with 429.
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import pandas as pd
+
+import gtd.trello as trello
+from gtd.test.fake_trello import FakeTrello, FakeTrelloServer, generate_board, redirect
+from gtd.utils import TokenBucket
+
+def report_queries(api):
+    """
+    Runs queries reports make: open and closed cards, closure dates, comments of
+    cards planned for this week and weekly scores.
+    """
+    open_cards = api.get_open_cards()
+    closed_cards = api.get_closed_cards()
+    closed_dates = api.get_closure_dates(closed_cards)
+    this_week = [c for c in open_cards if "This week" in c.label_names]
+    api.prefetch_card_details(this_week)
+    for card in this_week:
+        api.get_comments(card)
+    today = datetime.date.today()
+    trello.weekly_scores(api, today - datetime.timedelta(weeks=12), today, closed_cards, closed_dates)
+    return len(open_cards) + len(closed_cards)
+
+def upload(count):
+    tasks = [
+        {"title": "Uploaded %d" % i, "description": "", "project": "Uploads", "checklists": {"Steps": ["one", "two", "three"]}}
+        for i in range(count)
+    ]
+    results = trello.TrelloImporter().create_many(tasks)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if len(failed) > 0:
+        raise failed[0]
+
+def timed(server, func, *args):
+    requests = server.request_count
+    throttled = server.throttled
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start, server.request_count - requests, server.throttled - throttled
+
+def benchmark(cards, tasks, latency, throttle_every):
+    fake = FakeTrello()
+    generate_board(fake, "Benchmark", lists=20, cards=cards)
+    with FakeTrelloServer(fake, latency=latency, throttle_every=throttle_every) as server, redirect(server.url):
+        read, report_s, report_requests, report_throttled = timed(server, report_queries, trello.TrelloAPI())
+        _, upload_s, upload_requests, upload_throttled = timed(server, upload, tasks)
+    return {
+        "cards": cards,
+        "report_s": report_s,
+        "report_requests": report_requests,
+        "report_429": report_throttled,
+        "cards_per_s": read / report_s,
+        "tasks": tasks,
+        "upload_s": upload_s,
+        "upload_requests": upload_requests,
+        "upload_429": upload_throttled,
+        "tasks_per_s": tasks / upload_s,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reports and upload against local Trello stand-in")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000], help="Numbers of cards of generated board")
+    parser.add_argument("--tasks", type=int, default=200, help="Number of tasks uploaded")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds every request waits on the server")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Every n-th request is answered with 429, 0 never")
+    parser.add_argument("--requests-per-second", type=float, default=0, help="Client side rate limit, 0 disables it")
+    parser.add_argument("--no-snapshot", action="store_true", help="Fetch cards, lists and checklists with separate requests")
+    args = parser.parse_args()
+    os.environ.update({
+        "GTD_TRELLO_APIKEY": "key",
+        "GTD_TRELLO_TOKEN": "token",
+        "GTD_TRELLO_BOARD": "Benchmark",
+        "GTD_TRELLO_STORE": "",
+        "GTD_TRELLO_BOARD_SNAPSHOT": "false" if args.no_snapshot else "true",
+    })
+    trello._rate_limiter = TokenBucket(args.requests_per_second, 100)
+    df = pd.DataFrame([benchmark(size, args.tasks, args.latency, args.throttle_every) for size in args.sizes])
+    print(df.to_string(index=False, float_format="%.2f"))
+
+if __name__ == "__main__":
+    main()
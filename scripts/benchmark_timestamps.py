@@ -0,0 +1,61 @@
+"""
+This script compares conversion of Trello timestamps to local time done the old way
+(reading both clocks and strptime on every call) with gtd.trello.timestamps, for
+given numbers of timestamps of which given share are distinct.
+"""
+
+import argparse
+import datetime
+import random
+import timeit
+
+import pandas as pd
+
+from gtd.trello import timestamps
+
+def generate_timestamps(count, distinct, seed=0):
+    """
+    Generates Trello timestamps from the last year, count * distinct of them different.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    pool = [
+        (now - datetime.timedelta(seconds=rng.uniform(0, 365 * 86400))).strftime(timestamps.TRELLO_DATE_FORMAT)[:-4] + "Z"
+        for _ in range(max(1, int(count * distinct)))
+    ]
+    return [pool[i % len(pool)] for i in range(count)]
+
+def old_utc_to_this_tz(utc_time):
+    dt = datetime.datetime.now() - datetime.datetime.utcnow()
+    return datetime.datetime.strptime(utc_time, timestamps.TRELLO_DATE_FORMAT) + dt
+
+def cold(values):
+    timestamps.clear_caches()
+    return [timestamps.parse_local(v) for v in values]
+
+def benchmark(count, distinct, repeat):
+    values = generate_timestamps(count, distinct)
+    old = min(timeit.repeat(lambda: [old_utc_to_this_tz(v) for v in values], number=1, repeat=repeat))
+    new_cold = min(timeit.repeat(lambda: cold(values), number=1, repeat=repeat))
+    new_warm = min(timeit.repeat(lambda: [timestamps.parse_local(v) for v in values], number=1, repeat=repeat))
+    return {
+        "timestamps": count,
+        "distinct": distinct,
+        "old_ms": old * 1000,
+        "cold_ms": new_cold * 1000,
+        "memoized_ms": new_warm * 1000,
+        "cold_speedup": old / new_cold,
+        "memoized_speedup": old / new_warm,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing of Trello timestamps to local time")
+    parser.add_argument("--count", type=int, default=100000, help="Number of timestamps")
+    parser.add_argument("--distinct", type=float, nargs="+", default=[1.0, 0.1], help="Shares of distinct timestamps")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions, best time is reported")
+    args = parser.parse_args()
+    df = pd.DataFrame([benchmark(args.count, distinct, args.repeat) for distinct in args.distinct])
+    print(df.to_string(index=False, float_format="%.2f"))
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-#!/bin/bash 
+#!/bin/bash
 
 THIS_DIR="$(dirname $0)/../"
 THIS_DIR="$(readlink -f "$THIS_DIR")"
@@ -6,11 +6,17 @@ THIS_DIR="$(readlink -f "$THIS_DIR")"
 cd $THIS_DIR
 
 . env/bin/activate
-BACKUP_FILE="/data/trello-backup-$(date +%Y-%m-%d).json"
-python -m gtd.trello backup $BACKUP_FILE
+BACKUP_DIR="/data"
+BACKUP_FILE="$BACKUP_DIR/trello-backup-$(date +%Y-%m-%d).ndjson.gz"
+PREVIOUS_FILE="$(ls -1 $BACKUP_DIR/trello-backup-*.ndjson.gz 2>/dev/null | sort | tail -n 1)"
 
-# zip the backup file
-gzip $BACKUP_FILE
+# full backup in the first week of the month, otherwise only changes since previous backup
+# restore with: python -m gtd.trello compact OUTPUT FULL_BACKUP DIFF...
+if [ "$(date +%d)" -le 7 ] || [ -z "$PREVIOUS_FILE" ]; then
+    python -m gtd.trello backup $BACKUP_FILE
+else
+    python -m gtd.trello backup $BACKUP_FILE --diff $PREVIOUS_FILE
+fi
 
 # crontab schedule to run every week on Sunday at 20:00
 # 0 20 * * 0 /path/to/backup.sh